@@ -3,6 +3,21 @@ from pathlib import Path
 
 from csv_to_ddl.schema_analysis.models.dialects import DatabaseDialect
 
+SIZE_UNITS = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}
+
+
+def memory_size(text: str) -> int:
+    """Bytes of a size such as 512M, 1.5G or 1048576 (binary units, an optional trailing B)."""
+    number = text.strip().upper().removesuffix('B')
+    unit = number[-1:] if number[-1:] in SIZE_UNITS else ''
+    try:
+        size = int(float(number[:len(number) - len(unit)]) * SIZE_UNITS[unit])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {text!r}")
+    if size <= 0:
+        raise argparse.ArgumentTypeError(f"size must be positive: {text!r}")
+    return size
+
 
 class ArgumentParser:
     @staticmethod
@@ -15,6 +30,16 @@ class ArgumentParser:
               %(prog)s -i data/                    # Process all CSV files in directory
               %(prog)s -i file.csv -d mysql        # Convert single file for MySQL
               %(prog)s -i data/ -o schema.sql      # Save result to file schema.sql
+              %(prog)s -i datasets.zip/olist       # Read CSV members of an archive without extracting it
+              %(prog)s -i lake/ --include 'sales/*' --exclude '_tmp*' --max-depth 2  # Choose the input files
+              %(prog)s -i data/ --full-scan        # Profile every record instead of a sample
+              %(prog)s -i data/ -j 8               # Analyze files in 8 worker processes
+              %(prog)s -i data/ --sampling reservoir --seed 7  # Sample uniformly across each file
+              %(prog)s -i data/ --shard-pattern 'part-*.csv'  # One table per directory of part files
+              %(prog)s -i daily/ --dedupe-layouts  # Infer once per layout, check the other files against it
+              %(prog)s -i landing/ --async-files 256  # Keep 256 small files in flight at once
+              %(prog)s -i data/ --compact-values 256  # Hash long free-text values instead of keeping them
+              %(prog)s -i lake/ --max-memory 2G    # Spill column stores and key sets to disk past 2 GiB
         """
         )
 
@@ -22,7 +47,29 @@ class ArgumentParser:
             '-i', '--input',
             type=Path,
             required=True,
-            help='Input CSV file or directory containing CSV files'
+            help='Input CSV file, directory or .zip/.tar/.tar.gz archive (or a directory inside one)'
+        )
+
+        parser.add_argument(
+            '--include',
+            action='append',
+            default=[],
+            metavar='GLOB',
+            help='Only analyze files whose path relative to the input, or name, matches GLOB (repeatable)'
+        )
+
+        parser.add_argument(
+            '--exclude',
+            action='append',
+            default=[],
+            metavar='GLOB',
+            help='Skip files and directories whose path relative to the input, or name, matches GLOB (repeatable)'
+        )
+
+        parser.add_argument(
+            '--max-depth',
+            type=int,
+            help='Descend at most this many directory levels below the input (default: no limit)'
         )
 
         parser.add_argument(
@@ -39,6 +86,112 @@ class ArgumentParser:
             help='Target database dialect (default: postgresql)'
         )
 
+        parser.add_argument(
+            '--full-scan',
+            action='store_true',
+            help='Stream every record of each file into column statistics and row counts '
+                 '(default: analyze only the leading sample)'
+        )
+
+        parser.add_argument(
+            '--sampling',
+            type=str,
+            choices=['head', 'reservoir', 'blocks'],
+            default='head',
+            help='How the row sample is drawn: leading records, a uniform reservoir over the whole file, '
+                 'or random blocks read by seeking (through a cached index for .csv.gz files) (default: head)'
+        )
+
+        parser.add_argument(
+            '--seed',
+            type=int,
+            help='Random seed for reproducible sampling'
+        )
+
+        parser.add_argument(
+            '--gzip-index-dir',
+            type=str,
+            help='Directory for cached .csv.gz access-point indexes (default: next to each file)'
+        )
+
+        parser.add_argument(
+            '--count-rows',
+            action='store_true',
+            help='Count the exact number of records of sampled files with a fast quote-aware byte scan '
+                 '(--full-scan counts them anyway)'
+        )
+
+        parser.add_argument(
+            '--async-files',
+            type=int,
+            default=0,
+            help='Load files through an asyncio front end with up to this many files in flight, for trees of '
+                 'many small files (default: 0, load files one by one)'
+        )
+
+        parser.add_argument(
+            '--compact-values',
+            type=int,
+            metavar='LENGTH',
+            help='Keep values longer than LENGTH characters only as their length, hash and prefix in '
+                 'statistics and key maps (default: keep every value)'
+        )
+
+        parser.add_argument(
+            '--max-memory',
+            type=memory_size,
+            metavar='SIZE',
+            help='Memory budget for column stores and foreign key sets, e.g. 512M or 2G; what does not fit '
+                 'is spilled to memory-mapped files (default: no limit)'
+        )
+
+        parser.add_argument(
+            '--spill-dir',
+            type=str,
+            help='Directory for the temporary spill files of --max-memory (default: the system temp directory)'
+        )
+
+        parser.add_argument(
+            '--mmap',
+            action='store_true',
+            help='Read uncompressed CSV files through a memory-mapped zero-copy reader'
+        )
+
+        parser.add_argument(
+            '--pipeline-depth',
+            type=int,
+            default=0,
+            help='Read files through background decompress/decode/parse threads, buffering at most this many '
+                 'blocks and record batches between them (default: 0, read in one thread)'
+        )
+
+        parser.add_argument(
+            '--shard-pattern',
+            type=str,
+            help='Glob for file names that are shards of a partitioned table; matching files in the same '
+                 'directory are analyzed as one table named after that directory'
+        )
+
+        parser.add_argument(
+            '--shard-by-directory',
+            action='store_true',
+            help='Analyze all files below each subdirectory of the input as one table named after it'
+        )
+
+        parser.add_argument(
+            '--dedupe-layouts',
+            action='store_true',
+            help='Infer types once per distinct file layout (delimiter, header, column count) and only '
+                 'check the other files of the same layout against them'
+        )
+
+        parser.add_argument(
+            '-j', '--jobs',
+            type=int,
+            default=1,
+            help='Number of worker processes analyzing files in parallel, 0 uses all cores (default: 1)'
+        )
+
         parser.add_argument(
             '-v', '--verbose',
             action='store_true',
@@ -1,4 +1,4 @@
-from typing import Protocol
+from typing import Optional, Protocol
 
 from csv_to_ddl.config.default_config import CSVConfig, KeyConfig, TypeConfig, NormalizationConfig, HeaderConfig
 
@@ -25,9 +25,11 @@ class ConfigProvider(Protocol):
 class DefaultConfigProvider:
     """Default configuration provider using hardcoded defaults"""
 
-    @staticmethod
-    def get_csv_config() -> CSVConfig:
-        return CSVConfig()
+    def __init__(self, csv_config: Optional[CSVConfig] = None):
+        self.csv_config = csv_config
+
+    def get_csv_config(self) -> CSVConfig:
+        return self.csv_config if self.csv_config is not None else CSVConfig()
 
     @staticmethod
     def get_header_config() -> HeaderConfig:
@@ -2,6 +2,50 @@ SAMPLE_SIZE = 100000
 HEADER_DATA_ROWS_SAMPLE_SIZE = 20
 HEADER_DETECTION_SAMPLE_SIZE = 10
 DELIMITER_DETECTION_SAMPLE_SIZE = 10
+DIALECT_CANDIDATE_DELIMITERS = [',', '\t', ';', '|', ':']
+ENCODING_DETECTION_SAMPLE_SIZE = 65536
+
+FULL_SCAN = False
+FULL_SCAN_DISTINCT_LIMIT = 1000000
+DISTINCT_SKETCH_SIZE = 1024
+
+JOBS = 1
+PARALLEL_CHUNK_SIZE = 67108864
+
+USE_MMAP = False
+
+PIPELINE_DEPTH = 0
+PIPELINE_BLOCK_SIZE = 1048576
+PIPELINE_BATCH_SIZE = 4096
+
+SAMPLING = 'head'
+SAMPLING_SEED = None
+BLOCK_SAMPLE_COUNT = 100
+BLOCK_SAMPLE_SIZE = 262144
+
+GZIP_INDEX_SPAN = 4194304
+GZIP_INDEX_DIR = None
+
+SHARD_PATTERN = None
+SHARD_BY_DIRECTORY = False
+
+DEDUPE_LAYOUTS = False
+
+COUNT_ROWS = False
+
+ASYNC_CONCURRENCY = 0
+ASYNC_THREADS = 32
+ASYNC_SMALL_FILE_SIZE = 8388608
+
+COMPACT_VALUE_LENGTH = None
+COMPACT_PREFIX_LENGTH = 16
+
+INCLUDE_PATTERNS = ()
+EXCLUDE_PATTERNS = ()
+MAX_DEPTH = None
+
+MAX_MEMORY = None
+SPILL_DIR = None
 
 HEADER_LETTER_PATTERN_BONUS = 0.4
 HEADER_TYPE_DIFFERENCE_BONUS = 0.3
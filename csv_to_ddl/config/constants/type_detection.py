@@ -1,5 +1,7 @@
 TYPE_DETECTION_SAMPLE_SIZE = 1000
 TYPE_DETECTION_CONFIDENCE_THRESHOLD = 0.9
+DATE_FORMAT_PROBE_SIZE = 20
+VECTORIZED_TYPE_DETECTION = True  # only takes effect when NumPy is installed
 
 MAX_VARCHAR_LENGTH = 255
 UUID_CHAR_LENGTH = 36
@@ -1,4 +1,6 @@
+import random
 from dataclasses import dataclass
+from typing import Optional, Tuple
 
 from csv_to_ddl.config.constants.csv import *
 from csv_to_ddl.config.constants.foreign_key import *
@@ -12,6 +14,77 @@ class CSVConfig:
     sample_size: int = SAMPLE_SIZE
     delimiter_detection_sample_size: int = DELIMITER_DETECTION_SAMPLE_SIZE
 
+    # Full-file streaming mode
+    full_scan: bool = FULL_SCAN
+    full_scan_distinct_limit: int = FULL_SCAN_DISTINCT_LIMIT
+    distinct_sketch_size: int = DISTINCT_SKETCH_SIZE
+
+    # Number of worker processes for per-file analysis; in full scan mode, uncompressed
+    # files of at least two chunks are also split into byte ranges profiled in parallel
+    jobs: int = JOBS
+    parallel_chunk_size: int = PARALLEL_CHUNK_SIZE
+
+    # Read uncompressed files through a memory-mapped zero-copy reader
+    use_mmap: bool = USE_MMAP
+
+    # Threaded read/decode/parse pipeline: at most pipeline_depth blocks and record batches
+    # are buffered between the stages (0 reads in the calling thread)
+    pipeline_depth: int = PIPELINE_DEPTH
+
+    # How the row sample is drawn: 'head' (leading records), 'reservoir' (uniform over the file)
+    # or 'blocks' (random seeks into uncompressed files)
+    sampling: str = SAMPLING
+    sampling_seed: Optional[int] = SAMPLING_SEED
+    block_sample_count: int = BLOCK_SAMPLE_COUNT
+    block_sample_size: int = BLOCK_SAMPLE_SIZE
+
+    # Random access into .csv.gz files: uncompressed bytes between index access points,
+    # and where indexes are cached (None keeps them next to each file)
+    gzip_index_span: int = GZIP_INDEX_SPAN
+    gzip_index_dir: Optional[str] = GZIP_INDEX_DIR
+
+    # Partitioned tables: files whose name matches shard_pattern are shards of one table per
+    # directory; with shard_by_directory every file below a top-level subdirectory is a shard
+    # of the table named after that subdirectory
+    shard_pattern: Optional[str] = SHARD_PATTERN
+    shard_by_directory: bool = SHARD_BY_DIRECTORY
+
+    # Fully analyze one representative per file layout (delimiter, header, column count) and
+    # only check the other files of that layout against its inferred types
+    dedupe_layouts: bool = DEDUPE_LAYOUTS
+
+    # Exact record counts for sampled files from a quote-aware byte scan (no parsing)
+    count_rows: bool = COUNT_ROWS
+
+    # Asyncio ingestion: up to async_concurrency files in flight (0 loads them one by one), read
+    # on async_threads threads; files up to async_small_file_size bytes are read whole in one call
+    async_concurrency: int = ASYNC_CONCURRENCY
+    async_threads: int = ASYNC_THREADS
+    async_small_file_size: int = ASYNC_SMALL_FILE_SIZE
+
+    # Values longer than compact_value_length (None keeps every value) are held in statistics
+    # and key maps only as their length, 64-bit hash and a compact_prefix_length prefix
+    compact_value_length: Optional[int] = COMPACT_VALUE_LENGTH
+    compact_prefix_length: int = COMPACT_PREFIX_LENGTH
+
+    # Input discovery: globs over paths relative to the input (or file names) that select or
+    # skip files, exclude also pruning directories; max_depth limits the directory levels walked
+    include_patterns: Tuple[str, ...] = INCLUDE_PATTERNS
+    exclude_patterns: Tuple[str, ...] = EXCLUDE_PATTERNS
+    max_depth: Optional[int] = MAX_DEPTH
+
+    # Memory budget in bytes for column stores and foreign key sets (None is unlimited); what
+    # does not fit is spilled to memory-mapped files in a temporary directory under spill_dir
+    max_memory: Optional[int] = MAX_MEMORY
+    spill_dir: Optional[str] = SPILL_DIR
+
+    def __post_init__(self):
+        # A random sample is drawn with one seed per run even without --seed, so a table's
+        # sample can be re-read (CSVAnalyzer.rescan_for) with the same rows
+        if self.sampling != 'head' and self.sampling_seed is None:
+            self.sampling_seed = random.randrange(2 ** 32)
+
+
 @dataclass
 class HeaderConfig:
     header_detection_sample_size: int = HEADER_DETECTION_SAMPLE_SIZE
@@ -102,6 +175,12 @@ class TypeConfig:
     type_detection_sample_size: int = TYPE_DETECTION_SAMPLE_SIZE
     type_detection_confidence_threshold: float = TYPE_DETECTION_CONFIDENCE_THRESHOLD
 
+    # Leading sample values whose layouts select the candidate formats of a date column
+    date_format_probe_size: int = DATE_FORMAT_PROBE_SIZE
+
+    # Classify numbers and ISO dates of a sample in bulk with NumPy (optional dependency)
+    vectorized_type_detection: bool = VECTORIZED_TYPE_DETECTION
+
     max_varchar_length: int = MAX_VARCHAR_LENGTH
     uuid_char_length: int = UUID_CHAR_LENGTH
     boolean_length: int = BOOLEAN_LENGTH
@@ -0,0 +1,147 @@
+import gzip
+import io
+import logging
+import tarfile
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz')
+
+
+def is_archive(path: Path) -> bool:
+    return is_archive_name(path.name)
+
+
+def is_archive_name(name: str) -> bool:
+    return name.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+class ArchiveMember(PurePosixPath):
+    """
+    Path of a file inside a .zip, .tar or .tar.gz archive, written as if the
+    archive were a directory: data/datasets.zip/olist/orders.csv.
+
+    Being a path, a member is named, sorted, grouped into tables and sent to
+    worker processes like any file on disk; only opening it differs (see
+    open_archive_member). The archive is the first path component with an
+    archive suffix.
+    """
+
+    @classmethod
+    def from_path(cls, path: Path) -> Optional['ArchiveMember']:
+        """The path as an ArchiveMember when it reaches into an archive file, None otherwise."""
+        for parent in path.parents:
+            if is_archive(parent) and parent.is_file():
+                return cls(path)
+        return None
+
+    @property
+    def archive(self) -> Path:
+        for i, part in enumerate(self.parts):
+            if is_archive_name(part):
+                return Path(*self.parts[:i + 1])
+        raise ValueError(f"{self} is not inside an archive")
+
+    @property
+    def member_name(self) -> str:
+        return PurePosixPath(self).relative_to(self.archive).as_posix()
+
+
+def list_archive_members(archive: Path, prefix: str = '') -> List[Tuple[ArchiveMember, int]]:
+    """
+    Regular files of an archive with their uncompressed sizes, optionally only
+    the member named prefix or those below the directory prefix.
+
+    Reads the zip central directory, or walks the tar headers (which for a
+    .tar.gz inflates the archive once); no member is extracted.
+    """
+    prefix = _normalized(prefix) if prefix.strip('/') else ''
+    try:
+        if zipfile.is_zipfile(archive):
+            with zipfile.ZipFile(archive) as zip_file:
+                entries = [(_normalized(info.filename), info.file_size) for info in zip_file.infolist()
+                           if not info.is_dir()]
+        else:
+            with tarfile.open(archive, 'r:*') as tar_file:
+                entries = [(_normalized(info.name), info.size) for info in tar_file if info.isfile()]
+    except (OSError, tarfile.TarError, zipfile.BadZipFile) as e:
+        logger.warning(f"Cannot read archive {archive}: {e}")
+        return []
+
+    return [(ArchiveMember(archive, name), size) for name, size in entries
+            if not prefix or name == prefix or name.startswith(prefix + '/')]
+
+
+def open_archive_member(member: ArchiveMember, gunzip: bool = False) -> BinaryIO:
+    """
+    Stream the bytes of an archive member without extracting it.
+
+    Zip members are read from their own offset; tar members are found by
+    walking the headers up to them, so in a .tar.gz every member open
+    inflates the archive from its start (reading all members of a large
+    .tar.gz is quadratic; extract it or use a .zip instead). With gunzip the member (a .csv.gz) is
+    inflated on the fly. Closing the returned stream closes the archive.
+    """
+    archive = member.archive
+    if zipfile.is_zipfile(archive):
+        with zipfile.ZipFile(archive) as zip_file:
+            info = _find_zip_member(zip_file, member.member_name)
+            if info is None:
+                raise FileNotFoundError(f"No member {member.member_name} in {archive}")
+            stream = zip_file.open(info)  # keeps the archive file open until the member closes
+        owners = []
+    else:
+        tar_file = tarfile.open(archive, 'r:*')
+        stream = _find_tar_member(tar_file, member.member_name)
+        if stream is None:
+            tar_file.close()
+            raise FileNotFoundError(f"No member {member.member_name} in {archive}")
+        owners = [tar_file]
+
+    if gunzip:
+        owners.insert(0, stream)
+        stream = gzip.GzipFile(fileobj=stream, mode='rb')
+    return io.BufferedReader(_OwningStream(stream, owners))
+
+
+def _normalized(name: str) -> str:
+    # Member names as ArchiveMember spells them: tar's ./olist/orders.csv is olist/orders.csv
+    return PurePosixPath(name.strip('/')).as_posix()
+
+
+def _find_zip_member(zip_file: zipfile.ZipFile, name: str) -> Optional[zipfile.ZipInfo]:
+    for info in zip_file.infolist():
+        if _normalized(info.filename) == name and not info.is_dir():
+            return info
+    return None
+
+
+def _find_tar_member(tar_file: tarfile.TarFile, name: str) -> Optional[BinaryIO]:
+    for info in tar_file:
+        if _normalized(info.name) == name and info.isfile():
+            return tar_file.extractfile(info)
+    return None
+
+
+class _OwningStream(io.RawIOBase):
+    """Readable stream that also closes the streams and archives it was opened through."""
+
+    def __init__(self, stream: BinaryIO, owners: List):
+        self._stream = stream
+        self._owners = owners
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        return self._stream.readinto(buffer)
+
+    def close(self):
+        if not self.closed:
+            self._stream.close()
+            for owner in self._owners:
+                owner.close()
+        super().close()
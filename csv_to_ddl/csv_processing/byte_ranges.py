@@ -0,0 +1,126 @@
+import io
+import logging
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional
+
+from csv_to_ddl.csv_processing.csv_helpers import (find_record_start, first_newline_outside_quotes,
+                                                  parse_complete_records, split_records)
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_SIZE = 1048576
+BOUNDARY_WINDOW_SIZE = 65536
+BOUNDARY_PROBE_RECORDS = 8
+
+
+class RangeReader(io.RawIOBase):
+    """Binary stream over the bytes [start, end) of a file."""
+
+    def __init__(self, path: Path, start: int, end: int):
+        super().__init__()
+        self._file = open(path, 'rb')
+        self._file.seek(start)
+        self._remaining = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = self._file.readinto(memoryview(buffer)[:min(len(buffer), self._remaining)])
+        self._remaining -= size
+        return size
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def count_quotes(path: Path, start: int, end: int, quotechar: str = '"') -> int:
+    quote = quotechar.encode('ascii')
+    count = 0
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = f.read(min(READ_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            count += chunk.count(quote)
+            remaining -= len(chunk)
+    return count
+
+
+def nominal_offsets(data_start: int, data_end: int, part_size: int) -> List[int]:
+    """Equally spaced split points between data_start and data_end, both ends included."""
+    part_count = max(1, round((data_end - data_start) / part_size))
+    return [data_start + part * (data_end - data_start) // part_count for part in range(part_count)] + [data_end]
+
+
+def align_to_records(path: Path, offsets: List[int], quote_counts: List[int], delimiter: str, encoding: str,
+                     expected_columns: int, quotechar: str = '"') -> Optional[List[int]]:
+    """
+    Move every inner split point forward to the start of a record.
+
+    quote_counts[i] is the number of quote characters between offsets[i] and
+    offsets[i + 1]. Quotes come in pairs around quoted fields (an escaped
+    quote is doubled), so an odd running count at a split point means it lies
+    inside a quoted field: the record starts at the first newline that is
+    outside quotes. Each boundary is confirmed by parsing a few records and
+    checking their width; a file with stray quotes inside unquoted fields
+    breaks the parity, and the boundary is then searched for heuristically.
+
+    Returns:
+        Ascending record-aligned offsets, first and last unchanged; None when a
+        boundary cannot be placed with confidence
+    """
+    quote = quotechar.encode(encoding)
+    boundaries = [offsets[0]]
+    quotes_before = 0
+
+    with open(path, 'rb') as f:
+        for offset, quote_count in zip(offsets[1:-1], quote_counts):
+            quotes_before += quote_count
+            boundary = _record_start_after(f, offset, quotes_before % 2 == 1, quote, delimiter, encoding,
+                                           expected_columns)
+            if boundary is None:
+                logger.debug(f"No record boundary found after offset {offset} of {path}")
+                return None
+            if boundary > boundaries[-1]:
+                boundaries.append(boundary)
+
+    if offsets[-1] > boundaries[-1]:
+        boundaries.append(offsets[-1])
+    return boundaries
+
+
+def iter_byte_range_records(path: Path, start: int, end: int, delimiter: str, encoding: str) -> Iterator[List[str]]:
+    """Records of a record-aligned byte range, decoded the same way as a whole-file text stream."""
+    with io.TextIOWrapper(io.BufferedReader(RangeReader(path, start, end)), encoding=encoding,
+                          errors='replace') as f:
+        yield from split_records(f, delimiter)
+
+
+def _record_start_after(f: BinaryIO, offset: int, inside_quotes: bool, quote: bytes, delimiter: str,
+                        encoding: str, expected_columns: int) -> Optional[int]:
+    f.seek(offset)
+    window = f.read(BOUNDARY_WINDOW_SIZE)
+    if not window:
+        return offset
+
+    candidate = first_newline_outside_quotes(window, quote, inside_quotes)
+    if candidate is None and len(window) < BOUNDARY_WINDOW_SIZE:
+        return offset + len(window)  # the rest of the file belongs to the record before the split point
+    if candidate is not None and _is_consistent(window[candidate:], delimiter, encoding, expected_columns):
+        return offset + candidate
+
+    candidate = find_record_start(window, delimiter, encoding, expected_columns, quote.decode(encoding))
+    return offset + candidate if candidate is not None else None
+
+
+def _is_consistent(data: bytes, delimiter: str, encoding: str, expected_columns: int) -> bool:
+    probe_end = data.rfind(b'\n') + 1
+    if probe_end == 0:
+        return not data.strip()  # at the end of the file
+
+    records, _ = parse_complete_records(data[:probe_end], delimiter, encoding, BOUNDARY_PROBE_RECORDS)
+    return bool(records) and all(len(record) == expected_columns for record in records)
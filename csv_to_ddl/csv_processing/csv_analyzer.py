@@ -1,42 +1,354 @@
+import fnmatch
+import functools
+import io
+import itertools
+import math
+from collections import Counter, deque
 import logging
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from csv_to_ddl.csv_processing.header_detection import HeaderDetection
 from csv_to_ddl.config.config_manager import ConfigManager
-from csv_to_ddl.csv_processing.csv_helpers import find_csv_files, read_csv_file
+from csv_to_ddl.config.constants.csv import ENCODING_DETECTION_SAMPLE_SIZE
+from csv_to_ddl.csv_processing.async_ingestion import AsyncIngestion
+from csv_to_ddl.csv_processing.csv_helpers import (iter_csv_records, parse_lines, read_csv_file, reservoir_sample,
+                                                  sample_csv_blocks)
+from csv_to_ddl.csv_processing.encoding_detection import open_text_stream
+from csv_to_ddl.csv_processing.file_discovery import DiscoveryFilter, find_csv_files, is_csv_name
+from csv_to_ddl.csv_processing.mmap_reader import RawRecordSample
+from csv_to_ddl.csv_processing.record_counting import count_records
+from csv_to_ddl.schema_analysis.columns_and_types.column_profile import RecordCounters, TableProfile
+from csv_to_ddl.schema_analysis.foreign_key.fk_map import Rescan
+from csv_to_ddl.schema_analysis.models.column_store import ColumnStore
 
 
 class CSVAnalyzer:
     def __init__(self):
         self.csv_config = ConfigManager.get_csv_config()
+        self.type_config = ConfigManager.get_type_config()
         self.header_detection = HeaderDetection()
         self.logger = logging.getLogger(__name__)
 
-    def process(self, input_path: Path) -> Tuple[Dict[str, List[str]], Dict[str, List[List[str]]]]:
-        files = find_csv_files(input_path)
+    def process(self, input_path: Path) -> Tuple[Dict[str, List[str]], Dict[str, List[List[str]]],
+                                                  Dict[str, RecordCounters]]:
+        files = find_csv_files(input_path, self.discovery_filter())
         if not files:
             raise ValueError(f"No CSV files found in {input_path}")
 
-        files_data = {}
+        tables_data = self.load_tables(self.group_tables(files, input_path))
+        if not tables_data:
+            raise ValueError("No valid CSV data found")
+
+        return self.create_individual_tables(tables_data)
+
+    def discovery_filter(self) -> DiscoveryFilter:
+        return DiscoveryFilter(self.csv_config.include_patterns, self.csv_config.exclude_patterns,
+                               self.csv_config.max_depth)
+
+    def load_tables(self, tables: Dict[str, List[Path]]) -> Dict[str, Dict]:
+        if self.csv_config.async_concurrency > 0:
+            return AsyncIngestion(self, self.csv_config.async_concurrency, self.csv_config.async_threads,
+                                  self.csv_config.async_small_file_size).load_tables(tables)
+
+        tables_data = {}
+        for table_name, table_files in tables.items():
+            csv_data = self.load_table(table_name, table_files)
+            if csv_data:
+                tables_data[table_name] = csv_data
+        return tables_data
+
+    def load_table(self, table_name: str, table_files: List[Path]) -> Dict:
+        if len(table_files) > 1:
+            return self.load_sharded_table(table_name, table_files)
+        return self.load_csv_file(table_files[0])
+
+    def iter_tables(self, input_path: Path) -> Iterator[Tuple[str, Dict, Rescan]]:
+        """
+        Counterpart of process that loads one table at a time, for
+        SchemaAnalyzer.analyze_table_stream (see iter_loaded_tables).
+        """
+        files = find_csv_files(input_path, self.discovery_filter())
+        if not files:
+            raise ValueError(f"No CSV files found in {input_path}")
+
+        loaded_tables = self.iter_loaded_tables(self.group_tables(files, input_path))
+        first = next(loaded_tables, None)
+        if first is None:
+            raise ValueError("No valid CSV data found")
+        yield first
+        del first
+        yield from loaded_tables
+
+    def iter_loaded_tables(self, tables: Dict[str, List[Path]]) -> Iterator[Tuple[str, Dict, Rescan]]:
+        """
+        Yield every table with valid data: its name, its csv_data and a
+        projected re-scan of its files (see rescan_for).
+
+        A table is only loaded once the previous one has been taken, so the
+        caller decides how many are in memory; with async ingestion all are
+        loaded up front as before, and handed out one by one.
+        """
+        loaded = self.load_tables(tables) if self.csv_config.async_concurrency > 0 else None
+        for table_name, table_files in tables.items():
+            csv_data = loaded.pop(table_name, None) if loaded is not None else self.load_table(table_name, table_files)
+            if csv_data:
+                yield table_name, csv_data, self.rescan_for(table_name, table_files)
+            del csv_data
+
+    def group_tables(self, files: List[Path], input_path: Path) -> Dict[str, List[Path]]:
+        """
+        Assign every input file to a logical table.
+
+        Process:
+        1. A file is a shard when its name matches shard_pattern (grouped by
+           its directory) or, with shard_by_directory, when it lies below a
+           subdirectory of the input (grouped by that top-level subdirectory)
+        2. A shard group becomes one table named after its directory; every
+           other file is a table of its own, named after its stem
+        3. Names claimed by several groups are qualified with their path
+           relative to the input, so files with the same stem in different
+           directories no longer overwrite each other
+
+        Returns:
+            Files of each table keyed by table name, shards in path order
+        """
+        # Directories, archives and directories inside archives are roots; a single file's root is its directory
+        root = input_path if input_path.is_dir() or not is_csv_name(input_path.name) else input_path.parent
+        groups: Dict[Path, List[Path]] = {}
+        base_names: Dict[Path, str] = {}
         for file_path in files:
-            try:
-                rows = read_csv_file(file_path, self.csv_config.sample_size,
-                                     self.csv_config.delimiter_detection_sample_size)
-                if not rows:
-                    self.logger.warning(f"No data found in {file_path}, skipping it")
+            shard_group = self._shard_group(file_path, root)
+            source = shard_group or file_path
+            groups.setdefault(source, []).append(file_path)
+            base_names[source] = shard_group.name if shard_group else self.table_name_for(str(file_path))
+
+        claims = Counter(base_names.values())
+        tables = {}
+        for source, source_files in groups.items():
+            table_name = base_names[source]
+            if claims[table_name] > 1:
+                table_name = '_'.join(source.relative_to(root).parent.parts + (table_name,))
+                if table_name in tables:
+                    table_name = f"{table_name}_{len(tables)}"
+                self.logger.warning(f"Several inputs are named '{base_names[source]}', "
+                                    f"using table name '{table_name}' for {source}")
+            tables[table_name] = sorted(source_files)
+
+        return tables
+
+    def _shard_group(self, file_path: Path, root: Path) -> Optional[Path]:
+        if self.csv_config.shard_pattern and fnmatch.fnmatch(file_path.name, self.csv_config.shard_pattern):
+            return file_path.parent
+        if self.csv_config.shard_by_directory and file_path.parent != root:
+            return root / file_path.relative_to(root).parts[0]
+        return None
+
+    def load_csv_file(self, file_path: Path) -> Dict:
+        try:
+            csv_data = None
+            if self.csv_config.sampling == 'blocks' and not self.csv_config.full_scan:
+                csv_data = self.block_sample_csv_file(file_path)
+
+            if csv_data is None:
+                if self.reads_head_only():
+                    csv_data = self.sample_csv_file(file_path)
                 else:
-                    csv_data = self.get_header_and_data(rows)
-                    if csv_data:
-                        files_data[str(file_path)] = csv_data
-            except Exception as e:
-                self.logger.error(f"Error processing {file_path}: {e}")
+                    csv_data = self.stream_csv_file(file_path)
+        except Exception as e:
+            self.logger.error(f"Error processing {file_path}: {e}")
+            return {}
+
+        if not csv_data:
+            self.logger.warning(f"No data found in {file_path}, skipping it")
+        return csv_data
+
+    def rescan_for(self, table_name: str, table_files: List[Path]) -> Rescan:
+        """
+        A picklable projected re-scan of a table. It reproduces the sample: head
+        samples are the leading records, and random samples are drawn with the
+        run's seed (CSVConfig draws one when --seed is not given).
+        """
+        return functools.partial(rescan_columns, table_name, table_files)
+
+    def reads_head_only(self) -> bool:
+        """True when a single file is analyzed from its leading records alone (head sampling, no full scan)."""
+        return self.csv_config.sampling == 'head' and not self.csv_config.full_scan
+
+    def sample_csv_bytes(self, file_path: Path, data: bytes) -> Dict:
+        """
+        sample_csv_file for a file whose (decompressed) content is already in
+        memory; decoding and parsing are the same as for a file read from disk.
+        """
+        try:
+            with open_text_stream(io.BytesIO(data), ENCODING_DETECTION_SAMPLE_SIZE) as f:
+                records = parse_lines(f, self.csv_config.delimiter_detection_sample_size)
+                rows = list(itertools.islice(records, self.csv_config.sample_size))
+                record_count = len(rows) + sum(1 for _ in records) if self.csv_config.count_rows else None
+        except Exception as e:
+            self.logger.error(f"Error sampling {file_path}: {e}")
+            return {}
+
+        if not rows:
+            self.logger.warning(f"No data found in {file_path}, skipping it")
+            return {}
+
+        csv_data = self.get_header_and_data(rows)
+        if record_count is not None:
+            csv_data['profile'] = RecordCounters.counted(len(csv_data['header']),
+                                                         record_count - (len(rows) - len(csv_data['rows'])))
+        return csv_data
+
+    def sample_csv_file(self, file_path: Path) -> Dict:
+        rows = read_csv_file(file_path, self.csv_config.sample_size,
+                             self.csv_config.delimiter_detection_sample_size, use_mmap=self.csv_config.use_mmap,
+                             pipeline_depth=self.csv_config.pipeline_depth)
+        if not rows:
+            return {}
+
+        csv_data = self.get_header_and_data(rows)
+        if isinstance(csv_data['rows'], RawRecordSample):
+            # Column statistics straight from the raw bytes; only the type detection sample gets decoded
+            profile = TableProfile(len(csv_data['header']), self.type_config.type_detection_sample_size,
+                                   len(csv_data['rows']), self.csv_config.distinct_sketch_size,
+                                   self.csv_config.compact_value_length, self.csv_config.compact_prefix_length)
+            csv_data['rows'].profile_into(profile)
+            csv_data['profile'] = profile
+        if self.csv_config.count_rows:
+            self.apply_record_count(file_path, csv_data, len(rows) - len(csv_data['rows']))
+        return csv_data
+
+    def block_sample_csv_file(self, file_path: Path) -> Optional[Dict]:
+        sample = sample_csv_blocks(file_path, self.csv_config.sample_size,
+                                   self.csv_config.delimiter_detection_sample_size,
+                                   self.csv_config.block_sample_count, self.csv_config.block_sample_size,
+                                   self.csv_config.sampling_seed, self.csv_config.gzip_index_span,
+                                   self.csv_config.gzip_index_dir and Path(self.csv_config.gzip_index_dir))
+        if sample is None:
+            self.logger.debug(f"Block sampling not applicable to {file_path}, streaming it instead")
+            return None
+
+        rows, estimated_row_count = sample
+        csv_data = self.get_header_and_data(rows)
+        csv_data['profile'] = RecordCounters.estimated(len(csv_data['header']),
+                                                       estimated_row_count - (len(rows) - len(csv_data['rows'])))
+        if self.csv_config.count_rows:
+            self.apply_record_count(file_path, csv_data, len(rows) - len(csv_data['rows']))
+        return csv_data
+
+    def apply_record_count(self, file_path: Path, csv_data: Dict, header_rows: int):
+        """Replace the sample's row count with the exact number of data records in the file."""
+        gzip_index_dir = self.csv_config.gzip_index_dir and Path(self.csv_config.gzip_index_dir)
+        row_count = count_records(file_path, self.csv_config.jobs, self.csv_config.delimiter_detection_sample_size,
+                                  self.csv_config.parallel_chunk_size, gzip_index_dir) - header_rows
+        if csv_data.get('profile') is None:
+            csv_data['profile'] = RecordCounters.counted(len(csv_data['header']), row_count)
+        else:
+            csv_data['profile'].row_count = row_count
+        self.logger.info(f"Counted {row_count} records in {file_path}")
+
+    def load_sharded_table(self, table_name: str, shard_paths: List[Path]) -> Dict:
+        """
+        Profile every shard of a partitioned table and merge them into one table.
+
+        Each shard is streamed on its own (see load_shard) and contributes an
+        equal share of the row sample, so the sample spans the whole table.
+        """
+        shard_sample_size = self.shard_sample_size(len(shard_paths))
+        shards = [self.load_shard(shard_path, shard_sample_size) for shard_path in shard_paths]
+        return self.merge_shards(table_name, shard_paths, shards)
+
+    def shard_sample_size(self, shard_count: int) -> int:
+        return math.ceil(self.csv_config.sample_size / shard_count)
+
+    def load_shard(self, file_path: Path, sample_size: int) -> Dict:
+        """Stream one shard into mergeable counters (profiles in full scan mode) plus its share of the sample."""
+        try:
+            return self.stream_csv_file(file_path, sample_size)
+        except Exception as e:
+            self.logger.error(f"Error processing {file_path}: {e}")
+            return {}
+
+    def merge_shards(self, table_name: str, shard_paths: List[Path], shards: List[Dict]) -> Dict:
+        """
+        Combine per-shard results in shard order.
+
+        The header comes from the first readable shard; shards with a different
+        column count are skipped. Row samples are concatenated and the partial
+        profiles merged, which sums record and null counts and unions distinct
+        sets (or sketches) and type samples as if the shards were one file.
+        """
+        merged = {}
+        for shard_path, shard in zip(shard_paths, shards):
+            if not shard:
+                continue
+            if not merged:
+                merged = {'header': shard['header'], 'rows': list(shard['rows']), 'profile': shard['profile']}
                 continue
 
-        if not files_data:
-            raise ValueError("No valid CSV data found")
+            if len(shard['header']) != len(merged['header']):
+                self.logger.warning(f"Skipping {shard_path}: {len(shard['header'])} columns, "
+                                    f"table '{table_name}' has {len(merged['header'])}")
+                continue
+            merged['rows'].extend(shard['rows'])
+            merged['profile'].merge(shard['profile'])
+
+        if merged:
+            self.logger.info(f"Merged {len(shard_paths)} shards into table '{table_name}' "
+                             f"with {merged['profile'].row_count} records")
+        return merged
 
-        return self.create_individual_tables(files_data)
+    def stream_csv_file(self, file_path: Path, sample_size: Optional[int] = None) -> Dict:
+        """
+        Single-pass streaming ingestion of a whole file.
+
+        Process:
+        1. Read the leading records and detect the header on them
+        2. Push every data record through whole-file accumulators:
+           - full scan: incremental column profiles (nulls, distinct values,
+             lengths, type sample)
+           - otherwise: exact record and null counters only
+        3. Draw the row sample from the same stream, either the leading
+           records or a uniform reservoir over the entire file
+
+        Memory stays bounded by the sample and the accumulators regardless of
+        how long the file is. sample_size overrides the configured sample size.
+        """
+        records = iter_csv_records(file_path, self.csv_config.delimiter_detection_sample_size,
+                                   use_mmap=self.csv_config.use_mmap, pipeline_depth=self.csv_config.pipeline_depth)
+        head = list(itertools.islice(records, self.header_detection.header_config.header_data_rows_sample_size))
+        if not head:
+            return {}
+
+        csv_data = self.get_header_and_data(head)
+        column_count = len(csv_data['header'])
+        sample_size = (sample_size or self.csv_config.sample_size) - (len(head) - len(csv_data['rows']))
+
+        if self.csv_config.full_scan:
+            counters = self.create_table_profile(column_count)
+        else:
+            counters = RecordCounters(column_count)
+        data_records = counters.observe(itertools.chain(csv_data['rows'], records))
+
+        # Reservoir sampling is also the fallback when block sampling does not apply (small files, unindexable .gz)
+        if self.csv_config.sampling in ('reservoir', 'blocks'):
+            rows = reservoir_sample(data_records, sample_size, self.csv_config.sampling_seed)
+        else:
+            rows = list(itertools.islice(data_records, sample_size))
+            deque(data_records, maxlen=0)  # drain the rest of the file through the counters
+
+        self.logger.info(f"Streamed {counters.row_count} records of {file_path}, sampled {len(rows)}")
+        csv_data['rows'] = rows
+        csv_data['profile'] = counters
+        return csv_data
+
+    def create_table_profile(self, column_count: int) -> TableProfile:
+        return TableProfile(column_count,
+                            self.type_config.type_detection_sample_size,
+                            self.csv_config.full_scan_distinct_limit,
+                            self.csv_config.distinct_sketch_size,
+                            self.csv_config.compact_value_length,
+                            self.csv_config.compact_prefix_length)
 
     def get_header_and_data(self, rows: List[List[str]]) -> Dict[str, List[str]]:
         if self.header_detection.has_header(rows):
@@ -49,17 +361,34 @@ class CSVAnalyzer:
         return {'header': header, 'rows': data_rows}
 
     @staticmethod
-    def create_individual_tables(files_data: Dict[str, Dict[str, List[str]]]) -> Tuple[
-        Dict[str, List[str]], Dict[str, List[List[str]]]]:
-        tables = {}
-        for file_path, data in files_data.items():
-            table_name = Path(file_path).stem
-            tables[table_name] = data
+    def table_name_for(file_path: str) -> str:
+        return Path(file_path).stem
 
+    @staticmethod
+    def create_individual_tables(tables: Dict[str, Dict]) -> Tuple[
+        Dict[str, List[str]], Dict[str, List[List[str]]], Dict[str, RecordCounters]]:
         tables_headers = {}
         tables_data = {}
+        tables_profiles = {}
         for table_name, table_info in tables.items():
             tables_headers[table_name] = table_info['header']
             tables_data[table_name] = table_info['rows']
+            if table_info.get('profile'):
+                tables_profiles[table_name] = table_info['profile']
+
+        return tables_headers, tables_data, tables_profiles
+
+
+def rescan_columns(table_name: str, table_files: List[Path], columns: List[str]) -> Optional[ColumnStore]:
+    """
+    Projected re-scan of a table whose rows were released: load its row sample
+    again the way it was first loaded and encode only the named columns.
 
-        return tables_headers, tables_data
+    Head samples and random samples (drawn with the run's seed) come back with
+    the same rows (see CSVAnalyzer.rescan_for). With --mmap only the projected columns of the
+    sample are decoded.
+    """
+    csv_data = CSVAnalyzer().load_table(table_name, table_files)
+    if not csv_data:
+        return None
+    return ColumnStore.from_rows(csv_data['header'], csv_data['rows'], columns)
@@ -1,58 +1,498 @@
+import codecs
+import contextlib
 import csv
+import functools
 import gzip
+import io
+import itertools
 import logging
+import math
+import queue
+import random
+import sys
+import threading
+import zlib
 from pathlib import Path
-from typing import List
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from csv_to_ddl.config.constants.csv import (ENCODING_DETECTION_SAMPLE_SIZE, GZIP_INDEX_SPAN, PIPELINE_BATCH_SIZE,
+                                            PIPELINE_BLOCK_SIZE)
+from csv_to_ddl.csv_processing.archives import ArchiveMember, open_archive_member
+from csv_to_ddl.csv_processing.dialect_detection import detect_dialect
+from csv_to_ddl.csv_processing.encoding_detection import detect_encoding, is_ascii_compatible, open_text_stream
+from csv_to_ddl.csv_processing.gzip_index import GzipIndex
+from csv_to_ddl.csv_processing.mmap_reader import MappedCSVFile, iter_mapped_records, read_mapped_sample
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar('T')
 
-def find_csv_files(path: Path) -> List[Path]:
-    if path.is_file():
-        if path.suffix.lower() == '.csv' or path.name.endswith('.csv.gz'):
-            return [path]
-        return []
+PIPELINE_END = object()
+PIPELINE_POLL_INTERVAL = 0.1
+
+
+def is_compressed(path: Path) -> bool:
+    return path.name.lower().endswith('.gz')
+
+def is_random_access(path: Path) -> bool:
+    """True for plain files on disk, the only ones byte-offset readers (mmap, byte ranges) can seek in."""
+    return not is_compressed(path) and not isinstance(path, ArchiveMember)
+
+def open_binary(path: Path) -> BinaryIO:
+    """Raw bytes of a CSV file: .gz files are inflated, archive members streamed out of their archive."""
+    if isinstance(path, ArchiveMember):
+        return open_archive_member(path, gunzip=is_compressed(path))
+    return gzip.open(path, 'rb') if is_compressed(path) else open(path, 'rb')
+
+def open_csv_file(path: Path, encoding: Optional[str] = None,
+                  encoding_sample_size: int = ENCODING_DETECTION_SAMPLE_SIZE):
+    """Open a CSV file as text; the encoding is detected from the raw head when not given."""
+    return open_text_stream(open_binary(path), encoding_sample_size, encoding)
+
+def iter_csv_records(file_path: Path, delimiter_detection_sample_size: int, encoding: Optional[str] = None,
+                     use_mmap: bool = False, pipeline_depth: int = 0) -> Iterator[List[str]]:
+    """
+    Lazily yield every record of a CSV file.
+
+    The dialect is detected on the first lines, which are then replayed in
+    front of the remaining file so records stream through the parser without
+    the file ever being held in memory. Files whose head contains no quote
+    character are parsed by split_records. Uncompressed files can instead be
+    read through the memory-mapped reader when use_mmap is set, and any file
+    through the threaded pipeline of iter_pipelined_records when
+    pipeline_depth is positive.
+    """
+    if use_mmap and is_random_access(file_path):
+        with MappedCSVFile(file_path) as mapped:
+            mapped.encoding = encoding or detect_encoding(mapped.head_bytes(ENCODING_DETECTION_SAMPLE_SIZE))
+            if is_ascii_compatible(mapped.encoding):
+                yield from iter_mapped_records(mapped, delimiter_detection_sample_size)
+                return
+        logger.debug(f"{file_path} is {mapped.encoding}-encoded, reading it without mmap")
+
+    if pipeline_depth > 0:
+        yield from iter_pipelined_records(file_path, delimiter_detection_sample_size, pipeline_depth, encoding)
+        return
+
+    with open_csv_file(file_path, encoding=encoding) as f:
+        yield from parse_lines(f, delimiter_detection_sample_size)
+
+def parse_lines(lines: Iterable[str], delimiter_detection_sample_size: int) -> Iterator[List[str]]:
+    """Detect the dialect on the first lines, then parse them and every following line into records."""
+    lines = iter(lines)
+    head_lines = list(itertools.islice(lines, delimiter_detection_sample_size))
+    if not head_lines:
+        return
+
+    dialect = detect_dialect(''.join(head_lines))
+    lines = itertools.chain(head_lines, lines)
+    if dialect.has_quotes:
+        yield from csv.reader(lines, delimiter=dialect.delimiter, quotechar=dialect.quotechar)
+    else:
+        yield from split_records(lines, dialect.delimiter, dialect.quotechar)
+
+def iter_pipelined_records(file_path: Path, delimiter_detection_sample_size: int, depth: int,
+                           encoding: Optional[str] = None, block_size: int = PIPELINE_BLOCK_SIZE,
+                           batch_size: int = PIPELINE_BATCH_SIZE) -> Iterator[List[str]]:
+    """
+    Read a CSV file through three overlapping stages connected by bounded queues.
+
+    Process:
+    1. Reader thread: reads (and for .gz inflates) raw blocks of block_size
+       bytes; file I/O and zlib release the GIL, so this runs alongside parsing
+    2. Parser thread: decodes the blocks incrementally, cuts them into lines
+       exactly like a text stream (universal newlines, undecodable bytes
+       replaced) and parses them into batches of batch_size records
+    3. The caller consumes the batches record by record
+
+    Each queue holds at most depth items, so a slow consumer blocks the stages
+    before it and memory stays bounded by 2 * depth blocks and batches. Errors
+    raised in a stage are re-raised to the caller, and closing the generator
+    early stops both threads.
+    """
+    raw_blocks = queue.Queue(maxsize=depth)
+    batches = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def read_blocks():
+        try:
+            with open_binary(file_path) as raw:
+                for block in iter(functools.partial(raw.read, block_size), b''):
+                    if not _put_until_stopped(raw_blocks, block, stop):
+                        return
+            _put_until_stopped(raw_blocks, PIPELINE_END, stop)
+        except Exception as e:
+            _put_until_stopped(raw_blocks, _PipelineFailure(e), stop)
+
+    def parse_blocks():
+        try:
+            lines = _decode_lines(_drain_queue(raw_blocks, stop), encoding)
+            records = parse_lines(lines, delimiter_detection_sample_size)
+            for batch in iter(lambda: list(itertools.islice(records, batch_size)), []):
+                if not _put_until_stopped(batches, batch, stop):
+                    return
+            _put_until_stopped(batches, PIPELINE_END, stop)
+        except Exception as e:
+            _put_until_stopped(batches, _PipelineFailure(e), stop)
+
+    stages = [threading.Thread(target=read_blocks, name=f"read {file_path.name}", daemon=True),
+              threading.Thread(target=parse_blocks, name=f"parse {file_path.name}", daemon=True)]
+    for stage in stages:
+        stage.start()
 
-    csv_files = []
     try:
-        csv_files.extend(path.rglob("*.csv"))
-        csv_files.extend(path.rglob("*.CSV"))
-        csv_files.extend(path.rglob("*.csv.gz"))
-    except PermissionError as e:
-        logger.warning(f"Permission denied accessing {path}: {e}")
-
-    logger.info(f"Found {len(csv_files)} CSV files")
-    return csv_files
-
-def open_csv_file(path: Path, encoding: str = 'utf-8'):
-    if path.name.endswith('.gz'):
-        return gzip.open(path, 'rt', encoding=encoding, errors='ignore')
-    return open(path, 'r', encoding=encoding, errors='ignore')
-
-def read_csv_file(file_path: Path, sample_size: int, delimiter_detection_sample_size: int) -> List[List[str]]:
-    rows = []
-    encoding = None
-    encodings_to_try = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
-    sniffer = csv.Sniffer()
-
-    for enc in encodings_to_try:
+        for batch in _drain_queue(batches, stop):
+            yield from batch
+    finally:
+        stop.set()
+        for stage in stages:
+            stage.join()
+
+class _PipelineFailure:
+    """An exception raised inside a pipeline stage, passed downstream in place of data."""
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+def _put_until_stopped(target: queue.Queue, item, stop: threading.Event) -> bool:
+    while not stop.is_set():
         try:
-            with open_csv_file(file_path, encoding=enc) as f:
-                all_lines = [line for line in (f.readline() for _ in range(sample_size)) if line]
-                if all_lines:
-                    sample_text = ''.join(all_lines[:delimiter_detection_sample_size])
-                    delimiter = sniffer.sniff(sample_text).delimiter
-                    rows = list(csv.reader(all_lines, delimiter=delimiter))
-                    encoding = enc
-                    break
-
-        except UnicodeDecodeError:
+            target.put(item, timeout=PIPELINE_POLL_INTERVAL)
+            return True
+        except queue.Full:
             continue
-        except Exception as e:
-            logger.error(f"Error sampling {file_path} with encoding {enc}: {e}")
+    return False
+
+def _drain_queue(source: queue.Queue, stop: threading.Event) -> Iterator:
+    while not stop.is_set():
+        try:
+            item = source.get(timeout=PIPELINE_POLL_INTERVAL)
+        except queue.Empty:
+            continue
+
+        if item is PIPELINE_END:
+            return
+        if isinstance(item, _PipelineFailure):
+            raise item.error
+        yield item
+
+def _decode_lines(blocks: Iterable[bytes], encoding: Optional[str]) -> Iterator[str]:
+    # Same decoding as open_text_stream: encoding detected on the head, newlines translated, errors replaced
+    blocks = iter(blocks)
+    first_block = next(blocks, b'')
+    encoding = encoding or detect_encoding(first_block[:ENCODING_DETECTION_SAMPLE_SIZE])
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(errors='replace'), translate=True)
+
+    partial_line = ''
+    for block in itertools.chain([first_block], blocks):
+        lines = (partial_line + decoder.decode(block)).split('\n')
+        partial_line = lines.pop()
+        for line in lines:
+            yield line + '\n'
+
+    lines = (partial_line + decoder.decode(b'', final=True)).split('\n')
+    for line in lines[:-1]:
+        yield line + '\n'
+    if lines[-1]:
+        yield lines[-1]
+
+def split_records(lines: Iterable[str], delimiter: str, quotechar: str = '"') -> Iterator[List[str]]:
+    """
+    Parse lines with str.split, handing only lines that contain a quote
+    character to csv.reader.
+
+    Gives the same records as csv.reader over the same lines. The reader
+    shares the line iterator, so a quoted field spanning several lines pulls
+    its continuation lines itself and they are not parsed twice.
+    """
+    lines = iter(lines)
+    pending = []
+
+    def quoted_lines() -> Iterator[str]:
+        # csv.reader never reads past the end of a record, so this resumes exactly where it needs the next line
+        while True:
+            if pending:
+                yield pending.pop()
+                continue
+            line = next(lines, None)
+            if line is None:
+                return
+            yield line
+
+    reader = csv.reader(quoted_lines(), delimiter=delimiter, quotechar=quotechar)
+    for line in lines:
+        if quotechar in line:
+            pending.append(line)
+            record = next(reader, None)
+            if record is not None:
+                yield record
             continue
 
-    if encoding is None:
-        logger.warning(f"Could not detect encoding for {file_path}, using utf-8")
+        line = line.rstrip('\r\n')
+        yield line.split(delimiter) if line else []
+
+def read_csv_file(file_path: Path, sample_size: int, delimiter_detection_sample_size: int,
+                  use_mmap: bool = False, pipeline_depth: int = 0) -> Sequence[Sequence[str]]:
+    """Leading sample_size records; with use_mmap an uncompressed file yields a lazily decoded RawRecordSample."""
+    try:
+        if use_mmap and is_random_access(file_path):
+            sample = read_mapped_sample(file_path, sample_size, delimiter_detection_sample_size)
+            if sample is not None:
+                return sample
 
-    return rows
+        records = iter_csv_records(file_path, delimiter_detection_sample_size, use_mmap=use_mmap,
+                                   pipeline_depth=pipeline_depth)
+        with contextlib.closing(records):
+            return list(itertools.islice(records, sample_size))
+    except Exception as e:
+        logger.error(f"Error sampling {file_path}: {e}")
+        return []
+
+def reservoir_sample(records: Iterable[T], size: int, seed: Optional[int] = None) -> List[T]:
+    """
+    Uniform fixed-size sample of a stream of unknown length (reservoir sampling, Algorithm L).
+
+    Every record has the same probability of ending up in the sample no
+    matter where it sits in the file. Instead of drawing a random number per
+    record, Algorithm L draws the gap to the next replacement, so the cost per
+    skipped record is a counter comparison. The sample is returned in file
+    order.
+
+    Args:
+        records: Record stream, consumed exactly once
+        size: Reservoir size
+        seed: Optional seed for reproducible samples
+    """
+    if size <= 0:
+        for _ in records:
+            pass
+        return []
+
+    rng = random.Random(seed)
+    reservoir = []
+    weight = 0.0
+    next_index = 0
+
+    for index, record in enumerate(records):
+        if index < size:
+            reservoir.append((index, record))
+            if index == size - 1:
+                weight = math.exp(math.log(1.0 - rng.random()) / size)
+                next_index = index + _reservoir_gap(rng, weight)
+        elif index == next_index:
+            reservoir[rng.randrange(size)] = (index, record)
+            weight *= math.exp(math.log(1.0 - rng.random()) / size)
+            next_index = index + _reservoir_gap(rng, weight)
+
+    reservoir.sort(key=lambda item: item[0])
+    return [record for _, record in reservoir]
+
+def _reservoir_gap(rng: random.Random, weight: float) -> int:
+    if weight >= 1.0:
+        return 1
+    if weight <= 0.0:
+        return sys.maxsize
+    return int(math.log(1.0 - rng.random()) / math.log1p(-weight)) + 1
+
+def sample_csv_blocks(file_path: Path, sample_size: int, delimiter_detection_sample_size: int,
+                      block_count: int, block_size: int, seed: Optional[int] = None,
+                      gzip_index_span: int = GZIP_INDEX_SPAN,
+                      gzip_index_dir: Optional[Path] = None) -> Optional[Tuple[List[List[str]], int]]:
+    """
+    Seek-based sampling of a large CSV file.
+
+    Process:
+    1. Read the file head once: detect encoding and delimiter and parse the
+       leading records (header candidate and expected column count)
+    2. Split the rest of the file into block_count equal strata and seek to a
+       random offset inside each, so blocks never overlap and cover the
+       whole length of the file
+    3. Resynchronize each block to the next record boundary (quote-aware,
+       see find_record_start) and parse only the complete records in it
+    4. Estimate the total record count from the average bytes per record
+
+    Only about block_count * block_size bytes are read, whatever the file size.
+    Compressed files are read through their gzip access-point index (built on
+    first use and cached), so each block inflates at most one index span.
+
+    Returns:
+        Head records followed by the sampled records in file order, plus the
+        estimated record count; None when the file is too small for block
+        sampling to pay off, not in an ASCII-compatible encoding, compressed
+        without any access points inside its stream, or an archive member
+    """
+    if isinstance(file_path, ArchiveMember):
+        return None
+
+    if is_compressed(file_path):
+        try:
+            index = GzipIndex.load_or_build(file_path, gzip_index_span, gzip_index_dir)
+        except (OSError, EOFError, ValueError, zlib.error) as e:
+            logger.warning(f"Could not index {file_path} for block sampling: {e}")
+            return None
+        if len(index.points) < 2:
+            return None
+        file_size, read_range = index.uncompressed_size, index.read
+    else:
+        file_size, read_range = file_path.stat().st_size, functools.partial(_read_file_range, file_path)
+
+    head = parse_head(read_range(0, ENCODING_DETECTION_SAMPLE_SIZE), delimiter_detection_sample_size)
+    if head is None:
+        return None
+
+    encoding, delimiter, head_records, head_end = head
+    if file_size - head_end < block_count * block_size:
+        return None
+
+    expected_columns = len(head_records[0])
+    records_per_block = max(1, math.ceil((sample_size - len(head_records)) / block_count))
+    rng = random.Random(seed)
+    stratum_size = (file_size - head_end) // block_count
+
+    sampled_records = []
+    parsed_bytes = head_end
+    parsed_records = len(head_records)
+    for stratum in range(block_count):
+        offset = head_end + stratum * stratum_size + rng.randrange(max(1, stratum_size - block_size))
+        block = read_range(offset, block_size)
+
+        record_start = find_record_start(block, delimiter, encoding, expected_columns)
+        if record_start is None:
+            continue
+
+        block = block[record_start:block.rfind(b'\n') + 1]
+        block_records, consumed = parse_complete_records(block, delimiter, encoding)
+        sampled_records.extend(block_records[:records_per_block])
+        parsed_bytes += consumed
+        parsed_records += len(block_records)
+
+    estimated_row_count = len(head_records) + round((file_size - head_end) * parsed_records / parsed_bytes)
+    logger.info(f"Block-sampled {len(sampled_records)} records from {block_count} blocks of {file_path}, "
+                f"estimated {estimated_row_count} records")
+    return head_records + sampled_records, estimated_row_count
+
+def parse_head(head: bytes, delimiter_detection_sample_size: int) -> Optional[Tuple[str, str, List[List[str]], int]]:
+    """
+    Detect encoding and delimiter on the raw head of a file and parse its complete lines.
+
+    Returns:
+        Encoding, delimiter, head records and the byte length of the complete
+        lines; None when there is no complete line or the encoding is not
+        ASCII-compatible (byte-offset readers cannot split it)
+    """
+    head_end = head.rfind(b'\n') + 1
+    encoding = detect_encoding(head)
+    if head_end == 0 or not is_ascii_compatible(encoding):
+        return None
+
+    head_lines = head[:head_end].decode(encoding, 'replace').splitlines(keepends=True)
+    delimiter = detect_dialect(''.join(head_lines[:delimiter_detection_sample_size])).delimiter
+    head_records, _ = parse_complete_records(head[:head_end], delimiter, encoding)
+    if not head_records:
+        return None
+
+    return encoding, delimiter, head_records, head_end
+
+def _read_file_range(path: Path, offset: int, size: int) -> bytes:
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return f.read(size)
+
+def find_record_start(block: bytes, delimiter: str, encoding: str, expected_columns: int,
+                      quotechar: str = '"', max_candidates: int = 16, probe_records: int = 8) -> Optional[int]:
+    """
+    Find the first record boundary in a block read from an arbitrary offset.
+
+    A newline after a random seek may sit inside a quoted multi-line field.
+    The quote state at the start of the block is inferred from the first
+    quote whose role is unambiguous: a quote between a field boundary and
+    ordinary text opens a field, one between text and a field boundary closes
+    it, and the parity of the quotes before it gives the state at the block
+    start. The first newline outside quotes is then the record start.
+
+    The choice is confirmed by parsing a few records and checking they have
+    the expected width; when it fails (or no quote is decisive) each of the
+    first line starts is probed the same way instead.
+
+    Returns:
+        Byte offset of the record start inside the block, None if no candidate is consistent
+    """
+    probe_end = block.rfind(b'\n') + 1
+    quote = quotechar.encode(encoding)
+
+    def is_consistent(candidate: int) -> bool:
+        probe, _ = parse_complete_records(block[candidate:probe_end], delimiter, encoding, probe_records)
+        return bool(probe) and all(len(record) == expected_columns for record in probe)
+
+    inside_quotes = _quote_state_at_start(block, delimiter.encode(encoding), quote)
+    if inside_quotes is not None:
+        candidate = first_newline_outside_quotes(block, quote, inside_quotes)
+        if candidate is not None and is_consistent(candidate):
+            return candidate
+
+    position = 0
+    for _ in range(max_candidates):
+        newline = block.find(b'\n', position)
+        if newline == -1:
+            return None
+
+        candidate = newline + 1
+        if is_consistent(candidate):
+            return candidate
+
+        position = candidate
+
+    return None
+
+def _quote_state_at_start(block: bytes, delimiter: bytes, quote: bytes) -> Optional[bool]:
+    field_boundaries = {delimiter[0], ord('\n'), ord('\r')}
+    quote_byte = quote[0]
+    quotes_before = 0
+
+    position = block.find(quote)
+    while position != -1 and position + 1 < len(block):
+        previous_byte, next_byte = block[position - 1] if position else None, block[position + 1]
+
+        if previous_byte is None:
+            pass  # the byte before the block is unknown
+        elif previous_byte in field_boundaries and next_byte not in field_boundaries and next_byte != quote_byte:
+            return quotes_before % 2 == 1  # opening quote: outside quotes just before it
+        if previous_byte not in field_boundaries and previous_byte != quote_byte and next_byte in field_boundaries:
+            return quotes_before % 2 == 0  # closing quote: inside quotes just before it
+
+        quotes_before += 1
+        position = block.find(quote, position + 1)
+
+    return None
+
+def first_newline_outside_quotes(block: bytes, quote: bytes, inside_quotes: bool) -> Optional[int]:
+    position = 0
+    while True:
+        next_quote = block.find(quote, position)
+        newline = block.find(b'\n', position)
+        if newline == -1:
+            return None
+
+        if next_quote == -1 or newline < next_quote:
+            if not inside_quotes:
+                return newline + 1
+            if next_quote == -1:
+                return None
+            position = next_quote
+            continue
+
+        inside_quotes = not inside_quotes
+        position = next_quote + 1
+
+def parse_complete_records(data: bytes, delimiter: str, encoding: str,
+                            limit: Optional[int] = None) -> Tuple[List[List[str]], int]:
+    """Parse records from a byte range ending at a newline; a trailing record cut mid-quote is dropped."""
+    reader = csv.reader(io.StringIO(data.decode(encoding, 'replace'), newline=''), delimiter=delimiter, strict=True)
+    records = []
+    try:
+        for record in itertools.islice(reader, limit):
+            if record:
+                records.append(record)
+    except csv.Error:
+        pass
+    return records, len(data)
@@ -0,0 +1,76 @@
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Sequence
+
+from csv_to_ddl.config.constants.csv import DIALECT_CANDIDATE_DELIMITERS
+
+QUOTED_FIELD_PATTERNS = {}
+
+
+@dataclass
+class Dialect:
+    delimiter: str
+    quotechar: str = '"'
+    has_quotes: bool = False
+    quote_usage: str = 'none'  # 'none', 'minimal' (some fields quoted) or 'all'
+    consistency: float = 1.0  # share of lines agreeing on the delimiter count
+    stray_quotes: bool = False  # quote characters outside well-formed quoted fields, e.g. 5" in unquoted text
+
+
+def detect_dialect(sample: str, candidates: Sequence[str] = DIALECT_CANDIDATE_DELIMITERS,
+                   quotechar: str = '"') -> Dialect:
+    """
+    Detect the delimiter of a CSV sample from per-line delimiter frequencies.
+
+    Process:
+    1. Blank out quoted fields, so delimiters and newlines inside them do not count
+    2. For every candidate, build a histogram of how often it occurs on each line
+    3. Score a candidate by its consistency: the share of lines on which it
+       occurs exactly as often as on most lines (its most common non-zero count)
+    4. The most consistent candidate wins; ties go to the one listed first
+
+    A sample in which no candidate occurs is a single-column file and gets the
+    first candidate.
+
+    Returns:
+        Delimiter, whether the sample contains quote characters at all, how
+        many of its fields are quoted and whether any quote stands outside a
+        quoted field
+    """
+    quoted_fields = _quoted_field_pattern(quotechar, ''.join(candidates))
+    unquoted = quoted_fields.sub('_', sample)
+    lines = [line for line in unquoted.split('\n') if line.strip()]
+
+    delimiter, consistency = candidates[0], 0.0
+    for candidate in candidates:
+        histogram = Counter(count for count in (line.count(candidate) for line in lines) if count)
+        if not histogram:
+            continue
+
+        candidate_consistency = histogram.most_common(1)[0][1] / len(lines)
+        if candidate_consistency > consistency:
+            delimiter, consistency = candidate, candidate_consistency
+
+    has_quotes = quotechar in sample
+    quote_usage = 'none'
+    stray_quotes = False
+    if has_quotes:
+        field_count = sum(line.count(delimiter) + 1 for line in lines)
+        quoted = quoted_fields.findall(sample)
+        quote_usage = 'all' if len(quoted) >= field_count else 'minimal' if quoted else 'none'
+        stray_quotes = sample.count(quotechar) > sum(field.count(quotechar) for field in quoted)
+
+    return Dialect(delimiter=delimiter, quotechar=quotechar, has_quotes=has_quotes, quote_usage=quote_usage,
+                   consistency=consistency if lines else 1.0, stray_quotes=stray_quotes)
+
+
+def _quoted_field_pattern(quotechar: str, candidates: str) -> re.Pattern:
+    # A quoted field starts and ends at a field boundary; stray quotes inside unquoted text do not pair up
+    key = (quotechar, candidates)
+    if key not in QUOTED_FIELD_PATTERNS:
+        quote = re.escape(quotechar)
+        boundary = re.escape('\r\n' + candidates)
+        QUOTED_FIELD_PATTERNS[key] = re.compile(
+            f'(?<![^{boundary}]){quote}[^{quote}]*(?:{quote}{quote}[^{quote}]*)*{quote}(?![^{boundary}])')
+    return QUOTED_FIELD_PATTERNS[key]
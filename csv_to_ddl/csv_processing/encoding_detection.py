@@ -0,0 +1,99 @@
+import codecs
+import io
+from typing import BinaryIO, Optional
+
+BOM_ENCODINGS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# Bytes 0x80-0x9F that cp1252 leaves undefined; their presence rules cp1252 out
+CP1252_UNDEFINED = {0x81, 0x8D, 0x8F, 0x90, 0x9D}
+
+
+def detect_encoding(raw: bytes) -> str:
+    """
+    Decide the text encoding of a raw byte sample without re-reading the file.
+
+    Process:
+    1. A byte order mark decides immediately (UTF-32/UTF-16/UTF-8 with BOM)
+    2. Pure ASCII and byte sequences that are valid UTF-8 are UTF-8;
+       a multibyte sequence cut off at the end of the sample does not count
+       against it
+    3. Otherwise it is a single-byte encoding: bytes in 0x80-0x9F are C1
+       control characters in latin-1 but printable characters (smart quotes,
+       euro sign, dashes) in cp1252, so their presence selects cp1252 unless
+       one of the five bytes cp1252 leaves undefined also occurs
+
+    Returns:
+        Python codec name
+    """
+    for bom, encoding in BOM_ENCODINGS:
+        if raw.startswith(bom):
+            return encoding
+
+    if raw.isascii():
+        return 'utf-8'
+
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(raw, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+
+    c1_bytes = {byte for byte in raw if 0x80 <= byte <= 0x9F}
+    if c1_bytes and not c1_bytes & CP1252_UNDEFINED:
+        return 'cp1252'
+
+    return 'latin-1'
+
+
+def is_ascii_compatible(encoding: str) -> bool:
+    """True when delimiters, quotes and newlines are single ASCII bytes, as byte-level scanners assume."""
+    return '\n,"'.encode(encoding) == b'\n,"'
+
+
+class ReplayStream(io.RawIOBase):
+    """Binary stream that serves an already-read head buffer before continuing with the source."""
+
+    def __init__(self, head: bytes, source: BinaryIO):
+        super().__init__()
+        self._head = memoryview(head)
+        self._source = source
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._head:
+            size = min(len(buffer), len(self._head))
+            buffer[:size] = self._head[:size]
+            self._head = self._head[size:]
+            return size
+
+        data = self._source.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        self._source.close()
+        super().close()
+
+
+def open_text_stream(source: BinaryIO, sample_size: int, encoding: Optional[str] = None) -> io.TextIOWrapper:
+    """
+    Wrap a binary source (plain or decompressing) in a text stream.
+
+    The first sample_size bytes are read once, used for encoding detection and
+    then replayed into the decoder, so the source - and any decompression
+    behind it - is consumed exactly once. Undecodable bytes are replaced with
+    U+FFFD rather than silently dropped.
+    """
+    head = source.read(sample_size)
+    if encoding is None:
+        encoding = detect_encoding(head)
+
+    return io.TextIOWrapper(io.BufferedReader(ReplayStream(head, source)), encoding=encoding, errors='replace')
@@ -0,0 +1,126 @@
+import fnmatch
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence
+
+from csv_to_ddl.csv_processing.archives import ArchiveMember, is_archive, is_archive_name, list_archive_members
+
+logger = logging.getLogger(__name__)
+
+CSV_SUFFIXES = ('.csv', '.csv.gz')
+
+
+def is_csv_name(name: str) -> bool:
+    return name.lower().endswith(CSV_SUFFIXES)
+
+
+@dataclass(frozen=True)
+class DiscoveredFile:
+    path: Path
+    size: int  # bytes on disk; uncompressed bytes for archive members
+
+
+@dataclass(frozen=True)
+class DiscoveryFilter:
+    """
+    Which files of a tree are inputs. Globs match a path relative to the root
+    (posix separators) or its name alone; exclude also prunes directories.
+    max_depth counts directory levels below the root, archives included
+    (0 keeps only the root's own files, None descends without limit).
+    """
+    include: Sequence[str] = ()
+    exclude: Sequence[str] = ()
+    max_depth: Optional[int] = None
+
+    def descends(self, relative: str, depth: int) -> bool:
+        """Whether to walk a directory whose files sit at the given depth."""
+        return (self.max_depth is None or depth <= self.max_depth) and not _matches(self.exclude, relative)
+
+    def selects(self, relative: str) -> bool:
+        if not is_csv_name(relative) or _matches(self.exclude, relative):
+            return False
+        return not self.include or _matches(self.include, relative)
+
+
+def _matches(patterns: Sequence[str], relative: str) -> bool:
+    name = relative.rsplit('/', 1)[-1]
+    return any(fnmatch.fnmatch(relative, pattern) or fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+def discover_csv_files(path: Path, discovery_filter: DiscoveryFilter = DiscoveryFilter()) -> Iterator[DiscoveredFile]:
+    """
+    Lazily yield the CSV files of an input path with their sizes.
+
+    Process:
+    1. A single file is its own input; an archive, or a directory inside one
+       (data.zip/olist), is listed from the archive
+    2. A directory is walked once with os.scandir, depth first in name
+       order; entry types come from the directory listing, so only matching
+       files are stat'ed (for their size)
+    3. .csv and .csv.gz names match in any letter case; archives found on
+       the way (.zip, .tar, .tar.gz) are listed like directories and their
+       CSV members yielded as ArchiveMember paths
+
+    Files are yielded as the walk reaches them; unreadable directories are
+    logged and skipped.
+    """
+    member_directory = ArchiveMember.from_path(path) if not path.exists() else None
+    if member_directory is not None:
+        yield from _archive_files(member_directory.archive, '', 0, discovery_filter,
+                                  member_directory.member_name)
+        return
+
+    if path.is_file():
+        if is_archive(path):
+            yield from _archive_files(path, '', 0, discovery_filter)
+        elif is_csv_name(path.name):
+            yield DiscoveredFile(path, path.stat().st_size)
+        return
+
+    directories = [(path, '', 0)]  # stack of (directory, its path relative to the root, depth of its files)
+    while directories:
+        directory, relative_directory, depth = directories.pop()
+        try:
+            with os.scandir(directory) as scanner:
+                entries = sorted(scanner, key=lambda entry: entry.name)
+        except OSError as e:
+            logger.warning(f"Cannot read directory {directory}: {e}")
+            continue
+
+        subdirectories = []
+        for entry in entries:
+            relative = relative_directory + entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if discovery_filter.descends(relative, depth + 1):
+                        subdirectories.append((Path(entry.path), relative + '/', depth + 1))
+                elif not entry.is_file():
+                    continue
+                elif is_archive_name(entry.name):
+                    if discovery_filter.descends(relative, depth + 1):
+                        yield from _archive_files(Path(entry.path), relative + '/', depth + 1, discovery_filter)
+                elif discovery_filter.selects(relative):
+                    yield DiscoveredFile(Path(entry.path), entry.stat().st_size)
+            except OSError as e:
+                logger.warning(f"Cannot read {entry.path}: {e}")
+
+        directories.extend(reversed(subdirectories))
+
+
+def _archive_files(archive: Path, relative_archive: str, depth: int, discovery_filter: DiscoveryFilter,
+                   prefix: str = '') -> Iterator[DiscoveredFile]:
+    # depth is that of the files at the top of the archive (or of the prefix directory)
+    for member, size in list_archive_members(archive, prefix):
+        parts = Path(member.member_name[len(prefix):].lstrip('/')).parts or (member.name,)
+        directories_kept = all(discovery_filter.descends(relative_archive + '/'.join(parts[:i]), depth + i)
+                               for i in range(1, len(parts)))
+        if directories_kept and discovery_filter.selects(relative_archive + '/'.join(parts)):
+            yield DiscoveredFile(member, size)
+
+
+def find_csv_files(path: Path, discovery_filter: DiscoveryFilter = DiscoveryFilter()) -> List[Path]:
+    csv_files = [discovered.path for discovered in discover_csv_files(path, discovery_filter)]
+    logger.info(f"Found {len(csv_files)} CSV files")
+    return csv_files
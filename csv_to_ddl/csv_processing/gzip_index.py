@@ -0,0 +1,451 @@
+import bisect
+import ctypes
+import ctypes.util
+import functools
+import hashlib
+import logging
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = '.zidx'
+INDEX_MAGIC = b'CSVZIDX1'
+INDEX_HEADER = struct.Struct('<8sQqQBI')  # magic, file size, mtime_ns, uncompressed size, kind, point count
+INDEX_POINT = struct.Struct('<QQBI')  # uncompressed offset, compressed offset, bits, window length
+NO_WINDOW = 0xFFFFFFFF
+
+INDEX_KINDS = ('members', 'bgzf', 'blocks')
+
+INPUT_CHUNK_SIZE = 32768
+OUTPUT_CHUNK_SIZE = 262144
+WINDOW_SIZE = 32768
+BGZF_HEADER_SIZE = 18
+
+# zlib constants needed to drive inflate() block by block
+Z_OK = 0
+Z_STREAM_END = 1
+Z_BUF_ERROR = -5
+Z_BLOCK = 5
+GZIP_WINDOW_BITS = 31
+AUTO_HEADER_WINDOW_BITS = 47
+RAW_WINDOW_BITS = -15
+
+
+@dataclass
+class AccessPoint:
+    """
+    Position in a gzip file from which decompression can start.
+
+    A point at a gzip member start needs nothing but the offset. A point
+    inside a member sits on a deflate block boundary and carries the
+    bit offset into its first byte plus the 32 KiB of history that back
+    references may reach (stored zlib-compressed).
+    """
+    uncompressed_offset: int
+    compressed_offset: int
+    bits: int = 0
+    window: Optional[bytes] = None
+
+    @property
+    def is_member_start(self) -> bool:
+        return self.window is None
+
+
+class _ZStream(ctypes.Structure):
+    _fields_ = [
+        ('next_in', ctypes.c_void_p), ('avail_in', ctypes.c_uint), ('total_in', ctypes.c_ulong),
+        ('next_out', ctypes.c_void_p), ('avail_out', ctypes.c_uint), ('total_out', ctypes.c_ulong),
+        ('msg', ctypes.c_char_p), ('state', ctypes.c_void_p),
+        ('zalloc', ctypes.c_void_p), ('zfree', ctypes.c_void_p), ('opaque', ctypes.c_void_p),
+        ('data_type', ctypes.c_int), ('adler', ctypes.c_ulong), ('reserved', ctypes.c_ulong),
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def _load_libz():
+    """
+    The zlib shared library, for inflate(Z_BLOCK) and inflateGetDictionary, which the
+    zlib module does not expose. None when it cannot be loaded; indexes then fall
+    back to member boundaries only.
+    """
+    name = ctypes.util.find_library('z') or ctypes.util.find_library('zlib1')
+    if not name:
+        return None
+
+    try:
+        libz = ctypes.CDLL(name)
+    except OSError:
+        return None
+    if not hasattr(libz, 'inflateGetDictionary'):
+        return None
+
+    stream_pointer = ctypes.POINTER(_ZStream)
+    libz.zlibVersion.restype = ctypes.c_char_p
+    libz.inflateInit2_.argtypes = [stream_pointer, ctypes.c_int, ctypes.c_char_p, ctypes.c_int]
+    libz.inflate.argtypes = [stream_pointer, ctypes.c_int]
+    libz.inflateReset.argtypes = [stream_pointer]
+    libz.inflateEnd.argtypes = [stream_pointer]
+    libz.inflateGetDictionary.argtypes = [stream_pointer, ctypes.c_void_p, ctypes.POINTER(ctypes.c_uint)]
+    return libz
+
+
+def index_path_for(path: Path, cache_dir: Optional[Path] = None) -> Path:
+    """Cached index location: next to the file, or in cache_dir under a name unique to the file's path."""
+    if cache_dir is None:
+        return path.with_name(path.name + INDEX_SUFFIX)
+
+    digest = hashlib.blake2b(str(path.resolve()).encode('utf-8', 'surrogatepass'), digest_size=8).hexdigest()
+    return Path(cache_dir) / f"{path.name}.{digest}{INDEX_SUFFIX}"
+
+
+class GzipIndex:
+    """
+    Access-point index over a gzip file (the zran technique), enabling random
+    reads at any uncompressed offset and independent decompression of ranges.
+
+    Three layouts are recognized:
+    - bgzf: every block is a gzip member whose size is stored in its header, so
+      the index is built by hopping from header to header without decompressing
+    - blocks: access points every span bytes on deflate block boundaries, plus
+      every member start; built in one inflate pass through libz
+    - members: member starts only, when libz is unavailable
+    """
+
+    def __init__(self, path: Path, points: List[AccessPoint], uncompressed_size: int, kind: str):
+        self.path = path
+        self.points = points
+        self.uncompressed_size = uncompressed_size
+        self.kind = kind
+
+        self._uncompressed_offsets = [point.uncompressed_offset for point in points]
+        self._member_offsets = [point.compressed_offset for point in points if point.is_member_start]
+        self._member_indexes = [i for i, point in enumerate(points) if point.is_member_start]
+
+    @property
+    def member_count(self) -> int:
+        return len(self._member_offsets)
+
+    @classmethod
+    def build(cls, path: Path, span: int) -> 'GzipIndex':
+        if _bgzf_block_size(_read_header(path)) is not None:
+            points, uncompressed_size = _build_bgzf_points(path)
+            kind = 'bgzf'
+        elif _load_libz() is not None:
+            points, uncompressed_size = _build_block_points(path, span)
+            kind = 'blocks'
+        else:
+            points, uncompressed_size = _build_member_points(path)
+            kind = 'members'
+
+        logger.info(f"Indexed {path}: {len(points)} access points ({kind}), {uncompressed_size} bytes uncompressed")
+        return cls(path, points, uncompressed_size, kind)
+
+    @classmethod
+    def load(cls, path: Path, index_path: Path) -> Optional['GzipIndex']:
+        """Read a cached index; None when it is missing, unreadable or older than the file."""
+        try:
+            data = index_path.read_bytes()
+            stat = path.stat()
+            magic, file_size, mtime_ns, uncompressed_size, kind, point_count = INDEX_HEADER.unpack_from(data)
+            if magic != INDEX_MAGIC or file_size != stat.st_size or mtime_ns != stat.st_mtime_ns:
+                return None
+
+            points = []
+            position = INDEX_HEADER.size
+            for _ in range(point_count):
+                uncompressed_offset, compressed_offset, bits, window_length = INDEX_POINT.unpack_from(data, position)
+                position += INDEX_POINT.size
+                window = None
+                if window_length != NO_WINDOW:
+                    window = data[position:position + window_length]
+                    position += window_length
+                points.append(AccessPoint(uncompressed_offset, compressed_offset, bits, window))
+
+            return cls(path, points, uncompressed_size, INDEX_KINDS[kind])
+        except FileNotFoundError:
+            return None
+        except (OSError, struct.error, IndexError) as e:
+            logger.debug(f"Ignoring unreadable gzip index {index_path}: {e}")
+            return None
+
+    def save(self, index_path: Path):
+        stat = self.path.stat()
+        parts = [INDEX_HEADER.pack(INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, self.uncompressed_size,
+                                   INDEX_KINDS.index(self.kind), len(self.points))]
+        for point in self.points:
+            window_length = NO_WINDOW if point.window is None else len(point.window)
+            parts.append(INDEX_POINT.pack(point.uncompressed_offset, point.compressed_offset, point.bits,
+                                          window_length))
+            if point.window is not None:
+                parts.append(point.window)
+
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = index_path.with_name(index_path.name + '.tmp')
+        temporary_path.write_bytes(b''.join(parts))
+        os.replace(temporary_path, index_path)
+
+    @classmethod
+    def load_or_build(cls, path: Path, span: int, cache_dir: Optional[Path] = None) -> 'GzipIndex':
+        index_path = index_path_for(path, cache_dir)
+        index = cls.load(path, index_path)
+        if index is not None:
+            return index
+
+        index = cls.build(path, span)
+        if len(index.points) < 2:
+            return index  # a single point at offset 0 is cheaper to rebuild than to cache
+
+        try:
+            index.save(index_path)
+        except OSError as e:
+            logger.warning(f"Could not cache gzip index for {path} at {index_path}: {e}")
+        return index
+
+    def iter_range(self, start: int, end: Optional[int] = None) -> Iterator[bytes]:
+        """Decompressed bytes from start to end, inflating only from the nearest preceding access point."""
+        end = self.uncompressed_size if end is None else min(end, self.uncompressed_size)
+        if start >= end:
+            return
+
+        point_index = bisect.bisect_right(self._uncompressed_offsets, start) - 1
+        position = self.points[point_index].uncompressed_offset
+        with open(self.path, 'rb') as f:
+            for data in self._inflate_from(f, point_index):
+                data_end = position + len(data)
+                if data_end > start:
+                    yield data[max(0, start - position):end - position]
+                position = data_end
+                if position >= end:
+                    return
+
+    def read(self, offset: int, size: int) -> bytes:
+        return b''.join(self.iter_range(offset, offset + size))
+
+    def split(self, part_count: int) -> List[Tuple[int, int]]:
+        """
+        Cut the uncompressed data into at most part_count consecutive ranges
+        that each start on an access point, so each can be inflated on its own
+        without decompressing anything before it.
+        """
+        if self.uncompressed_size == 0:
+            return []
+
+        boundaries = {0}
+        for part in range(1, part_count):
+            target = part * self.uncompressed_size // part_count
+            point_index = bisect.bisect_right(self._uncompressed_offsets, target) - 1
+            boundaries.add(self._uncompressed_offsets[point_index])
+        boundaries = sorted(boundaries) + [self.uncompressed_size]
+
+        return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if start < end]
+
+    def _inflate_from(self, f: BinaryIO, point_index: int) -> Iterator[bytes]:
+        while point_index is not None:
+            point = self.points[point_index]
+            if point.is_member_start:
+                f.seek(point.compressed_offset)
+                source = iter(functools.partial(f.read, INPUT_CHUNK_SIZE), b'')
+                decompressor = zlib.decompressobj(GZIP_WINDOW_BITS)
+            else:
+                source = _bit_shifted_chunks(f, point.compressed_offset, point.bits)
+                decompressor = zlib.decompressobj(RAW_WINDOW_BITS, zdict=zlib.decompress(point.window))
+
+            for chunk in source:
+                data = decompressor.decompress(chunk)
+                if data:
+                    yield data
+                if decompressor.eof:
+                    break
+            else:
+                return
+
+            # The member ended; carry on at the next member start (gzip trailers are not byte-shifted)
+            point_index = self._next_member(point.compressed_offset)
+
+    def _next_member(self, compressed_offset: int) -> Optional[int]:
+        position = bisect.bisect_right(self._member_offsets, compressed_offset)
+        return self._member_indexes[position] if position < len(self._member_indexes) else None
+
+
+def iter_decompressed_parallel(index: GzipIndex, jobs: int, part_size: int) -> Iterator[bytes]:
+    """
+    Decompress a whole indexed file with up to jobs threads, yielding ranges in
+    file order. zlib releases the GIL while inflating, so threads run in
+    parallel; at most 2 * jobs ranges are held in memory at a time.
+    """
+    ranges = index.split(max(1, -(-index.uncompressed_size // part_size)))
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        for start, end in ranges:
+            pending.append(executor.submit(index.read, start, end - start))
+            if len(pending) >= 2 * jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _read_header(path: Path) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read(BGZF_HEADER_SIZE)
+
+
+def _bgzf_block_size(header: bytes) -> Optional[int]:
+    """Total size of a BGZF block from its header's 'BC' extra subfield, None for any other gzip member."""
+    if len(header) < BGZF_HEADER_SIZE or header[:4] != b'\x1f\x8b\x08\x04':
+        return None
+
+    extra_length, = struct.unpack_from('<H', header, 10)
+    if extra_length < 6 or header[12:14] != b'BC' or header[14:16] != b'\x02\x00':
+        return None
+    return struct.unpack_from('<H', header, 16)[0] + 1
+
+
+def _build_bgzf_points(path: Path) -> Tuple[List[AccessPoint], int]:
+    points = []
+    uncompressed_size = 0
+    compressed_offset = 0
+    file_size = path.stat().st_size
+
+    with open(path, 'rb') as f:
+        while compressed_offset < file_size:
+            f.seek(compressed_offset)
+            block_size = _bgzf_block_size(f.read(BGZF_HEADER_SIZE))
+            if block_size is None:
+                raise ValueError(f"Invalid BGZF block at offset {compressed_offset} of {path}")
+
+            f.seek(compressed_offset + block_size - 4)
+            block_uncompressed_size, = struct.unpack('<I', f.read(4))
+            points.append(AccessPoint(uncompressed_size, compressed_offset))
+            uncompressed_size += block_uncompressed_size
+            compressed_offset += block_size
+
+    return points, uncompressed_size
+
+
+def _build_block_points(path: Path, span: int) -> Tuple[List[AccessPoint], int]:
+    """
+    One inflate pass with Z_BLOCK, which returns control at every deflate block
+    boundary. Every span uncompressed bytes a boundary becomes an access point
+    together with inflate's current 32 KiB window; each new gzip member start
+    becomes an access point as well.
+    """
+    libz = _load_libz()
+    stream = _ZStream()
+    if libz.inflateInit2_(ctypes.byref(stream), AUTO_HEADER_WINDOW_BITS, libz.zlibVersion(),
+                          ctypes.sizeof(stream)) != Z_OK:
+        raise zlib.error("inflateInit2 failed")
+
+    input_buffer = ctypes.create_string_buffer(INPUT_CHUNK_SIZE)
+    output_buffer = ctypes.create_string_buffer(OUTPUT_CHUNK_SIZE)
+    window_buffer = ctypes.create_string_buffer(WINDOW_SIZE)
+    window_length = ctypes.c_uint()
+
+    points = []
+    total_in = total_out = last_point_out = 0
+    in_member = False
+    try:
+        with open(path, 'rb') as f:
+            while True:
+                if stream.avail_in == 0:
+                    read = f.readinto(input_buffer)
+                    if not read:
+                        break
+                    stream.next_in = ctypes.addressof(input_buffer)
+                    stream.avail_in = read
+
+                if not in_member:
+                    if ctypes.string_at(stream.next_in, 1) != b'\x1f':
+                        logger.warning(f"Ignoring trailing data after the last gzip member of {path}")
+                        break
+                    libz.inflateReset(ctypes.byref(stream))
+                    points.append(AccessPoint(total_out, total_in))
+                    last_point_out = total_out
+                    in_member = True
+
+                stream.next_out = ctypes.addressof(output_buffer)
+                stream.avail_out = OUTPUT_CHUNK_SIZE
+                avail_in = stream.avail_in
+                result = libz.inflate(ctypes.byref(stream), Z_BLOCK)
+                total_in += avail_in - stream.avail_in
+                total_out += OUTPUT_CHUNK_SIZE - stream.avail_out
+
+                if result == Z_STREAM_END:
+                    in_member = False
+                    continue
+                if result not in (Z_OK, Z_BUF_ERROR):
+                    raise zlib.error(f"Error {result} inflating {path}: {stream.msg}")
+
+                at_block_boundary = stream.data_type & 128 and not stream.data_type & 64
+                if at_block_boundary and total_out - last_point_out > span:
+                    libz.inflateGetDictionary(ctypes.byref(stream), window_buffer, ctypes.byref(window_length))
+                    window = zlib.compress(window_buffer.raw[:window_length.value])
+                    points.append(AccessPoint(total_out, total_in, stream.data_type & 7, window))
+                    last_point_out = total_out
+    finally:
+        libz.inflateEnd(ctypes.byref(stream))
+
+    if in_member:
+        raise EOFError(f"Compressed file ended before the end-of-stream marker: {path}")
+    return points, total_out
+
+
+def _build_member_points(path: Path) -> Tuple[List[AccessPoint], int]:
+    """Member boundaries found with the zlib module alone: each member's decompressor reports eof and unused_data."""
+    points = []
+    total_out = 0
+    position = 0  # file offset of the first byte of pending
+    pending = b''
+    decompressor = None
+
+    with open(path, 'rb') as f:
+        while True:
+            if not pending:
+                pending = f.read(INPUT_CHUNK_SIZE)
+                if not pending:
+                    break
+
+            if decompressor is None:
+                if pending[:1] != b'\x1f':
+                    logger.warning(f"Ignoring trailing data after the last gzip member of {path}")
+                    break
+                points.append(AccessPoint(total_out, position))
+                decompressor = zlib.decompressobj(GZIP_WINDOW_BITS)
+
+            chunk, pending = pending, b''
+            total_out += len(decompressor.decompress(chunk))
+            if decompressor.eof:
+                pending = decompressor.unused_data
+                decompressor = None
+            position += len(chunk) - len(pending)
+
+    if decompressor is not None:
+        raise EOFError(f"Compressed file ended before the end-of-stream marker: {path}")
+    return points, total_out
+
+
+def _bit_shifted_chunks(f: BinaryIO, offset: int, bits: int) -> Iterator[bytes]:
+    """
+    Compressed input starting mid-byte: the deflate stream resumes at the top
+    `bits` bits of the byte before offset, so every byte is rebuilt from two
+    neighbours, leaving the stream byte-aligned for a raw zlib decompressor.
+    """
+    if bits == 0:
+        f.seek(offset)
+        yield from iter(functools.partial(f.read, INPUT_CHUNK_SIZE), b'')
+        return
+
+    f.seek(offset - 1)
+    previous = f.read(1)
+    shift = 8 - bits
+    for chunk in iter(functools.partial(f.read, INPUT_CHUNK_SIZE), b''):
+        shifted = int.from_bytes(previous + chunk, 'little') >> shift
+        yield shifted.to_bytes(len(chunk) + 1, 'little')[:len(chunk)]
+        previous = chunk[-1:]
+    yield bytes([previous[0] >> shift])
@@ -0,0 +1,49 @@
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+
+from csv_to_ddl.config.constants.csv import ENCODING_DETECTION_SAMPLE_SIZE
+from csv_to_ddl.csv_processing.csv_helpers import open_binary, parse_head
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class LayoutFingerprint:
+    """What two files must share to be analyzed as the same layout."""
+    delimiter: str
+    header: Tuple[str, ...]  # stripped tokens of the first record, header or not
+    column_count: int
+    encoding: str
+
+
+def fingerprint_file(file_path: Path, delimiter_detection_sample_size: int,
+                     head_size: int = ENCODING_DETECTION_SAMPLE_SIZE) -> Optional[LayoutFingerprint]:
+    """
+    Fingerprint a file from its raw head without running header detection.
+
+    The delimiter is detected on the head, and the layout is the delimiter,
+    the tokens of the first record and the widest record of the head. Files
+    with a header row share the fingerprint of their header; headerless
+    files almost never agree on their first record and stay on their own.
+
+    Returns:
+        The fingerprint, or None when the head cannot be parsed (no complete
+        line or an encoding the byte-level parser does not handle)
+    """
+    try:
+        with open_binary(file_path) as f:
+            head = parse_head(f.read(head_size), delimiter_detection_sample_size)
+    except (OSError, EOFError) as e:
+        logger.debug(f"Cannot fingerprint {file_path}: {e}")
+        return None
+
+    if head is None:
+        return None
+
+    encoding, delimiter, records, _ = head
+    return LayoutFingerprint(delimiter=delimiter,
+                             header=tuple(token.strip() for token in records[0]),
+                             column_count=max(len(record) for record in records),
+                             encoding=encoding)
@@ -0,0 +1,390 @@
+import itertools
+import logging
+import mmap
+import os
+from array import array
+from collections import abc
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from csv_to_ddl.config.constants.csv import ENCODING_DETECTION_SAMPLE_SIZE
+from csv_to_ddl.csv_processing.dialect_detection import detect_dialect
+from csv_to_ddl.csv_processing.encoding_detection import detect_encoding, is_ascii_compatible
+
+logger = logging.getLogger(__name__)
+
+# (start, end, escaped) byte offsets of a field; escaped marks doubled quotes inside a quoted field
+FieldSpan = Tuple[int, int, bool]
+
+
+class MappedCSVFile:
+    """
+    Zero-copy reader over a memory-mapped, uncompressed CSV file.
+
+    Record boundaries and field offsets are located with mmap.find directly
+    on the mapped bytes, so nothing is decoded or copied until a caller asks
+    for a value. Fields are exposed as memoryview slices of the mapping and
+    only the requested columns of the requested records are turned into str.
+    The mapping is backed by the OS page cache, which repeated runs over the
+    same file share.
+    """
+
+    def __init__(self, path: Path, delimiter: str = ',', quotechar: str = '"', encoding: str = 'utf-8'):
+        self.path = path
+        self.encoding = encoding
+        self.delimiter = delimiter
+        self.quotechar = quotechar
+
+        self._file = open(path, 'rb')
+        self.size = os.fstat(self._file.fileno()).st_size
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+        if self._mmap is not None and hasattr(self._mmap, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+            self._mmap.madvise(mmap.MADV_SEQUENTIAL)
+        self.buffer = memoryview(self._mmap) if self._mmap is not None else memoryview(b'')
+
+    @property
+    def delimiter(self) -> str:
+        return self._delimiter.decode(self.encoding)
+
+    @delimiter.setter
+    def delimiter(self, value: str):
+        self._delimiter = value.encode(self.encoding)
+
+    @property
+    def quotechar(self) -> str:
+        return self._quotechar.decode(self.encoding)
+
+    @quotechar.setter
+    def quotechar(self, value: str):
+        self._quotechar = value.encode(self.encoding)
+        self._quote_byte = self._quotechar[0]
+
+    def __enter__(self) -> 'MappedCSVFile':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self.buffer.release()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Field views handed out to callers are still alive; the mapping is freed with them
+                logger.debug(f"Deferring unmap of {self.path}, field views still referenced")
+        self._file.close()
+
+    def head_bytes(self, size: int) -> bytes:
+        return bytes(self.buffer[:size])
+
+    def head_text(self, line_count: int) -> str:
+        end = 0
+        for _ in range(line_count):
+            newline = self._find(b'\n', end, self.size)
+            if newline == -1:
+                end = self.size
+                break
+            end = newline + 1
+        return self.decode(0, end)
+
+    def record_spans(self, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+        """
+        Yield (start, end) byte offsets of every record, line terminator excluded.
+
+        Lines without a quote character end at the next newline. Lines that
+        contain one are walked field by field, so newlines embedded in quoted
+        fields do not split the record.
+        """
+        end = self.size if end is None else end
+        position = start
+
+        while position < end:
+            newline = self._find(b'\n', position, end)
+            record_end = newline if newline != -1 else end
+
+            if self._find(self._quotechar, position, record_end) != -1:
+                record_end = self._quoted_record_end(position, end)
+
+            stop = record_end
+            if stop > position and self._mmap[stop - 1] == 0x0D:  # '\r'
+                stop -= 1
+
+            yield position, stop
+            position = record_end + 1
+
+    def field_spans(self, start: int, end: int) -> List[FieldSpan]:
+        if start == end:
+            return []
+
+        if self._find(self._quotechar, start, end) == -1:
+            return self._plain_field_spans(start, end)
+
+        return self._quoted_field_spans(start, end)
+
+    def records(self, limit: Optional[int] = None) -> Iterator[List[memoryview]]:
+        """Yield records as lists of memoryview slices; quoted fields are returned without their quotes."""
+        for start, end in itertools.islice(self.record_spans(), limit):
+            yield [self.buffer[field_start:field_end] for field_start, field_end, _ in self.field_spans(start, end)]
+
+    def decoded_records(self, limit: Optional[int] = None) -> Iterator[List[str]]:
+        for start, end in itertools.islice(self.record_spans(), limit):
+            yield [self.decode_field(span) for span in self.field_spans(start, end)]
+
+    def project(self, columns: Sequence[int], limit: Optional[int] = None,
+                skip_records: int = 0) -> Dict[int, List[str]]:
+        """Materialize only the given column indexes, leaving every other field undecoded."""
+        projected = {index: [] for index in columns}
+
+        spans = itertools.islice(self.record_spans(), skip_records, None if limit is None else skip_records + limit)
+        for start, end in spans:
+            fields = self.field_spans(start, end)
+            for index in columns:
+                projected[index].append(self.decode_field(fields[index]) if index < len(fields) else '')
+
+        return projected
+
+    def decode(self, start: int, end: int) -> str:
+        return str(self._mmap[start:end], self.encoding, 'replace') if self._mmap is not None else ''
+
+    def decode_field(self, span: FieldSpan) -> str:
+        start, end, escaped = span
+        value = self.decode(start, end)
+        if escaped:
+            value = value.replace(self.quotechar * 2, self.quotechar)
+        return value
+
+    def _find(self, sub: bytes, start: int, end: int) -> int:
+        if self._mmap is None:
+            return -1
+        return self._mmap.find(sub, start, end)
+
+    def _quoted_record_end(self, position: int, end: int) -> int:
+        # Quotes only open a quoted field at the start of a field, as in csv.reader
+        cursor = position
+        newline = self._line_end(cursor, end)
+
+        while True:
+            if cursor < end and self._mmap[cursor] == self._quote_byte:
+                closing_quote, _ = self._closing_quote(cursor + 1, end)
+                cursor = min(closing_quote + 1, end)
+                if cursor > newline:
+                    newline = self._line_end(cursor, end)
+
+            delimiter = self._find(self._delimiter, cursor, newline)
+            if delimiter == -1:
+                return newline
+            cursor = delimiter + len(self._delimiter)
+
+    def _line_end(self, position: int, end: int) -> int:
+        newline = self._find(b'\n', position, end)
+        return newline if newline != -1 else end
+
+    def _plain_field_spans(self, start: int, end: int) -> List[FieldSpan]:
+        spans = []
+        cursor = start
+
+        while True:
+            delimiter = self._find(self._delimiter, cursor, end)
+            if delimiter == -1:
+                spans.append((cursor, end, False))
+                return spans
+            spans.append((cursor, delimiter, False))
+            cursor = delimiter + len(self._delimiter)
+
+    def _quoted_field_spans(self, start: int, end: int) -> List[FieldSpan]:
+        spans = []
+        cursor = start
+
+        while True:
+            if cursor < end and self._mmap[cursor] == self._quote_byte:
+                field_start = cursor + 1
+                field_end, escaped = self._closing_quote(field_start, end)
+                spans.append((field_start, field_end, escaped))
+                delimiter = self._find(self._delimiter, min(field_end + 1, end), end)
+            else:
+                delimiter = self._find(self._delimiter, cursor, end)
+                spans.append((cursor, delimiter if delimiter != -1 else end, False))
+
+            if delimiter == -1:
+                return spans
+            cursor = delimiter + len(self._delimiter)
+
+    def _closing_quote(self, position: int, end: int) -> Tuple[int, bool]:
+        escaped = False
+
+        while True:
+            quote = self._find(self._quotechar, position, end)
+            if quote == -1:
+                return end, escaped
+            if quote + 1 < end and self._mmap[quote + 1] == self._quote_byte:
+                escaped = True
+                position = quote + 2
+                continue
+            return quote, escaped
+
+
+class RawRecordSample(abc.Sequence):
+    """
+    Sampled records kept as raw bytes plus field offsets, decoded lazily.
+
+    Holds a single copy of the sampled byte range and the start and end
+    offset of every field in two integer arrays, instead of a str object per
+    field. Indexing yields RawRecord views, so row-oriented code keeps
+    working; the first access to a column decodes that column once for all
+    records and caches it, so stages that only look at a few key columns
+    never decode the rest. profile_into measures null counts, lengths and
+    distinct values straight from the bytes.
+    """
+
+    def __init__(self, data: bytes, encoding: str, quotechar: str, field_starts: array, field_ends: array,
+                 escaped: set, record_offsets: array, first: int = 0, stop: Optional[int] = None):
+        self.encoding = encoding
+        self.quotechar = quotechar
+        self._quote = quotechar.encode(encoding)
+        self._data = data
+        self._field_starts = field_starts
+        self._field_ends = field_ends
+        self._escaped = escaped  # indexes of fields holding doubled quotes
+        self._record_offsets = record_offsets  # record i owns fields record_offsets[i]:record_offsets[i + 1]
+        self._first = first
+        self._stop = len(record_offsets) - 1 if stop is None else stop
+        self._columns: Dict[int, List[str]] = {}
+
+    @classmethod
+    def from_mapped(cls, mapped: MappedCSVFile, limit: Optional[int] = None) -> 'RawRecordSample':
+        spans = list(itertools.islice(mapped.record_spans(), limit))
+        base = spans[0][0] if spans else 0
+        data = bytes(mapped.buffer[base:spans[-1][1]]) if spans else b''
+
+        field_starts, field_ends, record_offsets = array('q'), array('q'), array('q', [0])
+        escaped = set()
+        for start, end in spans:
+            for field_start, field_end, is_escaped in mapped.field_spans(start, end):
+                if is_escaped:
+                    escaped.add(len(field_starts))
+                field_starts.append(field_start - base)
+                field_ends.append(field_end - base)
+            record_offsets.append(len(field_starts))
+
+        return cls(data, mapped.encoding, mapped.quotechar, field_starts, field_ends, escaped, record_offsets)
+
+    def __len__(self) -> int:
+        return self._stop - self._first
+
+    def __getitem__(self, index: Union[int, slice]) -> Union['RawRecord', 'RawRecordSample', List['RawRecord']]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return RawRecordSample(self._data, self.encoding, self.quotechar, self._field_starts, self._field_ends,
+                                   self._escaped, self._record_offsets, self._first + start,
+                                   self._first + max(start, stop))
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('record index out of range')
+        return RawRecord(self, index)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, abc.Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(mine == theirs for mine, theirs in zip(self, other))
+
+    def __getstate__(self) -> Dict:
+        # Decoded columns are a cache; results sent back from worker processes travel as bytes only
+        return {**self.__dict__, '_columns': {}}
+
+    def field_count(self, index: int) -> int:
+        record = self._first + index
+        return self._record_offsets[record + 1] - self._record_offsets[record]
+
+    def column(self, index: int) -> List[str]:
+        """All values of one column, '' for records that are too short; decoded on first use."""
+        if index not in self._columns:
+            self._columns[index] = [self._decode(field) if field is not None else ''
+                                    for field in self._column_fields(index)]
+        return self._columns[index]
+
+    def raw_field(self, field: int) -> bytes:
+        value = self._data[self._field_starts[field]:self._field_ends[field]]
+        if field in self._escaped:
+            value = value.replace(self._quote * 2, self._quote)
+        return value
+
+    def profile_into(self, profile):
+        """Feed every record into a TableProfile, column by column, without decoding plain ASCII fields."""
+        profile.row_count += len(self)
+        for index, column in enumerate(profile.columns):
+            for field in self._column_fields(index):
+                column.add_raw(self.raw_field(field) if field is not None else b'', self.encoding)
+
+    def _column_fields(self, index: int) -> Iterator[Optional[int]]:
+        offsets = self._record_offsets
+        for record in range(self._first, self._stop):
+            field = offsets[record] + index
+            yield field if field < offsets[record + 1] else None
+
+    def _decode(self, field: int) -> str:
+        return str(self.raw_field(field), self.encoding, 'replace')
+
+
+class RawRecord(abc.Sequence):
+    """Read-only view of one record of a RawRecordSample."""
+
+    __slots__ = ('_sample', '_index')
+
+    def __init__(self, sample: RawRecordSample, index: int):
+        self._sample = sample
+        self._index = index
+
+    def __len__(self) -> int:
+        return self._sample.field_count(self._index)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('field index out of range')
+        return self._sample.column(index)[self._index]
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, abc.Sequence) or isinstance(other, str):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+def iter_mapped_records(mapped: MappedCSVFile, delimiter_detection_sample_size: int) -> Iterator[List[str]]:
+    head_text = mapped.head_text(delimiter_detection_sample_size)
+    if not head_text:
+        return
+
+    mapped.delimiter = detect_dialect(head_text).delimiter
+    yield from mapped.decoded_records()
+
+
+def read_mapped_sample(file_path: Path, sample_size: int, delimiter_detection_sample_size: int,
+                       encoding: Optional[str] = None) -> Optional[RawRecordSample]:
+    """
+    Lazily decoded counterpart of csv_helpers.read_csv_file for uncompressed files.
+
+    Returns:
+        The leading sample_size records, or None when the encoding is not
+        ASCII-compatible and the byte-level scanner does not apply
+    """
+    with MappedCSVFile(file_path) as mapped:
+        mapped.encoding = encoding or detect_encoding(mapped.head_bytes(ENCODING_DETECTION_SAMPLE_SIZE))
+        if not is_ascii_compatible(mapped.encoding):
+            return None
+
+        head_text = mapped.head_text(delimiter_detection_sample_size)
+        if head_text:
+            mapped.delimiter = detect_dialect(head_text).delimiter
+        return RawRecordSample.from_mapped(mapped, sample_size if head_text else 0)
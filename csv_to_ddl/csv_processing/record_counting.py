@@ -0,0 +1,176 @@
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from csv_to_ddl.config.constants.csv import ENCODING_DETECTION_SAMPLE_SIZE, PARALLEL_CHUNK_SIZE
+from csv_to_ddl.csv_processing.archives import ArchiveMember
+from csv_to_ddl.csv_processing.byte_ranges import nominal_offsets
+from csv_to_ddl.csv_processing.csv_helpers import is_compressed, is_random_access, iter_csv_records, open_binary
+from csv_to_ddl.csv_processing.dialect_detection import detect_dialect
+from csv_to_ddl.csv_processing.encoding_detection import detect_encoding, is_ascii_compatible
+from csv_to_ddl.csv_processing.gzip_index import GzipIndex, index_path_for
+
+logger = logging.getLogger(__name__)
+
+COUNT_BLOCK_SIZE = 4194304
+
+
+@dataclass
+class RangeCount:
+    """
+    Newline and quote counts of one byte range, for both quote states it can start in.
+
+    Which newlines end a record depends on whether the range starts inside a
+    quoted field, which is only known once every earlier range is counted.
+    Counting both cases lets ranges be counted independently, without first
+    aligning them to record boundaries.
+    """
+    quotes: int = 0
+    newlines_outside: int = 0  # record-ending newlines if the range starts outside quotes
+    newlines_inside: int = 0  # record-ending newlines if the range starts inside a quoted field
+    size: int = 0
+    ends_with_newline: bool = False
+
+    def add_chunk(self, chunk: bytes, quote: bytes):
+        if not chunk:
+            return
+
+        # Splitting on the quote alternates unquoted and quoted text; a doubled quote adds an empty part
+        parts = chunk.split(quote) if quote in chunk else [chunk]
+        even = sum(part.count(b'\n') for part in parts[0::2])
+        odd = sum(part.count(b'\n') for part in parts[1::2])
+        if self.quotes % 2:
+            self.newlines_outside += odd
+            self.newlines_inside += even
+        else:
+            self.newlines_outside += even
+            self.newlines_inside += odd
+
+        self.quotes += len(parts) - 1
+        self.size += len(chunk)
+        self.ends_with_newline = chunk.endswith(b'\n')
+
+
+def count_chunks(chunks: Iterable[bytes], quote: bytes = b'"') -> RangeCount:
+    count = RangeCount()
+    for chunk in chunks:
+        count.add_chunk(chunk, quote)
+    return count
+
+
+def combine_counts(counts: List[RangeCount]) -> Optional[int]:
+    """
+    Chain range counts in file order into the record count of the whole file.
+
+    Returns:
+        Number of records, including a last one without a line terminator;
+        None when the file ends inside a quoted field, i.e. its quotes do not
+        pair up and the parity cannot be trusted
+    """
+    records = 0
+    inside_quotes = False
+    for count in counts:
+        records += count.newlines_inside if inside_quotes else count.newlines_outside
+        inside_quotes ^= count.quotes % 2 == 1
+
+    if inside_quotes:
+        return None
+
+    non_empty = [count for count in counts if count.size]
+    if non_empty and not non_empty[-1].ends_with_newline:
+        records += 1
+    return records
+
+
+def count_records(file_path: Path, jobs: int = 1, delimiter_detection_sample_size: int = 10,
+                  part_size: int = PARALLEL_CHUNK_SIZE, gzip_index_dir: Optional[Path] = None) -> int:
+    """
+    Exact number of records in a file, counted on raw bytes without parsing.
+
+    Process:
+    1. Detect the encoding and dialect on the head; the byte count needs an
+       ASCII-compatible encoding, quotes that only delimit quoted fields and
+       lines ending in \n (a bare \r also ends a record for the parser)
+    2. Cut the data into ranges - equal byte ranges of an uncompressed file,
+       access-point ranges of a .csv.gz file with a cached index, or else the
+       whole stream (archive members, unindexed .csv.gz) - and count
+       newlines and quote parity of every range in large blocks, on up to jobs
+       threads (file reads and inflating release the GIL)
+    3. Chain the ranges by quote parity; a newline inside a quoted field does
+       not end a record
+
+    Files that fail step 1, or whose quotes turn out not to pair up, are
+    counted by streaming them through the regular parser instead, so the
+    count always equals the number of records the parser yields.
+    """
+    head = _read_head(file_path)
+    encoding = detect_encoding(head)
+    if is_ascii_compatible(encoding):
+        head_lines = head.decode(encoding, 'replace').splitlines(keepends=True)
+        dialect = detect_dialect(''.join(head_lines[:delimiter_detection_sample_size]))
+        if not dialect.stray_quotes and not _has_bare_carriage_returns(head):
+            quote = dialect.quotechar.encode(encoding)
+            records = combine_counts(_map(functools.partial(count_chunks, quote=quote),
+                                          list(_byte_ranges(file_path, jobs, part_size, gzip_index_dir)), jobs))
+            if records is not None:
+                return records
+            logger.debug(f"Quotes of {file_path} do not pair up, counting its records by parsing")
+
+    records = iter_csv_records(file_path, delimiter_detection_sample_size, encoding=encoding)
+    return sum(1 for _ in records)
+
+
+def _has_bare_carriage_returns(head: bytes) -> bool:
+    # The parser also ends records on a \r without \n (old Mac line endings), which the byte count does not see;
+    # a \r ending the head may be the first half of a \r\n cut off by the head size
+    return b'\r' in head.rstrip(b'\r').replace(b'\r\n', b'')
+
+
+def _read_head(file_path: Path) -> bytes:
+    with open_binary(file_path) as f:
+        return f.read(ENCODING_DETECTION_SAMPLE_SIZE)
+
+
+def _byte_ranges(file_path: Path, jobs: int, part_size: int,
+                 gzip_index_dir: Optional[Path]) -> Iterator[Iterator[bytes]]:
+    # Each item lazily yields the blocks of one range; ranges are independent of each other
+    if not is_random_access(file_path):
+        index = None
+        if jobs > 1 and is_compressed(file_path) and not isinstance(file_path, ArchiveMember):
+            index = GzipIndex.load(file_path, index_path_for(file_path, gzip_index_dir))
+        if index is None or len(index.points) < 2:
+            yield _read_blocks(functools.partial(open_binary, file_path))
+            return
+
+        for start, end in index.split(max(1, -(-index.uncompressed_size // part_size))):
+            yield index.iter_range(start, end)
+        return
+
+    size = file_path.stat().st_size
+    offsets = nominal_offsets(0, size, part_size if jobs > 1 else max(1, size))
+    for start, end in zip(offsets, offsets[1:]):
+        yield _read_blocks(functools.partial(open, file_path, 'rb'), start, end)
+
+
+def _read_blocks(opener: Callable, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+    with opener() as f:
+        if start:
+            f.seek(start)
+        remaining = end - start if end is not None else None
+        while remaining is None or remaining > 0:
+            block = f.read(COUNT_BLOCK_SIZE if remaining is None else min(COUNT_BLOCK_SIZE, remaining))
+            if not block:
+                return
+            if remaining is not None:
+                remaining -= len(block)
+            yield block
+
+
+def _map(function: Callable, ranges: List[Iterator[bytes]], jobs: int) -> List[RangeCount]:
+    if jobs > 1 and len(ranges) > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            return list(executor.map(function, ranges))
+    return [function(blocks) for blocks in ranges]
@@ -1,7 +1,10 @@
 import logging
 from pathlib import Path
 
+from csv_to_ddl.config.config_manager import ConfigManager
 from csv_to_ddl.csv_processing.csv_analyzer import CSVAnalyzer
+from csv_to_ddl.layout_analyzer import LayoutAnalyzer
+from csv_to_ddl.parallel_analyzer import ParallelAnalyzer
 from csv_to_ddl.schema_analysis.schema_analyzer import SchemaAnalyzer
 from csv_to_ddl.ddl_generator import DDLGenerator
 from csv_to_ddl.schema_analysis.models.dialects import DatabaseDialect
@@ -9,6 +12,7 @@ from csv_to_ddl.schema_analysis.models.dialects import DatabaseDialect
 
 class CSVToDDLConverter:
     def __init__(self, dialect: DatabaseDialect = DatabaseDialect.POSTGRESQL):
+        self.csv_config = ConfigManager.get_csv_config()
         self.csv_analyzer = CSVAnalyzer()
         self.schema_analyzer = SchemaAnalyzer()
         self.ddl_generator = DDLGenerator(dialect)
@@ -17,8 +21,15 @@ class CSVToDDLConverter:
     def convert(self, input_path: Path) -> str:
         self.logger.info(f"Starting conversion of {input_path}")
 
-        tables_headers, tables_data = self.csv_analyzer.process(input_path)
-        tables_specs = self.schema_analyzer.analyze_tables(tables_headers, tables_data)
+        if self.csv_config.dedupe_layouts:
+            tables_specs, tables_keys = LayoutAnalyzer(self.csv_config.jobs).analyze(input_path, keys_only=True)
+            tables_specs = self.schema_analyzer.analyze_foreign_keys(tables_specs, tables_keys)
+        elif self.csv_config.jobs > 1:
+            tables_specs, tables_keys = ParallelAnalyzer(self.csv_config.jobs).analyze(input_path, keys_only=True)
+            tables_specs = self.schema_analyzer.analyze_foreign_keys(tables_specs, tables_keys)
+        else:
+            tables_specs = self.schema_analyzer.analyze_table_stream(self.csv_analyzer.iter_tables(input_path))
+
         return self.ddl_generator.generate_schema_ddl(tables_specs)
 
     def write_output(self, output, result):
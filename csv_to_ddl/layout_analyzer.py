@@ -0,0 +1,216 @@
+import functools
+import itertools
+import logging
+from collections import deque
+from copy import deepcopy
+from dataclasses import replace
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from csv_to_ddl.config.config_manager import ConfigManager
+from csv_to_ddl.csv_processing.csv_analyzer import CSVAnalyzer
+from csv_to_ddl.csv_processing.csv_helpers import open_csv_file, split_records
+from csv_to_ddl.csv_processing.file_discovery import find_csv_files
+from csv_to_ddl.csv_processing.layout_fingerprint import LayoutFingerprint, fingerprint_file
+from csv_to_ddl.parallel_analyzer import FileResult, ParallelAnalyzer, TableData, analyze_table, worker_pool
+from csv_to_ddl.schema_analysis.columns_and_types.column_profile import TableProfile
+from csv_to_ddl.schema_analysis.columns_and_types.conformance import ConformanceCheck
+from csv_to_ddl.schema_analysis.foreign_key.fk_analyzer import ForeignKeyAnalyzer
+from csv_to_ddl.schema_analysis.models.table import TableSpec
+
+logger = logging.getLogger(__name__)
+
+
+def check_layout_member(file_path: Path, table_name: str, layout: LayoutFingerprint,
+                        representative: TableSpec, keys_only: bool = False) -> Optional[FileResult]:
+    """
+    Worker entry point: derive a table from the representative of its layout.
+
+    Process:
+    1. Parse the file with the layout's delimiter and encoding, skipping the
+       header row when the representative has one - no dialect or header
+       detection runs
+    2. Stream the records through a ConformanceCheck against the
+       representative's columns and through a TableProfile for the file's own
+       statistics, keeping the leading records as the row sample (the whole
+       file is streamed in full scan mode, the sample otherwise)
+    3. Reuse the representative's types, sizes, primary key and normalization
+       findings; nullability, statistics and the row count are the file's own
+
+    Returns:
+        Row sample (its TableKeys with keys_only) and table spec; None when the
+        file does not conform or the representative's key is not unique in it
+        (in the sample, or in full scan mode over the whole file), so it needs
+        full inference
+    """
+    csv_config = ConfigManager.get_csv_config()
+    type_config = ConfigManager.get_type_config()
+    columns = representative.columns[:len(layout.header)]
+    column_names = [column.name for column in columns]
+    has_header = column_names == list(layout.header)
+
+    check = ConformanceCheck(columns, type_config)
+    profile = TableProfile(len(columns), type_config.type_detection_sample_size,
+                           csv_config.full_scan_distinct_limit, csv_config.distinct_sketch_size,
+                           csv_config.compact_value_length, csv_config.compact_prefix_length)
+    with open_csv_file(file_path, layout.encoding) as f:
+        records = split_records(f, layout.delimiter)
+        if has_header:
+            next(records, None)
+        data_records = profile.observe(check.observe(records))
+        rows = list(itertools.islice(data_records, csv_config.sample_size - has_header))
+        if csv_config.full_scan:
+            deque(data_records, maxlen=0)
+
+    if not check.conforms():
+        logger.info(f"{file_path} does not conform to the layout of {representative.name}")
+        return None
+
+    primary_key = deepcopy(representative.primary_key)
+    if primary_key and primary_key.key_type != 'surrogate':
+        key_indexes = [column_names.index(column) for column in primary_key.columns]
+        if not _key_is_unique(key_indexes, rows, profile, csv_config.full_scan):
+            logger.info(f"Primary key of {representative.name} is not unique in {file_path}")
+            return None
+
+    table_columns = []
+    for column, column_profile in zip(columns, profile.columns):
+        statistics = column_profile.to_statistics()
+        table_columns.append(replace(column, nullable=statistics.null_count > 0,
+                                     size_spec=deepcopy(column.size_spec), statistics=statistics))
+    table_columns.extend(deepcopy(representative.columns[len(columns):]))  # surrogate key column
+
+    table_spec = TableSpec(name=table_name, columns=table_columns, row_count=profile.row_count,
+                           primary_key=primary_key,
+                           normalization_suggestions=[replace(suggestion, table_name=table_name)
+                                                      for suggestion in representative.normalization_suggestions])
+    if keys_only:
+        rescan = CSVAnalyzer().rescan_for(table_name, [file_path])
+        return ForeignKeyAnalyzer().extract_keys(table_spec, rows, rescan), table_spec
+    return rows, table_spec
+
+
+def _key_is_unique(key_indexes: List[int], rows: List[List[str]], profile: TableProfile, full_scan: bool) -> bool:
+    # In full scan mode the representative's key held over its whole file, so the member's key must too:
+    # only a single column whose exact distinct count covers every row qualifies, anything else gets full inference
+    if any(profile.null_count(i) for i in key_indexes):
+        return False
+    if full_scan:
+        if len(key_indexes) > 1:
+            return False
+        column_profile = profile.columns[key_indexes[0]]
+        return column_profile.is_distinct_exact and len(column_profile.distinct_values) == profile.row_count
+    keys = {tuple(row[i] if i < len(row) else '' for i in key_indexes) for row in rows}
+    return len(keys) == len(rows)
+
+
+class LayoutAnalyzer:
+    def __init__(self, jobs: int):
+        self.jobs = jobs
+        self.csv_config = ConfigManager.get_csv_config()
+        self.csv_analyzer = CSVAnalyzer()
+        self.logger = logging.getLogger(__name__)
+
+    def analyze(self, input_path: Path, keys_only: bool = False) -> Tuple[Dict[str, TableSpec],
+                                                                          Dict[str, TableData]]:
+        """
+        Layout-deduplicated analysis of many same-shaped files.
+
+        Process:
+        1. Group files into tables as usual (CSVAnalyzer.group_tables)
+        2. Fingerprint every single-file table from its raw head: delimiter,
+           first-record tokens and column count (sharded tables already merge
+           their files and are left alone)
+        3. Run full inference on the tables with a unique layout and on the
+           first table of every shared layout, its representative
+        4. Check the remaining tables of a shared layout against their
+           representative (see check_layout_member); only the ones that do not
+           conform get full inference too
+
+        Wall time grows with the number of distinct layouts plus one cheap
+        streaming pass per file. With jobs > 1 fingerprints, full inference and
+        conformance checks all run on worker processes. With keys_only every
+        table is reduced to its foreign key artifacts once analyzed (see
+        parallel_analyzer.analyze_table).
+
+        Returns:
+            Table specifications and sampled rows (or TableKeys) keyed by table name
+        """
+        files = find_csv_files(input_path, self.csv_analyzer.discovery_filter())
+        if not files:
+            raise ValueError(f"No CSV files found in {input_path}")
+
+        tables = self.csv_analyzer.group_tables(files, input_path)
+        layouts = self.group_layouts(tables)
+        members = {table_name: (layout, table_names[0])
+                   for layout, table_names in layouts.items() for table_name in table_names[1:]}
+        self.logger.info(f"{len(tables)} tables share {len(layouts)} layouts, "
+                         f"fully analyzing {len(tables) - len(members)} of them")
+
+        tables_specs, tables_data = self.analyze_in_full(
+            {table_name: table_files for table_name, table_files in tables.items() if table_name not in members},
+            keys_only)
+
+        checked = [table_name for table_name, (_, representative) in members.items()
+                   if representative in tables_specs]
+        results = self._map(check_layout_member,
+                            [(tables[table_name][0], table_name, members[table_name][0],
+                              tables_specs[members[table_name][1]], keys_only) for table_name in checked])
+        for table_name, result in zip(checked, results):
+            if result:
+                tables_data[table_name], tables_specs[table_name] = result
+
+        nonconforming = {table_name: tables[table_name] for table_name in members if table_name not in tables_specs}
+        if nonconforming:
+            self.logger.info(f"Fully analyzing {len(nonconforming)} tables that do not match their layout")
+            specs, data = self.analyze_in_full(nonconforming, keys_only)
+            tables_specs.update(specs)
+            tables_data.update(data)
+
+        if not tables_specs:
+            raise ValueError("No valid CSV data found")
+
+        ordered = [table_name for table_name in tables if table_name in tables_specs]
+        return ({table_name: tables_specs[table_name] for table_name in ordered},
+                {table_name: tables_data[table_name] for table_name in ordered})
+
+    def group_layouts(self, tables: Dict[str, List[Path]]) -> Dict[LayoutFingerprint, List[str]]:
+        single_file_tables = [table_name for table_name, table_files in tables.items() if len(table_files) == 1]
+        fingerprints = self._map(fingerprint_file, [(tables[table_name][0],
+                                                     self.csv_config.delimiter_detection_sample_size)
+                                                    for table_name in single_file_tables])
+
+        layouts = {}
+        for table_name, fingerprint in zip(single_file_tables, fingerprints):
+            if fingerprint is not None:
+                layouts.setdefault(fingerprint, []).append(table_name)
+        return layouts
+
+    def analyze_in_full(self, tables: Dict[str, List[Path]], keys_only: bool = False) -> Tuple[
+            Dict[str, TableSpec], Dict[str, TableData]]:
+        if not tables:
+            return {}, {}
+        if self.jobs > 1:
+            return ParallelAnalyzer(self.jobs).analyze_tables(tables, keys_only)
+
+        tables_specs, tables_data = {}, {}
+        for table_name, csv_data, rescan in self.csv_analyzer.iter_loaded_tables(tables):
+            tables_data[table_name], tables_specs[table_name] = analyze_table(table_name, csv_data, rescan,
+                                                                              keys_only)
+            del csv_data
+        return tables_specs, tables_data
+
+    def _map(self, function: Callable, arguments: List[Tuple]) -> List:
+        # A failed task yields None, like a file that does not fingerprint or conform
+        if self.jobs > 1 and len(arguments) > 1:
+            with worker_pool(self.jobs) as executor:
+                futures = [executor.submit(function, *args) for args in arguments]
+                return [self._outcome(future.result) for future in futures]
+        return [self._outcome(functools.partial(function, *args)) for args in arguments]
+
+    def _outcome(self, call: Callable):
+        try:
+            return call()
+        except Exception as e:
+            self.logger.error(f"Layout analysis task failed: {e}")
+            return None
@@ -1,8 +1,11 @@
 import logging
+import os
 
 from csv_to_ddl.argument_parser import ArgumentParser
 from csv_to_ddl.config.config_manager import ConfigManager
 from csv_to_ddl.config.config_provider import DefaultConfigProvider
+from csv_to_ddl.config.default_config import CSVConfig
+from csv_to_ddl.csv_processing.archives import ArchiveMember
 from csv_to_ddl.csv_to_ddl_converter import CSVToDDLConverter
 from csv_to_ddl.schema_analysis.models.dialects import DatabaseDialect
 
@@ -18,6 +21,17 @@ def setup_logging(verbose: bool = False):
     )
 
 
+def build_csv_config(args) -> CSVConfig:
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    return CSVConfig(full_scan=args.full_scan, jobs=jobs, use_mmap=args.mmap, pipeline_depth=args.pipeline_depth,
+                     sampling=args.sampling, sampling_seed=args.seed, gzip_index_dir=args.gzip_index_dir,
+                     shard_pattern=args.shard_pattern, shard_by_directory=args.shard_by_directory,
+                     dedupe_layouts=args.dedupe_layouts, count_rows=args.count_rows,
+                     async_concurrency=args.async_files, compact_value_length=args.compact_values,
+                     include_patterns=tuple(args.include), exclude_patterns=tuple(args.exclude),
+                     max_depth=args.max_depth, max_memory=args.max_memory, spill_dir=args.spill_dir)
+
+
 def csv_to_ddl():
     parser = ArgumentParser.create_parser()
     args = parser.parse_args()
@@ -26,11 +40,11 @@ def csv_to_ddl():
     logger = logging.getLogger(__name__)
 
     try:
-        if not args.input.exists():
+        if not args.input.exists() and ArchiveMember.from_path(args.input) is None:
             logger.error(f"Input path does not exist: {args.input}")
             return 1
 
-        ConfigManager.initialize(DefaultConfigProvider())
+        ConfigManager.initialize(DefaultConfigProvider(csv_config=build_csv_config(args)))
         converter = CSVToDDLConverter(DatabaseDialect(args.dialect))
 
         results = converter.convert(input_path=args.input)
@@ -0,0 +1,288 @@
+import itertools
+import logging
+import os
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from csv_to_ddl.config.config_manager import ConfigManager
+from csv_to_ddl.config.config_provider import DefaultConfigProvider
+from csv_to_ddl.config.default_config import CSVConfig
+from csv_to_ddl.config.constants.csv import ENCODING_DETECTION_SAMPLE_SIZE
+from csv_to_ddl.csv_processing.byte_ranges import (align_to_records, count_quotes, iter_byte_range_records,
+                                                   nominal_offsets)
+from csv_to_ddl.csv_processing.csv_analyzer import CSVAnalyzer
+from csv_to_ddl.csv_processing.csv_helpers import first_newline_outside_quotes, is_random_access, parse_head
+from csv_to_ddl.csv_processing.file_discovery import discover_csv_files
+from csv_to_ddl.schema_analysis.columns_and_types.column_profile import TableProfile
+from csv_to_ddl.schema_analysis.foreign_key.fk_analyzer import ForeignKeyAnalyzer
+from csv_to_ddl.schema_analysis.foreign_key.fk_map import Rescan, TableKeys
+from csv_to_ddl.schema_analysis.models.column_store import ColumnStore
+from csv_to_ddl.schema_analysis.models.spill import MemoryBudget
+from csv_to_ddl.schema_analysis.models.table import TableSpec
+from csv_to_ddl.schema_analysis.table_analyzer import TableAnalyzer
+
+TableData = Union[List[List[str]], TableKeys]
+FileResult = Tuple[TableData, TableSpec]
+
+
+def _initialize_worker(csv_config: CSVConfig):
+    ConfigManager.initialize(DefaultConfigProvider(csv_config=csv_config))
+
+
+def worker_pool(jobs: int) -> ProcessPoolExecutor:
+    """Process pool whose workers share the parent's CSV configuration."""
+    return ProcessPoolExecutor(max_workers=jobs, initializer=_initialize_worker,
+                               initargs=(ConfigManager.get_csv_config(),))
+
+
+def analyze_table(table_name: str, csv_data: Dict, rescan: Optional[Rescan] = None,
+                  keys_only: bool = False) -> FileResult:
+    """
+    Column, primary key and normalization analysis of one loaded table.
+
+    With keys_only the sampled rows are reduced to the table's foreign key
+    artifacts (TableKeys) right away, so a worker sends back distinct value
+    sets instead of rows and the rows are freed before the next table.
+    """
+    header, rows, profile = csv_data['header'], csv_data['rows'], csv_data.get('profile')
+    if not keys_only:
+        return rows, TableAnalyzer().analyze_single_table(table_name, header, rows, profile)
+
+    csv_config = ConfigManager.get_csv_config()
+    store = ColumnStore.from_rows(header, rows, budget=MemoryBudget.from_config(csv_config, csv_config.jobs))
+    table_spec = TableAnalyzer().analyze_single_table(table_name, header, store, profile)
+    return ForeignKeyAnalyzer().extract_keys(table_spec, store, rescan), table_spec
+
+
+def _analyze_file(file_path: Path, table_name: str, keys_only: bool = False) -> Optional[FileResult]:
+    """Worker entry point: read, detect header and run per-table analysis for one file."""
+    csv_analyzer = CSVAnalyzer()
+    csv_data = csv_analyzer.load_csv_file(file_path)
+    if not csv_data:
+        return None
+    return analyze_table(table_name, csv_data, csv_analyzer.rescan_for(table_name, [file_path]), keys_only)
+
+
+def _profile_byte_range(file_path: Path, start: int, end: int, delimiter: str, encoding: str,
+                        column_count: int) -> TableProfile:
+    """Worker entry point: full-scan profile of one record-aligned byte range of a file."""
+    profile = CSVAnalyzer().create_table_profile(column_count)
+    profile.add_records(iter_byte_range_records(file_path, start, end, delimiter, encoding))
+    return profile
+
+
+def _load_shard(file_path: Path, sample_size: int) -> Dict:
+    """Worker entry point: stream one shard of a partitioned table into mergeable counters and a sample."""
+    return CSVAnalyzer().load_shard(file_path, sample_size)
+
+
+class ParallelAnalyzer:
+    def __init__(self, jobs: int):
+        self.jobs = jobs
+        self.csv_config = ConfigManager.get_csv_config()
+        self.file_sizes: Dict[Path, int] = {}  # sizes recorded by discovery, so scheduling needs no extra stat
+        self.logger = logging.getLogger(__name__)
+
+    def analyze(self, input_path: Path, keys_only: bool = False) -> Tuple[Dict[str, TableSpec],
+                                                                          Dict[str, TableData]]:
+        """
+        Process-pool analysis of independent input files.
+
+        Process:
+        1. Discover files and estimate each file's cost by the size discovery
+           recorded for it (on disk, or uncompressed for archive members)
+        2. Submit files largest-first so the longest tasks start early and
+           small files fill the remaining gaps at the end of the run
+        3. Each worker reads its file, detects the header and runs column,
+           primary key and normalization analysis, returning a picklable TableSpec
+        4. Collect results in discovery order, so the output does not depend
+           on which worker finishes first
+
+        In full scan mode, an uncompressed file spanning at least two chunks is
+        instead split into record-aligned byte ranges (see analyze_split_file),
+        so a single large table also uses every worker.
+
+        Shards of a partitioned table (see CSVAnalyzer.group_tables) are
+        streamed on the workers like independent files; their partial
+        profiles are merged here and the table is analyzed once.
+
+        Foreign key detection needs every table at once and stays in the parent.
+        With keys_only the workers return each table's foreign key artifacts
+        (see analyze_table) instead of its sampled rows.
+
+        Returns:
+            Table specifications and sampled rows (or TableKeys) keyed by table name
+        """
+        csv_analyzer = CSVAnalyzer()
+        self.file_sizes = {discovered.path: discovered.size
+                           for discovered in discover_csv_files(input_path, csv_analyzer.discovery_filter())}
+        if not self.file_sizes:
+            raise ValueError(f"No CSV files found in {input_path}")
+
+        self.logger.info(f"Found {len(self.file_sizes)} CSV files")
+        tables_specs, tables_data = self.analyze_tables(csv_analyzer.group_tables(list(self.file_sizes), input_path),
+                                                        keys_only)
+        if not tables_specs:
+            raise ValueError("No valid CSV data found")
+
+        return tables_specs, tables_data
+
+    def analyze_tables(self, tables: Dict[str, List[Path]], keys_only: bool = False) -> Tuple[Dict[str, TableSpec],
+                                                                                             Dict[str, TableData]]:
+        """Analyze already grouped tables (see analyze); tables without valid data are left out."""
+        csv_analyzer = CSVAnalyzer()
+        files = [file_path for table_files in tables.values() for file_path in table_files]
+        table_names = {file_path: table_name for table_name, table_files in tables.items() for file_path in table_files}
+        shard_sample_sizes = {table_name: csv_analyzer.shard_sample_size(len(table_files))
+                              for table_name, table_files in tables.items() if len(table_files) > 1}
+
+        schedule = sorted(files, key=self._estimate_cost, reverse=True)
+        self.logger.info(f"Analyzing {len(files)} files with {self.jobs} worker processes")
+
+        results = {}
+        with worker_pool(self.jobs) as executor:
+            split_files = {}
+            whole_files = [file_path for file_path in schedule if table_names[file_path] not in shard_sample_sizes]
+            for file_path in filter(self._should_split, whole_files):
+                try:
+                    split_file = self.plan_split_file(executor, file_path)
+                except Exception as e:
+                    self.logger.warning(f"Could not split {file_path}, analyzing it in one piece: {e}")
+                    continue
+                if split_file:
+                    split_files[file_path] = split_file
+
+            futures = {}
+            for file_path in schedule:
+                table_name = table_names[file_path]
+                if table_name in shard_sample_sizes:
+                    futures[file_path] = executor.submit(_load_shard, file_path, shard_sample_sizes[table_name])
+                elif file_path not in split_files:
+                    futures[file_path] = executor.submit(_analyze_file, file_path, table_name, keys_only)
+
+            for table_name, table_files in tables.items():
+                try:
+                    if table_name in shard_sample_sizes:
+                        results[table_name] = self.analyze_sharded_table(
+                            table_name, table_files, [futures[file_path] for file_path in table_files], keys_only)
+                    elif table_files[0] in split_files:
+                        results[table_name] = self.analyze_split_file(executor, table_files[0], table_name,
+                                                                      split_files[table_files[0]], keys_only)
+                    else:
+                        results[table_name] = futures[table_files[0]].result()
+                except Exception as e:
+                    self.logger.error(f"Error processing {table_name}: {e}")
+
+        tables_specs = {}
+        tables_data = {}
+        for table_name in tables:
+            result = results.get(table_name)
+            if not result:
+                continue
+
+            table_data, table_spec = result
+            tables_specs[table_spec.name] = table_spec
+            tables_data[table_spec.name] = table_data
+
+        return tables_specs, tables_data
+
+    def plan_split_file(self, executor: Executor, file_path: Path) -> Optional[Dict]:
+        """
+        Read the head of a large file, detect its dialect and header, cut the data
+        after the header into chunk-sized byte ranges and start counting the
+        quotes in each range on the workers.
+        """
+        with open(file_path, 'rb') as f:
+            head_bytes = f.read(ENCODING_DETECTION_SAMPLE_SIZE)
+        head = parse_head(head_bytes, self.csv_config.delimiter_detection_sample_size)
+        if head is None:
+            return None
+
+        encoding, delimiter, head_records, _ = head
+        csv_analyzer = CSVAnalyzer()
+        leading_records = head_records[:csv_analyzer.header_detection.header_config.header_data_rows_sample_size]
+        csv_data = csv_analyzer.get_header_and_data(leading_records)
+        csv_data['header_rows'] = len(leading_records) - len(csv_data['rows'])
+        data_start = 0
+        if csv_data['header_rows']:
+            data_start = first_newline_outside_quotes(head_bytes, b'"', False)
+            if data_start is None:
+                return None
+
+        offsets = nominal_offsets(data_start, os.path.getsize(file_path), self.csv_config.parallel_chunk_size)
+        csv_data.update(encoding=encoding, delimiter=delimiter, offsets=offsets,
+                        quote_counts=[executor.submit(count_quotes, file_path, start, end)
+                                      for start, end in zip(offsets, offsets[1:])])
+        return csv_data
+
+    def analyze_sharded_table(self, table_name: str, shard_paths: List[Path],
+                              shard_futures: List[Future], keys_only: bool = False) -> Optional[FileResult]:
+        """Merge the shard results of a partitioned table in shard order and analyze the table."""
+        shards = []
+        for shard_path, shard_future in zip(shard_paths, shard_futures):
+            try:
+                shards.append(shard_future.result())
+            except Exception as e:
+                self.logger.error(f"Error processing {shard_path}: {e}")
+                shards.append({})
+
+        csv_analyzer = CSVAnalyzer()
+        csv_data = csv_analyzer.merge_shards(table_name, shard_paths, shards)
+        if not csv_data:
+            return None
+        return analyze_table(table_name, csv_data, csv_analyzer.rescan_for(table_name, shard_paths), keys_only)
+
+    def analyze_split_file(self, executor: Executor, file_path: Path, table_name: str,
+                           split_file: Dict, keys_only: bool = False) -> Optional[FileResult]:
+        """
+        Byte-range parallel full scan of one file.
+
+        Process:
+        1. Align the split points to record starts using the quote parity
+           counted by the workers (quoted fields may span lines)
+        2. Profile every range on a worker; each returns a partial TableProfile
+        3. While they run, read the leading row sample in this process
+        4. Merge the partial profiles in file order, which reproduces the
+           single-pass profile exactly, and analyze the table from it
+
+        Falls back to whole-file analysis on a worker when the split points
+        cannot be aligned with confidence.
+        """
+        header, delimiter, encoding = split_file['header'], split_file['delimiter'], split_file['encoding']
+        offsets = split_file['offsets']
+        boundaries = align_to_records(file_path, offsets, [count.result() for count in split_file['quote_counts']],
+                                      delimiter, encoding, len(header))
+        if boundaries is None:
+            self.logger.warning(f"Could not split {file_path} on record boundaries, analyzing it in one piece")
+            return executor.submit(_analyze_file, file_path, table_name, keys_only).result()
+
+        self.logger.info(f"Profiling {file_path} in {len(boundaries) - 1} byte ranges")
+        partial_profiles = [executor.submit(_profile_byte_range, file_path, start, end, delimiter, encoding,
+                                            len(header))
+                            for start, end in zip(boundaries, boundaries[1:])]
+
+        sample_size = self.csv_config.sample_size - split_file['header_rows']
+        records = iter_byte_range_records(file_path, boundaries[0], boundaries[-1], delimiter, encoding)
+        rows = list(itertools.islice(records, sample_size))
+        records.close()
+
+        profile = partial_profiles[0].result()
+        for partial_profile in partial_profiles[1:]:
+            profile.merge(partial_profile.result())
+
+        self.logger.info(f"Streamed {profile.row_count} records of {file_path}, sampled {len(rows)}")
+        csv_data = {'header': header, 'rows': rows, 'profile': profile}
+        return analyze_table(table_name, csv_data, CSVAnalyzer().rescan_for(table_name, [file_path]), keys_only)
+
+    def _should_split(self, file_path: Path) -> bool:
+        return (self.csv_config.full_scan and self.csv_config.sampling == 'head' and is_random_access(file_path)
+                and self._estimate_cost(file_path) >= 2 * self.csv_config.parallel_chunk_size)
+
+    def _estimate_cost(self, file_path: Path) -> int:
+        if file_path in self.file_sizes:
+            return self.file_sizes[file_path]
+        try:
+            return os.path.getsize(file_path)
+        except OSError:
+            return 0
@@ -1,15 +1,20 @@
 import statistics
-from typing import List
+from typing import List, Optional
 
 from csv_to_ddl.config.config_manager import ConfigManager
+from csv_to_ddl.schema_analysis.columns_and_types.column_profile import ColumnProfile
+from csv_to_ddl.schema_analysis.columns_and_types.type_detection.date_format import infer_date_format
 from csv_to_ddl.schema_analysis.columns_and_types.type_detection.type_name import detect_column_type
 from csv_to_ddl.schema_analysis.columns_and_types.type_detection.type_size import calculate_size_spec
+from csv_to_ddl.schema_analysis.columns_and_types.value_compaction import CompactValueSet
+from csv_to_ddl.schema_analysis.models.column_store import NULL, EncodedColumn
 from csv_to_ddl.schema_analysis.models.table import ColumnSpec, ColumnStatistics
 
 
 class ColumnAnalyzer:
     def __init__(self):
         self.type_config = ConfigManager.get_type_config()
+        self.csv_config = ConfigManager.get_csv_config()
 
     def analyze_column(self, name: str, values: List[str]) -> ColumnSpec:
         """
@@ -20,6 +25,7 @@ class ColumnAnalyzer:
         2. Detect optimal data type using pattern matching and confidence scoring
         3. Determine size specifications based on data type and actual data
         4. Set nullability based on presence of null/empty values
+        5. Infer the single format of date and datetime columns
         
         Combines statistical analysis with pattern recognition to make
         informed decisions about column specifications.
@@ -31,21 +37,51 @@ class ColumnAnalyzer:
         Returns:
             Complete column specification with type, size, and constraints
         """
-        statistics_obj = self._calculate_statistics(values)
+        statistics_obj = self._calculate_statistics(values, self.csv_config.compact_value_length,
+                                                    self.csv_config.compact_prefix_length)
+        return self._build_column_spec(name, values, statistics_obj)
+
+    def analyze_profile(self, name: str, profile: ColumnProfile) -> ColumnSpec:
+        """
+        Column analysis from an incremental profile built during a full scan.
+
+        Statistics come from every value of the column; type detection runs on
+        the profile's bounded type sample, which holds the same leading
+        non-null values analyze_column would have sampled.
+        """
+        statistics_obj = profile.to_statistics()
+        return self._build_column_spec(name, profile.type_sample, statistics_obj)
+
+    def analyze_encoded_column(self, name: str, column: EncodedColumn) -> ColumnSpec:
+        """
+        Column analysis of a ColumnStore column.
+
+        Statistics come from the column's dictionary and code counts rather
+        than a pass over its values; type detection runs on the same leading
+        non-null values analyze_column would have sampled.
+        """
+        statistics_obj = self._encoded_statistics(column)
+        sample = column.non_null_values(self.type_config.type_detection_sample_size)
+        return self._build_column_spec(name, sample, statistics_obj)
+
+    def _build_column_spec(self, name: str, values: List[str], statistics_obj: ColumnStatistics) -> ColumnSpec:
         data_type = detect_column_type(values, self.type_config, statistics_obj)
         size_spec = calculate_size_spec(data_type, statistics_obj.max_length, self.type_config)
         nullable = statistics_obj.null_count > 0
+        date_format = infer_date_format(values, data_type, self.type_config)
 
         return ColumnSpec(
             name=name,
             data_type=data_type,
             nullable=nullable,
             size_spec=size_spec,
-            statistics=statistics_obj
+            statistics=statistics_obj,
+            date_format=date_format
         )
 
     @staticmethod
-    def _calculate_statistics(values: List[str]) -> ColumnStatistics:
+    def _calculate_statistics(values: List[str], compact_length: Optional[int] = None,
+                              prefix_length: int = 0) -> ColumnStatistics:
         """
         Calculate comprehensive column statistics for schema inference.
         
@@ -56,17 +92,25 @@ class ColumnAnalyzer:
         - String length statistics for size specification
         
         These statistics drive type detection, constraint inference,
-        and key detection algorithms throughout the system.
+        and key detection algorithms throughout the system. Values longer
+        than compact_length are deduplicated by their CompactValue and
+        verified against the full value only when two compact forms match.
         
         Returns:
             ColumnStatistics with all computed metrics
         """
-        null_count = sum(1 for v in values if v is None or str(v).strip() == '')
-        non_null_values = [str(v).strip() for v in values if v is not None and str(v).strip()]
-        distinct_count = len(set(non_null_values))
-        unique_ratio = distinct_count / max(1, len(non_null_values))
+        distinct_values = CompactValueSet(compact_length, prefix_length, lambda i: str(values[i]).strip())
+        lengths = []
+        for i, v in enumerate(values):
+            value = str(v).strip() if v is not None else ''
+            if value:
+                distinct_values.add(value, i)
+                lengths.append(len(value))
+
+        null_count = len(values) - len(lengths)
+        distinct_count = len(distinct_values)
+        unique_ratio = distinct_count / max(1, len(lengths))
 
-        lengths = [len(str(v)) for v in non_null_values]
         max_length = max(lengths) if lengths else None
         avg_length = statistics.mean(lengths) if lengths else None
 
@@ -76,4 +120,21 @@ class ColumnAnalyzer:
             unique_ratio=unique_ratio,
             max_length=max_length,
             avg_length=avg_length
-        )
\ No newline at end of file
+        )
+
+    @staticmethod
+    def _encoded_statistics(column: EncodedColumn) -> ColumnStatistics:
+        """Same metrics as _calculate_statistics, one term per distinct value instead of per row."""
+        null_count = column.null_count
+        non_null_count = len(column) - null_count
+        distinct_values = column.values[NULL + 1:]
+        total_length = sum(len(column.values[code]) * count
+                           for code, count in column.code_counts().items() if code > NULL)
+
+        return ColumnStatistics(
+            null_count=null_count,
+            distinct_count=column.distinct_count,
+            unique_ratio=column.distinct_count / max(1, non_null_count),
+            max_length=max(map(len, distinct_values)) if distinct_values else None,
+            avg_length=total_length / non_null_count if non_null_count else None
+        )
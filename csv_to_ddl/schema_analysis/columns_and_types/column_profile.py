@@ -0,0 +1,260 @@
+import heapq
+from typing import Iterable, Iterator, List, Optional, Set, Union
+
+from csv_to_ddl.schema_analysis.columns_and_types.value_compaction import (CompactValue, compact_value, stable_hash64,
+                                                                             value_hash)
+from csv_to_ddl.schema_analysis.models.table import ColumnStatistics
+
+HASH_SPACE = 2 ** 64
+
+# Every ASCII character str.strip() removes, so stripping raw bytes matches stripping the decoded value
+ASCII_WHITESPACE = bytes(code for code in range(128) if chr(code).isspace())
+
+
+class DistinctSketch:
+    """
+    K-minimum-values sketch for estimating distinct counts in constant memory.
+
+    Keeps the k smallest 64-bit hashes seen so far; the k-th smallest hash
+    bounds how densely the hash space is populated, which gives the estimate.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._heap: List[int] = []  # negated hashes, max-heap of the k smallest
+        self._members: Set[int] = set()
+
+    def add_hash(self, value_hash: int):
+        if value_hash in self._members:
+            return
+
+        if len(self._heap) < self.size:
+            heapq.heappush(self._heap, -value_hash)
+            self._members.add(value_hash)
+        elif value_hash < -self._heap[0]:
+            removed = -heapq.heappushpop(self._heap, -value_hash)
+            self._members.discard(removed)
+            self._members.add(value_hash)
+
+    def merge(self, other: 'DistinctSketch'):
+        for value_hash in other._members:
+            self.add_hash(value_hash)
+
+    def estimate(self) -> int:
+        if len(self._heap) < self.size:
+            return len(self._heap)
+
+        kth_smallest = -self._heap[0]
+        return int((self.size - 1) * HASH_SPACE / max(1, kth_smallest))
+
+
+class ColumnProfile:
+    """
+    Incremental accumulator for a single column.
+
+    Collects everything ColumnAnalyzer needs (null count, distinct values,
+    length statistics and a type detection sample) one value at a time, so a
+    column can be profiled over a whole file without holding its values.
+    Distinct values are tracked exactly up to distinct_limit; past that the
+    set is dropped and the count continues as a KMV sketch estimate. Values
+    longer than compact_length are tracked as CompactValues; the values
+    themselves are gone by then, so equal compact forms count as one value.
+    """
+
+    def __init__(self, type_sample_size: int, distinct_limit: int, sketch_size: int,
+                 compact_length: Optional[int] = None, prefix_length: int = 0):
+        self.type_sample_size = type_sample_size
+        self.distinct_limit = distinct_limit
+        self.compact_length = compact_length
+        self.prefix_length = prefix_length
+
+        self.count = 0
+        self.null_count = 0
+        self.total_length = 0
+        self.max_length: Optional[int] = None
+        self.type_sample: List[str] = []
+        self.distinct_values: Optional[Set[Union[str, bytes, CompactValue]]] = set()
+        self.sketch = DistinctSketch(sketch_size)  # only fed once the exact set overflows
+
+    @property
+    def non_null_count(self) -> int:
+        return self.count - self.null_count
+
+    @property
+    def is_distinct_exact(self) -> bool:
+        return self.distinct_values is not None
+
+    def add(self, value: Optional[str]):
+        self.count += 1
+
+        value = str(value).strip() if value is not None else ''
+        if not value:
+            self.null_count += 1
+            return
+
+        self._add_non_null(value)
+
+    def add_raw(self, raw: bytes, encoding: str):
+        """
+        add() for a field that is still in its encoded, ASCII-compatible form.
+
+        Pure ASCII values are stripped, measured and deduplicated as bytes -
+        their byte length is their character length - and only the ones
+        entering the type sample are decoded. Anything else is decoded and
+        goes through add(). Each value always ends up in the same form, so
+        the distinct count stays exact; profiles built this way only merge
+        with other raw profiles.
+        """
+        if not raw.isascii():
+            self.add(str(raw, encoding, 'replace'))
+            return
+
+        self.count += 1
+        value = raw.strip(ASCII_WHITESPACE)
+        if not value:
+            self.null_count += 1
+            return
+
+        self._add_non_null(value)
+
+    def _add_non_null(self, value: Union[str, bytes]):
+        length = len(value)
+        self.total_length += length
+        if self.max_length is None or length > self.max_length:
+            self.max_length = length
+
+        if len(self.type_sample) < self.type_sample_size:
+            self.type_sample.append(value if isinstance(value, str) else value.decode('ascii'))
+
+        if self.distinct_values is None:
+            self.sketch.add_hash(stable_hash64(value))
+            return
+
+        self.distinct_values.add(compact_value(value, self.compact_length, self.prefix_length))
+        if len(self.distinct_values) > self.distinct_limit:
+            self._overflow_to_sketch()
+
+    def merge(self, other: 'ColumnProfile'):
+        """
+        Fold in the profile of the records that follow this one in the file.
+
+        The result equals profiling both parts in one pass: counts add up,
+        the type sample keeps the leading values, and the distinct values
+        overflow to the sketch exactly when their union exceeds the limit
+        (KMV sketches merge losslessly, independent of order).
+        """
+        self.count += other.count
+        self.null_count += other.null_count
+        self.total_length += other.total_length
+        if other.max_length is not None and (self.max_length is None or other.max_length > self.max_length):
+            self.max_length = other.max_length
+        self.type_sample.extend(other.type_sample[:self.type_sample_size - len(self.type_sample)])
+
+        if self.distinct_values is not None and other.distinct_values is not None:
+            self.distinct_values |= other.distinct_values
+            if len(self.distinct_values) > self.distinct_limit:
+                self._overflow_to_sketch()
+            return
+
+        if self.distinct_values is not None:
+            self._overflow_to_sketch()
+        if other.distinct_values is not None:
+            for distinct_value in other.distinct_values:
+                self.sketch.add_hash(value_hash(distinct_value))
+        else:
+            self.sketch.merge(other.sketch)
+
+    def _overflow_to_sketch(self):
+        # Hand the exact set over to the sketch and stop retaining values
+        for distinct_value in self.distinct_values:
+            self.sketch.add_hash(value_hash(distinct_value))
+        self.distinct_values = None
+
+    def to_statistics(self) -> ColumnStatistics:
+        non_null_count = self.non_null_count
+        if self.distinct_values is not None:
+            distinct_count = len(self.distinct_values)
+        else:
+            distinct_count = min(self.sketch.estimate(), non_null_count)
+
+        return ColumnStatistics(
+            null_count=self.null_count,
+            distinct_count=distinct_count,
+            unique_ratio=distinct_count / max(1, non_null_count),
+            max_length=self.max_length,
+            avg_length=self.total_length / non_null_count if non_null_count else None
+        )
+
+
+class RecordCounters:
+    """
+    Exact whole-file counters that are cheap enough to keep alongside any sample:
+    the record count and the null count of every column.
+    """
+
+    def __init__(self, column_count: int, exact: bool = True):
+        self.row_count = 0
+        self.exact = exact
+        self._null_counts = [0] * column_count
+
+    @classmethod
+    def estimated(cls, column_count: int, row_count: int) -> 'RecordCounters':
+        """Counters carrying only an estimated record count, for samplers that never read the whole file."""
+        counters = cls(column_count, exact=False)
+        counters.row_count = row_count
+        return counters
+
+    @classmethod
+    def counted(cls, column_count: int, row_count: int) -> 'RecordCounters':
+        """
+        Counters carrying only an exact record count from a byte-level count;
+        null counts were never observed and stay with the sample (exact=False).
+        """
+        return cls.estimated(column_count, row_count)
+
+    def null_count(self, index: int) -> int:
+        return self._null_counts[index]
+
+    def add_record(self, record: List[str]):
+        self.row_count += 1
+        for i in range(len(self._null_counts)):
+            if i >= len(record) or not record[i].strip():
+                self._null_counts[i] += 1
+
+    def add_records(self, records: Iterable[List[str]]):
+        for record in records:
+            self.add_record(record)
+
+    def merge(self, other: 'RecordCounters'):
+        self.row_count += other.row_count
+        self.exact = self.exact and other.exact
+        self._null_counts = [mine + theirs for mine, theirs in zip(self._null_counts, other._null_counts)]
+
+    def observe(self, records: Iterable[List[str]]) -> Iterator[List[str]]:
+        """Count records as they pass through a generator pipeline."""
+        for record in records:
+            self.add_record(record)
+            yield record
+
+
+class TableProfile(RecordCounters):
+    """Per-column profiles plus the exact record count of one input file."""
+
+    def __init__(self, column_count: int, type_sample_size: int, distinct_limit: int, sketch_size: int,
+                 compact_length: Optional[int] = None, prefix_length: int = 0):
+        super().__init__(column_count)
+        self.columns = [ColumnProfile(type_sample_size, distinct_limit, sketch_size, compact_length, prefix_length)
+                        for _ in range(column_count)]
+
+    def null_count(self, index: int) -> int:
+        return self.columns[index].null_count
+
+    def add_record(self, record: List[str]):
+        self.row_count += 1
+        for i, column in enumerate(self.columns):
+            column.add(record[i] if i < len(record) else '')
+
+    def merge(self, other: 'TableProfile'):
+        self.row_count += other.row_count
+        for column, other_column in zip(self.columns, other.columns):
+            column.merge(other_column)
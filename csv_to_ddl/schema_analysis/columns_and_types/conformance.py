@@ -0,0 +1,84 @@
+from typing import Iterable, Iterator, List
+
+from csv_to_ddl.config.default_config import TypeConfig
+from csv_to_ddl.schema_analysis.columns_and_types.type_detection.date_format import parses
+from csv_to_ddl.schema_analysis.columns_and_types.type_detection.type_classifier import TYPE_BITS, classify_value
+from csv_to_ddl.schema_analysis.models.dialects import DataType
+from csv_to_ddl.schema_analysis.models.table import ColumnSpec
+
+INTEGER_RANGE = 2 ** 31
+
+# Types of classify_value a value may have to conform to a column of the key type
+VALUE_MASKS = {data_type: TYPE_BITS[data_type] for data_type in TYPE_BITS}
+VALUE_MASKS[DataType.BIGINT] = TYPE_BITS[DataType.INTEGER]
+VALUE_MASKS[DataType.DECIMAL] |= TYPE_BITS[DataType.INTEGER]
+VALUE_MASKS[DataType.FLOAT] |= TYPE_BITS[DataType.INTEGER]
+
+
+def value_conforms(value: str, column: ColumnSpec, config: TypeConfig) -> bool:
+    """
+    Check a single non-empty, stripped value against an already inferred column type.
+
+    Typed columns accept what their type detector accepts (numeric columns
+    also take plain integers); INTEGER additionally rejects values that would
+    need BIGINT, and date columns values their inferred date_format does not
+    parse, so a member in another date layout is inferred on its own.
+    Character columns accept anything that fits their length.
+    """
+    if column.data_type in VALUE_MASKS:
+        if not classify_value(value) & VALUE_MASKS[column.data_type]:
+            return False
+        if column.date_format is not None:
+            return parses(value, column.date_format)
+        return column.data_type != DataType.INTEGER or abs(int(value)) <= INTEGER_RANGE
+
+    if column.data_type == DataType.CHAR:
+        return len(value) <= (column.size_spec.length or 1)
+    if column.data_type == DataType.VARCHAR:
+        return len(value) <= config.max_varchar_length
+    return True
+
+
+class ConformanceCheck:
+    """
+    Streaming check of records against the columns inferred for another file
+    of the same layout.
+
+    Counts, per column, the non-empty values that fit the inferred type, and
+    the records with more fields than there are columns (short records only
+    add nulls, as in regular analysis). A file conforms when every column
+    matches at least as often as type detection itself requires
+    (type_detection_confidence_threshold) and no record is too wide.
+    """
+
+    def __init__(self, columns: List[ColumnSpec], config: TypeConfig):
+        self.columns = columns
+        self.config = config
+        self.record_count = 0
+        self.wide_record_count = 0
+        self._value_counts = [0] * len(columns)
+        self._match_counts = [0] * len(columns)
+
+    def add_record(self, record: List[str]):
+        self.record_count += 1
+        if len(record) > len(self.columns):
+            self.wide_record_count += 1
+
+        for i, column in enumerate(self.columns[:len(record)]):
+            value = record[i].strip()
+            if value:
+                self._value_counts[i] += 1
+                if value_conforms(value, column, self.config):
+                    self._match_counts[i] += 1
+
+    def observe(self, records: Iterable[List[str]]) -> Iterator[List[str]]:
+        for record in records:
+            self.add_record(record)
+            yield record
+
+    def match_ratio(self, index: int) -> float:
+        return self._match_counts[index] / self._value_counts[index] if self._value_counts[index] else 1.0
+
+    def conforms(self) -> bool:
+        return not self.wide_record_count and all(
+            self.match_ratio(i) >= self.config.type_detection_confidence_threshold for i in range(len(self.columns)))
@@ -0,0 +1,156 @@
+import re
+from collections import Counter
+from datetime import date, datetime, time
+from typing import Dict, List, Optional, Tuple
+
+from csv_to_ddl.config.default_config import TypeConfig
+from csv_to_ddl.schema_analysis.models.dialects import DataType
+
+DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%Y/%m/%d",
+                "%d-%m-%Y", "%m-%d-%Y", "%Y.%m.%d", "%d.%m.%Y", "%m.%d.%Y"]
+DATETIME_FORMATS = ["%Y-%m-%d %H:%M:%S", "%d/%m/%Y %H:%M:%S", "%m/%d/%Y %H:%M:%S",
+                    "%Y/%m/%d %H:%M:%S", "%d-%m-%Y %H:%M:%S", "%m-%d-%Y %H:%M:%S",
+                    "%d.%m.%Y %H:%M:%S", "%m.%d.%Y %H:%M:%S", "%Y.%m.%d %H:%M:%S",
+                    "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S.%f"]
+
+DIGIT_RUN = re.compile(r'\d+')
+DIRECTIVE = re.compile(r'%[a-zA-Z]')
+# strptime reads a space in a format as any whitespace run, and %d also accepts a space-padded day,
+# including at the start of a value (' 5/01/2020')
+PADDING_WHITESPACE = re.compile(r'(?<!9)\s+')
+WHITESPACE_RUN = re.compile(r'\s+')
+
+
+def date_signature(value: str) -> str:
+    """
+    Structural signature of a value: digit runs become '9', whitespace runs
+    after a digit a single space (other whitespace is dropped), letters
+    lower case ('2020-01-31 10:00:00' and ' 1/1/2020 9:00:00' give
+    '9-9-9 9:9:9' and '9/9/9 9:9:9'). strptime only accepts a value for a
+    format with the same signature.
+    """
+    signature = DIGIT_RUN.sub('9', value.lower())
+    return WHITESPACE_RUN.sub(' ', PADDING_WHITESPACE.sub('', signature))
+
+
+def format_signature(fmt: str) -> str:
+    """Signature every value a format accepts has (see date_signature)."""
+    return WHITESPACE_RUN.sub(' ', DIRECTIVE.sub('9', fmt).lower())
+
+
+def _by_signature(formats: List[str]) -> Dict[str, Tuple[str, ...]]:
+    candidates: Dict[str, Tuple[str, ...]] = {}
+    for fmt in formats:
+        signature = format_signature(fmt)
+        candidates[signature] = candidates.get(signature, ()) + (fmt,)
+    return candidates
+
+
+# Candidate formats per signature; match_date_format moves the last format that
+# matched to the front, so a column in one format tries that format first
+FORMATS_BY_SIGNATURE = _by_signature(DATE_FORMATS + DATETIME_FORMATS)
+
+
+def _iso_date(value: str) -> Optional[bool]:
+    # Whether a YYYY-MM-DD value is a valid date, None for any other layout (e.g. unpadded fields)
+    if (len(value) != 10 or value[4] != '-' or value[7] != '-' or not value.isascii()
+            or not (value[:4] + value[5:7] + value[8:]).isdigit()):
+        return None
+    try:
+        date(int(value[:4]), int(value[5:7]), int(value[8:]))
+        return True
+    except ValueError:
+        return False
+
+
+def _iso_datetime(value: str, separators: str) -> Optional[bool]:
+    # Same for YYYY-MM-DD?HH:MM:SS with one of separators between date and time
+    if (len(value) != 19 or value[10] not in separators or value[13] != ':' or value[16] != ':'
+            or not value.isascii() or not (value[11:13] + value[14:16] + value[17:]).isdigit()):
+        return None
+    valid_date = _iso_date(value[:10])
+    if not valid_date:
+        return valid_date
+    try:
+        time(int(value[11:13]), int(value[14:16]), int(value[17:]))
+        return True
+    except ValueError:
+        return False
+
+
+# Fixed-offset parsers of the ISO layouts, which are exact where they apply
+ISO_PARSERS = {
+    "%Y-%m-%d": _iso_date,
+    "%Y-%m-%d %H:%M:%S": lambda value: _iso_datetime(value, ' '),
+    "%Y-%m-%dT%H:%M:%S": lambda value: _iso_datetime(value, 'Tt'),
+}
+
+
+def parses(value: str, fmt: str) -> bool:
+    """datetime.strptime(value, fmt) succeeds, through a fixed-offset parser for ISO layouts."""
+    iso_parser = ISO_PARSERS.get(fmt)
+    parsed = iso_parser(value) if iso_parser is not None else None
+    if parsed is not None:
+        return parsed
+    try:
+        datetime.strptime(value, fmt)
+        return True
+    except ValueError:
+        return False
+
+
+def match_date_format(value: str) -> Optional[str]:
+    """
+    A format of DATE_FORMATS or DATETIME_FORMATS that parses a stripped
+    value, None if none does.
+
+    Only the formats sharing the value's signature are tried, so a value
+    that is no date costs one signature instead of up to 11 failed
+    strptime calls, and a date only tries the two or three formats of its
+    layout, the one that matched last first.
+    """
+    signature = date_signature(value)
+    candidates = FORMATS_BY_SIGNATURE.get(signature)
+    if candidates is None:
+        return None
+    for fmt in candidates:
+        if parses(value, fmt):
+            if fmt != candidates[0]:
+                FORMATS_BY_SIGNATURE[signature] = (fmt,) + tuple(other for other in candidates if other != fmt)
+            return fmt
+    return None
+
+
+def infer_date_format(values: List[str], data_type: DataType, config: TypeConfig) -> Optional[str]:
+    """
+    Single format of a DATE or DATETIME column, None for other types.
+
+    Process:
+    1. Take the distinct non-empty values of the type detection sample
+    2. Collect the candidate formats of the type from the signatures of
+       the leading date_format_probe_size values, in format list order
+    3. Check the sample against each candidate (fixed-offset parsers for
+       ISO layouts, one strptime format otherwise) and return the first
+       that parses every value, which settles day/month ambiguity as soon
+       as one value has a day above 12
+    4. Otherwise return the candidate that parses the most values
+
+    The format lets later stages parse the column with one format instead
+    of trying each in turn.
+    """
+    if data_type not in (DataType.DATE, DataType.DATETIME):
+        return None
+    formats = DATE_FORMATS if data_type == DataType.DATE else DATETIME_FORMATS
+
+    non_empty_values = [str(v).strip() for v in values if v is not None and str(v).strip()]
+    sample = list(dict.fromkeys(non_empty_values[:config.type_detection_sample_size]))
+    probe_signatures = {date_signature(value) for value in sample[:config.date_format_probe_size]}
+    candidates = [fmt for fmt in formats if format_signature(fmt) in probe_signatures]
+
+    parsed_counts = Counter()
+    for fmt in candidates:
+        parsed_counts[fmt] = sum(parses(value, fmt) for value in sample)
+        if parsed_counts[fmt] == len(sample):
+            return fmt
+    best = max(candidates, key=lambda fmt: parsed_counts[fmt], default=None)
+    return best if best is not None and parsed_counts[best] else None
@@ -0,0 +1,115 @@
+import json
+import re
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional
+
+from csv_to_ddl.schema_analysis.columns_and_types.type_detection.date_format import match_date_format
+from csv_to_ddl.schema_analysis.models.dialects import DataType
+
+# Detection order of detect_column_type, most specific first; bit i of a type mask is TYPE_ORDER[i]
+TYPE_ORDER = [
+    DataType.BOOLEAN,
+    DataType.INTEGER,
+    DataType.BIGINT,
+    DataType.DECIMAL,
+    DataType.FLOAT,
+    DataType.UUID,
+    DataType.EMAIL,
+    DataType.URL,
+    DataType.DATETIME,
+    DataType.DATE,
+    DataType.TIME,
+    DataType.JSON,
+]
+TYPE_BITS = {data_type: 1 << i for i, data_type in enumerate(TYPE_ORDER)}
+
+BOOLEAN_VALUES = {'true', 'false', '1', '0', 'yes', 'no', 'y', 'n', 't', 'f', 'on', 'off', 'enabled', 'disabled'}
+BIGINT_RANGE = 2 ** 31
+
+INTEGER_PATTERN = re.compile(r'^-?\d+$')
+DECIMAL_PATTERN = re.compile(r'^-?\d+\.\d+$')
+UUID_PATTERN = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[1-5][0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$', re.IGNORECASE)
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+URL_PATTERN = re.compile(r'^https?://[^\s/$.?#].\S*$', re.IGNORECASE)
+TIME_PATTERN = re.compile(r'^\d{1,2}:\d{2}(:\d{2}(\.\d+)?)?$')
+
+NUMBER_STARTS = frozenset('+-.')
+
+
+def classify_value(value: str) -> int:
+    """
+    Bitmask of every type (TYPE_BITS) a stripped, non-empty value is compatible with.
+
+    Accepts exactly what the detectors of type_detectors accept, but looks
+    at the value once, cheapest checks first: the first character, length
+    and separators decide which patterns can match at all, so free text
+    never reaches the numeric parsers or strptime, a number never
+    reaches the date formats (none of which is all digits and dots), and
+    a date only tries the formats of its layout (see match_date_format).
+    """
+    mask = 0
+    first = value[0]
+    if value.lower() in BOOLEAN_VALUES:
+        mask |= TYPE_BITS[DataType.BOOLEAN]
+
+    if first in NUMBER_STARTS or first.isdigit():
+        if INTEGER_PATTERN.match(value):
+            mask |= TYPE_BITS[DataType.INTEGER]
+            if abs(int(value)) > BIGINT_RANGE:
+                mask |= TYPE_BITS[DataType.BIGINT]
+            return mask
+        if DECIMAL_PATTERN.match(value):
+            mask |= TYPE_BITS[DataType.DECIMAL]
+        if '.' in value or 'e' in value or 'E' in value:
+            try:
+                float(value)
+                return mask | TYPE_BITS[DataType.FLOAT]
+            except ValueError:
+                pass
+        if mask:
+            return mask
+
+    if len(value) == 36 and UUID_PATTERN.match(value):
+        return mask | TYPE_BITS[DataType.UUID]
+    if '@' in value and EMAIL_PATTERN.match(value):
+        return mask | TYPE_BITS[DataType.EMAIL]
+    if value[:4].lower() == 'http' and URL_PATTERN.match(value):
+        return mask | TYPE_BITS[DataType.URL]
+
+    if first.isdigit():
+        date_format = match_date_format(value)
+        if date_format is not None:
+            mask |= TYPE_BITS[DataType.DATETIME if ':' in date_format else DataType.DATE]
+        if ':' in value and TIME_PATTERN.match(value):
+            mask |= TYPE_BITS[DataType.TIME]
+        return mask
+
+    if (first == '{' and value[-1] == '}') or (first == '[' and value[-1] == ']'):
+        try:
+            json.loads(value)
+            mask |= TYPE_BITS[DataType.JSON]
+        except json.JSONDecodeError:
+            pass
+    return mask
+
+
+def count_types(values: Iterable[str],
+                classify_all: Optional[Callable[[List[str]], List[int]]] = None) -> Dict[DataType, int]:
+    """
+    Number of values compatible with each type, from one classification
+    per distinct value (see classify_value). classify_all, when given,
+    classifies the list of distinct values in one call instead (see
+    vectorized_classifier.classify_values).
+    """
+    distinct = Counter(values)
+    masks = classify_all(list(distinct)) if classify_all is not None else map(classify_value, distinct)
+    mask_counts = Counter()
+    for mask, count in zip(masks, distinct.values()):
+        mask_counts[mask] += count
+
+    type_counts = dict.fromkeys(TYPE_ORDER, 0)
+    for mask, count in mask_counts.items():
+        for data_type, bit in TYPE_BITS.items():
+            if mask & bit:
+                type_counts[data_type] += count
+    return type_counts
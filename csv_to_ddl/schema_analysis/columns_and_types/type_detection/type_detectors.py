@@ -1,8 +1,10 @@
 import json
 import re
-from datetime import datetime
 from typing import List
 
+from csv_to_ddl.schema_analysis.columns_and_types.type_detection.date_format import DATE_FORMATS, DATETIME_FORMATS, \
+    match_date_format
+
 
 def is_boolean(values: List[str]) -> float:
     """
@@ -128,43 +130,12 @@ def is_url(values: List[str]) -> float:
 
 
 def is_date(values: List[str]) -> float:
-    date_formats: List[str] = ["%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%Y/%m/%d",
-                               "%d-%m-%Y", "%m-%d-%Y", "%Y.%m.%d", "%d.%m.%Y", "%m.%d.%Y"]
-
-    matches = 0
-    successful_formats = []
-
-    for v in values:
-        for fmt in date_formats:
-            try:
-                datetime.strptime(v, fmt)
-                matches += 1
-                successful_formats.append(fmt)
-                break
-            except ValueError:
-                continue
-
+    matches = sum(1 for v in values if match_date_format(v) in DATE_FORMATS)
     return matches / len(values) if values else 0
 
 
 def is_datetime(values: List[str]) -> float:
-    datetime_formats: List[str] = ["%Y-%m-%d %H:%M:%S", "%d/%m/%Y %H:%M:%S", "%m/%d/%Y %H:%M:%S",
-                                   "%Y/%m/%d %H:%M:%S", "%d-%m-%Y %H:%M:%S", "%m-%d-%Y %H:%M:%S",
-                                   "%d.%m.%Y %H:%M:%S", "%m.%d.%Y %H:%M:%S", "%Y.%m.%d %H:%M:%S",
-                                   "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S.%f"]
-    matches = 0
-    successful_formats = []
-
-    for v in values:
-        for fmt in datetime_formats:
-            try:
-                datetime.strptime(v, fmt)
-                matches += 1
-                successful_formats.append(fmt)
-                break
-            except ValueError:
-                continue
-
+    matches = sum(1 for v in values if match_date_format(v) in DATETIME_FORMATS)
     return matches / len(values) if values else 0
 
 
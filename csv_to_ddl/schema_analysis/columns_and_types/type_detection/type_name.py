@@ -1,10 +1,8 @@
 from typing import List, Optional
 
 from csv_to_ddl.config.default_config import TypeConfig
-from csv_to_ddl.schema_analysis.columns_and_types.type_detection.type_detectors import (is_boolean, is_integer, is_bigint,
-                                                                             is_decimal, is_float, is_uuid, is_email,
-                                                                             is_url, is_datetime, is_date, is_time,
-                                                                             is_json)
+from csv_to_ddl.schema_analysis.columns_and_types.type_detection.type_classifier import TYPE_ORDER, count_types
+from csv_to_ddl.schema_analysis.columns_and_types.type_detection.vectorized_classifier import classify_values
 from csv_to_ddl.schema_analysis.models.dialects import DataType
 from csv_to_ddl.schema_analysis.models.table import ColumnStatistics
 
@@ -15,12 +13,14 @@ def detect_column_type(values: List[str], config: TypeConfig, statistics: Option
     
     Process:
     1. Filter out null/empty values for reliable analysis
-    2. Test values against ordered list of type detectors:
+    2. Classify every distinct sample value once into a bitmask of the
+       types it is compatible with (see classify_value) and count the
+       values per type
+    3. Walk the ordered list of types (TYPE_ORDER):
        - Structured types first (boolean, numeric, UUID, email, URL)
        - Date/time types with various format recognition
        - JSON for complex nested data
-    3. Each detector returns confidence ratio (0.0-1.0)
-    4. Select first type meeting confidence threshold
+    4. Select first type whose match ratio meets the confidence threshold
     5. Fallback to string types based on length analysis:
        - CHAR for single characters
        - VARCHAR for short strings
@@ -45,26 +45,12 @@ def detect_column_type(values: List[str], config: TypeConfig, statistics: Option
     if not non_empty_values:
         return DataType.TEXT
 
-    # Ordered type tests - most specific first
-    type_tests = [
-        (is_boolean, DataType.BOOLEAN),
-        (is_integer, DataType.INTEGER),
-        (is_bigint, DataType.BIGINT),
-        (is_decimal, DataType.DECIMAL),
-        (is_float, DataType.FLOAT),
-        (is_uuid, DataType.UUID),
-        (is_email, DataType.EMAIL),
-        (is_url, DataType.URL),
-        (is_datetime, DataType.DATETIME),
-        (is_date, DataType.DATE),
-        (is_time, DataType.TIME),
-        (is_json, DataType.JSON),
-    ]
-
     sample_values = non_empty_values[:min(len(non_empty_values), config.type_detection_sample_size)]
+    type_counts = count_types(sample_values, classify_values if config.vectorized_type_detection else None)
 
-    for test_func, data_type in type_tests:
-        match_ratio = test_func(sample_values)
+    # Ordered type tests - most specific first
+    for data_type in TYPE_ORDER:
+        match_ratio = type_counts[data_type] / len(sample_values)
         if match_ratio >= config.type_detection_confidence_threshold:
             return data_type
 
@@ -0,0 +1,129 @@
+from typing import List
+
+from csv_to_ddl.schema_analysis.columns_and_types.type_detection.type_classifier import TYPE_BITS, classify_value
+from csv_to_ddl.schema_analysis.models.dialects import DataType
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency: without it every value goes through classify_value
+    np = None
+
+NUMPY_AVAILABLE = np is not None
+
+MIN_VECTORIZED_VALUES = 64  # below this, building the arrays costs more than classifying value by value
+MAX_VECTORIZED_WIDTH = 19  # longest value the vectorized checks accept (an ISO datetime)
+MAX_INT64_DIGITS = 18
+
+DIGIT, MINUS, PLUS, DOT, COLON, SPACE, T = (ord(c) for c in '0-+.: T')
+DAYS_IN_MONTH = [0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+
+ISO_DATE_DIGITS = [0, 1, 2, 3, 5, 6, 8, 9]
+ISO_TIME_DIGITS = [11, 12, 14, 15, 17, 18]
+
+
+def classify_values(values: List[str]) -> List[int]:
+    """
+    classify_value of every value, with plain numbers and ISO dates
+    classified in bulk by NumPy.
+
+    Process:
+    1. Short pure-ASCII values are packed into a fixed-width byte matrix
+       (one row per value); others are left to classify_value
+    2. Character classes (digits, signs, decimal points, separators) are
+       tested for all rows at once, which recognizes integers, decimals
+       and floats written with digits, one optional leading sign and at
+       most one point, and YYYY-MM-DD[( |T)HH:MM:SS] dates
+    3. Integers are parsed to int64 in bulk for the BIGINT range check, and
+       date fields for calendar validation (month lengths, leap years)
+    4. Every row those checks do not cover (free text, exponents, other date
+       formats, very long numbers) is classified by classify_value
+
+    The masks are identical to classify_value's; values must be stripped
+    and non-empty.
+    """
+    if np is None or len(values) < MIN_VECTORIZED_VALUES:
+        return [classify_value(value) for value in values]
+
+    rows = [i for i, value in enumerate(values)
+            if len(value) <= MAX_VECTORIZED_WIDTH and value.isascii() and '\x00' not in value]
+    masks = [None] * len(values)
+    if rows:
+        packed = np.array([values[i].encode('ascii') for i in rows], dtype=f'S{MAX_VECTORIZED_WIDTH}')
+        row_masks, covered = _classify_packed(packed)
+        for i, mask, is_covered in zip(rows, row_masks.tolist(), covered.tolist()):
+            if is_covered:
+                masks[i] = mask
+
+    return [mask if mask is not None else classify_value(value) for value, mask in zip(values, masks)]
+
+
+def _classify_packed(packed):
+    codes = packed.view(np.uint8).reshape(len(packed), MAX_VECTORIZED_WIDTH)
+    lengths = np.char.str_len(packed)
+    inside = np.arange(MAX_VECTORIZED_WIDTH) < lengths[:, None]
+    digits = (codes >= DIGIT) & (codes <= DIGIT + 9)
+    masks = np.zeros(len(packed), dtype=np.int64)
+
+    # Numbers: digits, at most one point, a sign only in front
+    signs = (codes == MINUS) | (codes == PLUS)
+    points = codes == DOT
+    point_count = points.sum(axis=1)
+    digit_count = digits.sum(axis=1)
+    numeric = (np.all(digits | points | signs | ~inside, axis=1) & ~signs[:, 1:].any(axis=1)
+               & (point_count <= 1) & (digit_count > 0))
+    first = codes[:, 0]
+    unsigned_or_minus = first != PLUS
+
+    integer = numeric & (point_count == 0) & unsigned_or_minus
+    masks[integer] |= TYPE_BITS[DataType.INTEGER]
+    masks[(lengths == 1) & ((first == DIGIT) | (first == DIGIT + 1))] |= TYPE_BITS[DataType.BOOLEAN]
+
+    long_integer = integer & (digit_count > MAX_INT64_DIGITS)
+    magnitude = _parse_digits(codes, digits & inside)
+    masks[integer & ~long_integer & (magnitude > 2 ** 31)] |= TYPE_BITS[DataType.BIGINT]
+
+    fraction = numeric & (point_count == 1)
+    point_at = points.argmax(axis=1)
+    rows = np.arange(len(packed))
+    digit_before = digits[rows, np.maximum(point_at - 1, 0)] & (point_at > 0)
+    digit_after = digits[rows, np.minimum(point_at + 1, MAX_VECTORIZED_WIDTH - 1)] & (point_at + 1 < lengths)
+    masks[fraction & unsigned_or_minus & digit_before & digit_after] |= TYPE_BITS[DataType.DECIMAL]
+    masks[fraction] |= TYPE_BITS[DataType.FLOAT]
+
+    # ISO dates and datetimes of fixed width
+    iso_date = ((lengths == 10) | (lengths == 19)) & (codes[:, 4] == MINUS) & (codes[:, 7] == MINUS)
+    iso_date &= digits[:, ISO_DATE_DIGITS].all(axis=1)
+    iso_datetime = ((lengths == 19) & ((codes[:, 10] == SPACE) | (codes[:, 10] == T))
+                    & (codes[:, 13] == COLON) & (codes[:, 16] == COLON) & digits[:, ISO_TIME_DIGITS].all(axis=1))
+    iso_date &= (lengths == 10) | iso_datetime
+
+    valid_date = iso_date & _valid_calendar_dates(codes)
+    valid_time = (_field(codes, 11) <= 23) & (_field(codes, 14) <= 59) & (_field(codes, 17) <= 59)
+    masks[valid_date & (lengths == 10)] |= TYPE_BITS[DataType.DATE]
+    masks[valid_date & iso_datetime & valid_time] |= TYPE_BITS[DataType.DATETIME]
+
+    covered = (numeric & ~long_integer) | iso_date
+    return masks, covered
+
+
+def _parse_digits(codes, digit_positions):
+    # Horner's rule over the columns, skipping signs and points; only exact for up to 18 digits
+    values = np.zeros(len(codes), dtype=np.int64)
+    for column in range(codes.shape[1]):
+        use = digit_positions[:, column]
+        values = np.where(use, values * 10 + (codes[:, column].astype(np.int64) - DIGIT), values)
+    return values
+
+
+def _field(codes, start: int, width: int = 2):
+    value = np.zeros(len(codes), dtype=np.int64)
+    for column in range(start, start + width):
+        value = value * 10 + (codes[:, column].astype(np.int64) - DIGIT)
+    return value
+
+
+def _valid_calendar_dates(codes):
+    year, month, day = _field(codes, 0, 4), _field(codes, 5), _field(codes, 8)
+    leap = ((year % 4 == 0) & (year % 100 != 0)) | (year % 400 == 0)
+    month_days = np.array(DAYS_IN_MONTH)[np.clip(month, 0, 12)] + (leap & (month == 2))
+    return (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1) & (day <= month_days)
@@ -0,0 +1,248 @@
+import hashlib
+import itertools
+import sys
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+
+COMPACT_ENTRY_SIZE = 200  # rough bytes of a CompactValue with its prefix, locator and dict slot
+
+
+def stable_hash64(value: Union[str, bytes]) -> int:
+    """64-bit hash that is stable across processes (unlike the builtin hash); ASCII bytes hash like their str."""
+    if isinstance(value, str):
+        value = value.encode('utf-8', 'surrogatepass')
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), 'little')
+
+
+class CompactValue:
+    """
+    Stand-in for a long value: its length, 64-bit hash and a short prefix.
+
+    Compact values are equal when all three agree, so two different values
+    only compare equal on a hash collision between same-length values with
+    the same prefix. Callers that can get the full values back verify such
+    matches (see CompactValueSet).
+    """
+    __slots__ = ('length', 'hash', 'prefix')
+
+    def __init__(self, length: int, value_hash: int, prefix: str):
+        self.length = length
+        self.hash = value_hash
+        self.prefix = prefix
+
+    @classmethod
+    def of(cls, value: Union[str, bytes], prefix_length: int) -> 'CompactValue':
+        """Compact a str, or the raw bytes of a pure ASCII value (which compact like their str)."""
+        prefix = value[:prefix_length]
+        return cls(len(value), stable_hash64(value), prefix if isinstance(prefix, str) else prefix.decode('ascii'))
+
+    def __hash__(self) -> int:
+        return self.hash
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, CompactValue) and self.hash == other.hash
+                and self.length == other.length and self.prefix == other.prefix)
+
+    def __repr__(self) -> str:
+        return f"CompactValue({self.length}, {self.hash:#018x}, {self.prefix!r})"
+
+
+def compact_value(value: Union[str, bytes], compact_length: Optional[int],
+                  prefix_length: int) -> Union[str, bytes, CompactValue]:
+    """The value itself, or its CompactValue when it is longer than compact_length (None never compacts)."""
+    if compact_length is not None and len(value) > compact_length:
+        return CompactValue.of(value, prefix_length)
+    return value
+
+
+def value_hash(value: Union[str, bytes, CompactValue]) -> int:
+    """stable_hash64 of a value, whether it was compacted or not."""
+    return value.hash if isinstance(value, CompactValue) else stable_hash64(value)
+
+
+class ValueInterner:
+    """
+    Dictionary of the distinct values of every table of a run.
+
+    Each value gets a dense integer id the first time it is seen, so a key
+    repeated across tables (in its own table and in every table referencing
+    it) is stored once. A set of values becomes a bitmap over those ids: a
+    Python int whose bit i - base stands for id i, so overlaps between
+    tables are an AND and a bit count (see CompactValueSet.intern).
+    """
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def intern(self, value: str) -> int:
+        value_id = self.ids.get(value)
+        if value_id is None:
+            value_id = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return value_id
+
+    def bitmap(self, values: Iterable[str]) -> Tuple[int, int]:
+        """
+        Intern the values and return (base, bits). The bitmap only spans the
+        byte-aligned range of ids it holds, so a small set of late values
+        stays small.
+        """
+        value_ids = [self.intern(value) for value in values]
+        if not value_ids:
+            return 0, 0
+
+        base = min(value_ids) & ~7
+        bits = bytearray((max(value_ids) - base) // 8 + 1)
+        for value_id in value_ids:
+            value_id -= base
+            bits[value_id >> 3] |= 1 << (value_id & 7)
+        return base, int.from_bytes(bits, 'little')
+
+    def values_of(self, base: int, bits: int) -> Iterator[str]:
+        """The values of a bitmap, in id order."""
+        for index, byte in enumerate(bits.to_bytes((bits.bit_length() + 7) // 8, 'little')):
+            while byte:
+                lowest = byte & -byte
+                yield self.values[base + index * 8 + lowest.bit_length() - 1]
+                byte ^= lowest
+
+    def contains(self, base: int, bits: int, value: str) -> bool:
+        value_id = self.ids.get(value)
+        return value_id is not None and value_id >= base and bool(bits >> (value_id - base) & 1)
+
+
+def bitmap_overlap(base: int, bits: int, other_base: int, other_bits: int) -> int:
+    """Number of ids in both bitmaps of the same ValueInterner."""
+    if base > other_base:
+        bits <<= base - other_base
+    else:
+        other_bits <<= other_base - base
+    return (bits & other_bits).bit_count()
+
+
+class CompactValueSet:
+    """
+    Set of stripped values in which long values are kept as CompactValues.
+
+    Every long value is added with a locator, e.g. its row index, that
+    resolve turns back into the full value. Sizes and overlaps run on the
+    compact forms; only when two compact forms are equal are the full values
+    resolved and compared. A hash collision therefore never merges two
+    different values. The colliding value is kept in full instead.
+
+    Once interned into a ValueInterner shared by all tables, the short values
+    live in the interner and the set keeps only a bitmap of their ids; two
+    sets of the same interner overlap on their bitmaps, which a memory
+    budget may spill to disk (see spill). Pickling (to or from a worker
+    process) writes the short values out again.
+    """
+
+    def __init__(self, compact_length: Optional[int], prefix_length: int, resolve: Callable[[Hashable], str]):
+        self.compact_length = compact_length
+        self.prefix_length = prefix_length
+        self.resolve = resolve
+        self._values: Set[str] = set()
+        self._compact: Dict[CompactValue, Hashable] = {}  # compact form -> locator of its first value
+        self._collided: Set[str] = set()
+        self._interner: Optional[ValueInterner] = None
+        self._base = 0
+        self._bits = 0
+        self._bit_count = 0
+        self._spilled_bits: Optional[memoryview] = None
+
+    def add(self, value: str, locator: Hashable):
+        key = compact_value(value, self.compact_length, self.prefix_length)
+        if not isinstance(key, CompactValue):
+            if self._interner is None:
+                self._values.add(key)
+            elif not self._interner.contains(self._base, self._bitmap(), key):
+                self._set_bitmap(*self._interner.bitmap([*self._short_values(), key]))
+        elif key not in self._compact:
+            self._compact[key] = locator
+        elif self.resolve(self._compact[key]) != value:
+            self._collided.add(value)
+
+    def __len__(self) -> int:
+        return len(self._values) + self._bit_count + len(self._compact) + len(self._collided)
+
+    def __iter__(self) -> Iterator[Union[str, CompactValue]]:
+        yield from self._short_values()
+        yield from self._compact
+        yield from self._collided
+
+    def __contains__(self, value: str) -> bool:
+        key = compact_value(value, self.compact_length, self.prefix_length)
+        if not isinstance(key, CompactValue):
+            if self._interner is not None:
+                return self._interner.contains(self._base, self._bitmap(), key)
+            return key in self._values
+        return self._contains_long(value, key)
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        state.update(_values=set(self._short_values()), _interner=None, _base=0, _bits=0, _bit_count=0,
+                     _spilled_bits=None)
+        return state
+
+    def intern(self, interner: ValueInterner) -> bool:
+        """
+        Move the short values into the shared interner, keeping only their
+        bitmap. Returns False when they already were.
+        """
+        if self._interner is interner:
+            return False
+        values = list(self._short_values())
+        self._interner = interner
+        self._values = set()
+        self._set_bitmap(*interner.bitmap(values))
+        return True
+
+    def nbytes(self) -> int:
+        """Estimated memory of the set; interned values count as their bitmap only."""
+        strings = itertools.chain(self._values, self._collided)
+        return (sys.getsizeof(self._bits) + sum(sys.getsizeof(value) + 8 for value in strings)
+                + len(self._compact) * COMPACT_ENTRY_SIZE)
+
+    def spill(self, directory):
+        """Move the id bitmap of an interned set to a memory-mapped file of a SpillDirectory."""
+        if self._interner is not None and self._spilled_bits is None:
+            self._spilled_bits = directory.map_buffer(self._bits.to_bytes((self._bits.bit_length() + 7) // 8,
+                                                                          'little'))
+            self._bits = 0
+
+    def _set_bitmap(self, base: int, bits: int):
+        self._base, self._bits, self._bit_count = base, bits, bits.bit_count()
+        self._spilled_bits = None
+
+    def _bitmap(self) -> int:
+        if self._spilled_bits is not None:
+            return int.from_bytes(self._spilled_bits, 'little')
+        return self._bits
+
+    def _short_values(self) -> Iterable[str]:
+        if self._interner is not None:
+            return self._interner.values_of(self._base, self._bitmap())
+        return self._values
+
+    def overlap(self, other: 'CompactValueSet') -> int:
+        """Number of values in both sets, i.e. len(self & other) of the full values."""
+        if self._interner is not None and self._interner is other._interner:
+            count = bitmap_overlap(self._base, self._bitmap(), other._base, other._bitmap())
+        else:
+            count = len(set(self._short_values()) & set(other._short_values()))
+        for key, locator in self._compact.items():
+            if key in other._compact or other._collided:
+                count += other._contains_long(self.resolve(locator), key)
+        for value in self._collided:
+            count += other._contains_long(value, CompactValue.of(value, self.prefix_length))
+        return count
+
+    def _contains_long(self, value: str, key: CompactValue) -> bool:
+        locator = self._compact.get(key)
+        if locator is not None and self.resolve(locator) == value:
+            return True
+        return value in self._collided
@@ -1,33 +1,56 @@
 import logging
-from typing import Dict, List
+from typing import Dict, Optional, Union
 
 from csv_to_ddl.config.config_manager import ConfigManager
+from csv_to_ddl.schema_analysis.columns_and_types.value_compaction import ValueInterner
 from csv_to_ddl.schema_analysis.foreign_key.fk_composite import (detect_composite_foreign_keys)
-from csv_to_ddl.schema_analysis.foreign_key.fk_map import (build_reference_keys_map)
+from csv_to_ddl.schema_analysis.foreign_key.fk_map import Rescan, TableKeys, build_reference_keys_map
 from csv_to_ddl.schema_analysis.foreign_key.fk_single import (detect_single_column_foreign_keys)
+from csv_to_ddl.schema_analysis.models.column_store import TableRows
+from csv_to_ddl.schema_analysis.models.spill import MemoryBudget
 from csv_to_ddl.schema_analysis.models.table import TableSpec
 
 
 class ForeignKeyAnalyzer:
     def __init__(self):
         self.config = ConfigManager.get_key_config()
+        self.csv_config = ConfigManager.get_csv_config()
+        self.value_interner = ValueInterner()  # shared by the keys of every table this analyzer sees
+        self.memory_budget = MemoryBudget.from_config(self.csv_config)
         self.logger = logging.getLogger(__name__)
 
+    def extract_keys(self, table_spec: TableSpec, rows: TableRows, rescan: Optional[Rescan] = None) -> TableKeys:
+        """
+        The compact artifacts of an analyzed table that survive its rows (see
+        TableKeys), interned and counted against the memory budget.
+        """
+        table_keys = TableKeys.extract(table_spec, rows, self.csv_config.compact_value_length,
+                                       self.csv_config.compact_prefix_length, rescan, self.value_interner)
+        self._retain(table_keys)
+        return table_keys
+
     def analyze_foreign_keys(self, tables_specs: Dict[str, TableSpec],
-                             tables_data: Dict[str, List[List[str]]]) -> Dict[str, TableSpec]:
-        reference_keys = build_reference_keys_map(tables_specs, tables_data, self.config)
+                             tables_data: Dict[str, Union[TableKeys, TableRows]]) -> Dict[str, TableSpec]:
+        """
+        Detect foreign keys between all tables.
+
+        tables_data holds each table's TableKeys, or its rows, from which the
+        keys are extracted here; nothing else of a table is read. All keys
+        are interned into this analyzer's ValueInterner (keys from worker
+        processes arrive as plain values), so every overlap compares bitmaps.
+        """
+        tables_keys = {table_name: self._keys_of(table_spec, tables_data.get(table_name, []))
+                       for table_name, table_spec in tables_specs.items()}
+        reference_keys = build_reference_keys_map(tables_specs, tables_keys, self.config)
 
         claimed_relationships = {}
         for table_name, table_spec in tables_specs.items():
             table_spec.foreign_keys = []
 
-            table_data = tables_data.get(table_name, [])
-            table_header = reference_keys.get(table_name, {}).get('header', [])
-
-            single_fks = detect_single_column_foreign_keys(table_name, table_header, table_data,
-                                                           table_spec, reference_keys, self.config)
-            composite_fks = detect_composite_foreign_keys(table_name, table_header, table_data,
-                                                           table_spec, reference_keys, self.config)
+            single_fks = detect_single_column_foreign_keys(table_name, tables_keys[table_name], table_spec,
+                                                           reference_keys, self.config)
+            composite_fks = detect_composite_foreign_keys(table_name, tables_keys[table_name], table_spec,
+                                                          reference_keys, self.config)
             all_fks = single_fks + composite_fks
 
             for fk in all_fks:
@@ -38,6 +61,18 @@ class ForeignKeyAnalyzer:
 
         return tables_specs
 
+    def _keys_of(self, table_spec: TableSpec, table_data: Union[TableKeys, TableRows]) -> TableKeys:
+        if not isinstance(table_data, TableKeys):
+            return self.extract_keys(table_spec, table_data)
+        if table_data.intern(self.value_interner):  # keys built in a worker process
+            self._retain(table_data)
+        return table_data
+
+    def _retain(self, table_keys: TableKeys):
+        # Keys stay until foreign key detection; past the budget their bitmaps are spilled to disk
+        if self.memory_budget is not None:
+            self.memory_budget.retain(table_keys)
+
     @staticmethod
     def _claim_relationship(fk, table_name, claimed_relationships):
         relationship_pair = tuple(sorted([table_name, fk.referenced_table]))
@@ -2,14 +2,13 @@ import logging
 from typing import Dict, List, Optional
 
 from csv_to_ddl.config.default_config import KeyConfig
-from csv_to_ddl.schema_analysis.foreign_key.fk_map import get_composite_values_from_data
+from csv_to_ddl.schema_analysis.foreign_key.fk_map import TableKeys
 from csv_to_ddl.schema_analysis.models.table import TableSpec, ForeignKeySpec
 
 logger = logging.getLogger(__name__)
 
 
-def detect_composite_foreign_keys(table_name: str,
-                                  table_header: List[str], table_data: List[List[str]], table_spec: TableSpec,
+def detect_composite_foreign_keys(table_name: str, table_keys: TableKeys, table_spec: TableSpec,
                                   reference_keys: Dict[str, Dict], config: KeyConfig) -> List[ForeignKeySpec]:
     """
     Algorithm for detecting multi-column composite foreign key relationships.
@@ -18,7 +17,8 @@ def detect_composite_foreign_keys(table_name: str,
     1. Extract composite primary key patterns from all reference tables
     2. For each composite PK pattern:
        - Find matching column names in current table
-       - Test value overlap using tuple-based comparison
+       - Test value overlap using tuple-based comparison (the table's
+         tuples of those columns come from TableKeys, re-scanned if needed)
        - Calculate confidence based on overlap ratio and naming similarity
     3. Select best matches above confidence threshold
     
@@ -43,8 +43,7 @@ def detect_composite_foreign_keys(table_name: str,
             ref_composite_keys = reference_keys[ref_table]['composite_keys']
             best_match = _evaluate_composite_match(matching_columns,
                                                    ref_table, ref_columns,
-                                                   ref_composite_keys, table_data,
-                                                   table_header, config)
+                                                   ref_composite_keys, table_keys, config)
 
             if best_match:
                 foreign_keys.append(best_match)
@@ -84,10 +83,9 @@ def _find_matching_columns(table_spec: TableSpec, target_columns: List[str]) ->
 def _evaluate_composite_match(source_columns: List[str],
                               ref_table: str, ref_columns: List[str],
                               ref_composite_keys: Dict,
-                              table_data: List[List[str]],
-                              table_header: List[str],
+                              table_keys: TableKeys,
                               config: KeyConfig) -> Optional[ForeignKeySpec]:
-    source_values = get_composite_values_from_data(source_columns, table_header, table_data)
+    source_values = table_keys.composite_column_values(source_columns)
     ref_values = ref_composite_keys.get(tuple(ref_columns))
 
     if not source_values or not ref_values:
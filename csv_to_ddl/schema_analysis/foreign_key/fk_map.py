@@ -1,6 +1,11 @@
-from typing import Dict, List, Set, Tuple
+import functools
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 from csv_to_ddl.config.default_config import KeyConfig
+from csv_to_ddl.schema_analysis.columns_and_types.value_compaction import CompactValueSet, ValueInterner
+from csv_to_ddl.schema_analysis.models.column_store import NULL, ColumnStore, TableRows
+from csv_to_ddl.schema_analysis.models.spill import SpillDirectory
 from csv_to_ddl.schema_analysis.models.table import TableSpec
 
 
@@ -11,48 +16,150 @@ def get_table_headers(columns: List) -> List[str]:
 
 
 def get_single_column_values_from_data(column_name: str,
-                                       table_data: List[List[str]],
-                                       table_headers: List[str]) -> Set[str]:
-    if not table_data or not table_headers:
-        return set()
-
-    try:
-        col_index = table_headers.index(column_name)
-    except ValueError:
-        return set()
-
-    values = set()
-    for row in table_data:
-        if col_index < len(row) and row[col_index] is not None:
-            value = str(row[col_index]).strip()
-            if value:
-                values.add(value)
+                                       table_data: TableRows,
+                                       table_headers: List[str],
+                                       compact_length: Optional[int] = None,
+                                       prefix_length: int = 0) -> CompactValueSet:
+    """
+    Distinct stripped values of one column, read from its dictionary; values
+    longer than compact_length are kept as CompactValues that resolve back
+    through their dictionary code.
+    """
+    column = ColumnStore.of(table_headers, table_data).column(column_name)
+    values = CompactValueSet(compact_length, prefix_length, column.values.__getitem__ if column is not None else None)
+    if column is None:
+        return values
+
+    for code in range(NULL + 1, len(column.values)):
+        values.add(column.values[code], code)
 
     return values
 
 
 def get_composite_values_from_data(column_names: List[str],
-                                   table_header: List[str], table_data: List[List[str]]) -> Set[Tuple[str, ...]]:
-    if not table_data or not table_header:
+                                   table_header: List[str], table_data: TableRows) -> Set[Tuple[str, ...]]:
+    """
+    Distinct value combinations of the columns over rows where none is empty.
+    Grouped on the store's integer row keys; only the distinct combinations
+    are decoded to string tuples, which compare across tables.
+    """
+    store = ColumnStore.of(table_header, table_data)
+    col_indices = [store.index(col_name) for col_name in column_names]
+    if None in col_indices:
         return set()
 
-    try:
-        col_indices = [table_header.index(col_name) for col_name in column_names]
-    except ValueError:
-        return set()
-
-    values = set()
-    for row in table_data:
-        if all(idx < len(row) for idx in col_indices):
-            combo = tuple(str(row[idx]).strip() for idx in col_indices)
-            if all(val for val in combo):
-                values.add(combo)
-
-    return values
+    return store.distinct_tuples(col_indices)
+
+
+# Re-reads a released table's row sample, encoding only the named columns
+Rescan = Callable[[List[str]], Optional[ColumnStore]]
+
+
+def project_rows(header: List[str], rows: TableRows, columns: List[str]) -> ColumnStore:
+    """Rescan of rows that stay in memory anyway (a store is used as it is)."""
+    return rows if isinstance(rows, ColumnStore) else ColumnStore.from_rows(header, rows, columns)
+
+
+class RescannedColumn:
+    """
+    resolve function of a CompactValueSet whose rows were released: maps a
+    dictionary code back to its value through a re-scan of the column, done
+    on the first call. The re-scanned sample holds the same rows, so the
+    column encodes to the same codes.
+    """
+
+    def __init__(self, rescan: Rescan, column_name: str):
+        self.rescan = rescan
+        self.column_name = column_name
+        self._values: Optional[List[str]] = None
+
+    def __call__(self, code: int) -> str:
+        if self._values is None:
+            store = self.rescan([self.column_name])
+            column = store.column(self.column_name) if store is not None else None
+            self._values = column.values if column is not None else []
+        return self._values[code] if code < len(self._values) else ''
+
+
+@dataclass
+class TableKeys:
+    """
+    What foreign key detection needs of a table once its rows are released.
+
+    Holds the distinct value set of every non-empty column (each one may be a
+    foreign key, and the unique ones may be referenced) and the value tuples
+    of a composite primary key. Tuples of other column combinations, asked
+    for when another table's composite key matches them by name, come from a
+    projected re-scan of just those columns; for rows that stay in memory
+    anyway the re-scan projects them (see project_rows). Interned keys keep their
+    short values in the run's ValueInterner (see CompactValueSet.intern),
+    and their bitmaps can be spilled to disk under a MemoryBudget.
+    """
+    header: List[str]
+    single_values: Dict[str, CompactValueSet]
+    composite_values: Dict[Tuple[str, ...], Set[Tuple[str, ...]]] = field(default_factory=dict)
+    rescan: Optional[Rescan] = None
+
+    @classmethod
+    def extract(cls, table_spec: TableSpec, rows: TableRows, compact_length: Optional[int] = None,
+                prefix_length: int = 0, rescan: Optional[Rescan] = None,
+                interner: Optional[ValueInterner] = None) -> 'TableKeys':
+        """
+        Build the keys of an analyzed table from its rows (or column store).
+
+        The result never references the store: long compacted values resolve
+        through RescannedColumn. Without a rescan the rows are assumed to stay
+        in memory and are projected again when needed.
+        """
+        header = get_table_headers(table_spec.columns)
+        store = ColumnStore.of(header, rows)
+        if rescan is None:
+            rescan = functools.partial(project_rows, header, rows)
+
+        single_values = {}
+        for col in table_spec.columns:
+            values = get_single_column_values_from_data(col.name, store, header, compact_length, prefix_length)
+            if values:
+                values.resolve = RescannedColumn(rescan, col.name)
+                single_values[col.name] = values
+
+        composite_values = {}
+        pk_columns = table_spec.primary_key.columns if table_spec.primary_key else []
+        if len(pk_columns) > 1:
+            composite_values[tuple(pk_columns)] = get_composite_values_from_data(pk_columns, header, store)
+
+        table_keys = cls(header, single_values, composite_values, rescan)
+        if interner is not None:
+            table_keys.intern(interner)
+        return table_keys
+
+    def intern(self, interner: ValueInterner) -> bool:
+        """Intern every column value set; True when any of them was not interned into interner yet."""
+        return any([values.intern(interner) for values in self.single_values.values()])
+
+    def nbytes(self) -> int:
+        """Estimated memory of the column value sets; composite key tuples stay in memory and are not counted."""
+        return sum(values.nbytes() for values in self.single_values.values())
+
+    def spill(self, directory: SpillDirectory):
+        for values in self.single_values.values():
+            values.spill(directory)
+
+    def column_values(self, column_name: str) -> Optional[CompactValueSet]:
+        return self.single_values.get(column_name)
+
+    def composite_column_values(self, column_names: List[str]) -> Set[Tuple[str, ...]]:
+        """Distinct non-empty value tuples of the columns, re-scanning them on first use."""
+        key = tuple(column_names)
+        if key not in self.composite_values:
+            store = self.rescan(list(column_names)) if self.rescan is not None else None
+            self.composite_values[key] = (get_composite_values_from_data(list(column_names), store.header, store)
+                                          if store is not None else set())
+        return self.composite_values[key]
 
 
 def build_reference_keys_map(table_specs: Dict[str, TableSpec],
-                             tables_data: Dict[str, List[List[str]]],
+                             tables_keys: Dict[str, TableKeys],
                              config: KeyConfig) -> Dict[str, Dict]:
     reference_keys = {}
 
@@ -64,9 +171,8 @@ def build_reference_keys_map(table_specs: Dict[str, TableSpec],
             'primary_key_columns': set()
         }
 
-        table_header = reference_keys[table_name]['header']
-        table_data = tables_data.get(table_name, [])
-        if not table_header:
+        table_keys = tables_keys.get(table_name)
+        if not reference_keys[table_name]['header'] or table_keys is None:
             continue
 
         pk_columns = table_spec.primary_key.columns if table_spec.primary_key else None
@@ -74,11 +180,11 @@ def build_reference_keys_map(table_specs: Dict[str, TableSpec],
             reference_keys[table_name]['primary_key_columns'].update(pk_columns)
 
             if len(pk_columns) == 1:
-                pk_values = get_single_column_values_from_data(pk_columns[0], table_data, table_header)
+                pk_values = table_keys.column_values(pk_columns[0])
                 if pk_values:
                     reference_keys[table_name]['single_keys'][pk_columns[0]] = pk_values
             else:
-                pk_values = get_composite_values_from_data(pk_columns, table_header, table_data)
+                pk_values = table_keys.composite_column_values(pk_columns)
                 if pk_values:
                     reference_keys[table_name]['composite_keys'][tuple(pk_columns)] = pk_values
 
@@ -87,7 +193,7 @@ def build_reference_keys_map(table_specs: Dict[str, TableSpec],
                     and col.statistics.unique_ratio >= config.pk_uniqueness_threshold
                     and col.statistics.distinct_count > 1
                     and col.name not in reference_keys[table_name]['single_keys']):
-                col_values = get_single_column_values_from_data(col.name, table_data, table_header)
+                col_values = table_keys.column_values(col.name)
                 if col_values:
                     reference_keys[table_name]['single_keys'][col.name] = col_values
 
@@ -1,23 +1,23 @@
 import logging
 import re
-from typing import Dict, List, Set
+from typing import Dict, List
 
 from csv_to_ddl.config.default_config import KeyConfig
-from csv_to_ddl.schema_analysis.foreign_key.fk_map import get_single_column_values_from_data
+from csv_to_ddl.schema_analysis.columns_and_types.value_compaction import CompactValueSet
+from csv_to_ddl.schema_analysis.foreign_key.fk_map import TableKeys
 from csv_to_ddl.schema_analysis.models.table import ForeignKeySpec, TableSpec
 
 logger = logging.getLogger(__name__)
 
 
-def detect_single_column_foreign_keys(table_name: str,
-                                      table_header: List[str], table_data: List[List[str]], table_spec: TableSpec,
+def detect_single_column_foreign_keys(table_name: str, table_keys: TableKeys, table_spec: TableSpec,
                                       reference_keys: Dict[str, Dict], config: KeyConfig) -> List[ForeignKeySpec]:
     """
     Algorithm for detecting single-column foreign key relationships.
     
     Process:
     1. For each column in the current table:
-       - Extract unique values from actual data
+       - Take its distinct values from the table's keys
        - Compare against all potential reference columns in other tables
     2. For each potential reference relationship:
        - Calculate value overlap ratio (how many values exist in reference table)
@@ -25,13 +25,13 @@ def detect_single_column_foreign_keys(table_name: str,
        - Apply primary key bonus if referencing a primary key column
     3. Select best match above confidence threshold for each column
     
-    Uses set intersection to efficiently compute overlaps and applies
-    heuristic scoring to rank potential relationships.
+    Overlaps are bit counts over the tables' interned value bitmaps (see
+    ValueInterner), ranked by heuristic scoring. Compacted long values take
+    part as CompactValues (see CompactValueSet.overlap).
     
     Args:
         table_name: Name of table being analyzed
-        table_header: Column headers for data access
-        table_data: Actual data rows
+        table_keys: Distinct column values of the table (see TableKeys)
         table_spec: Table specification with column metadata
         reference_keys: Map of all potential reference tables and their key columns
         config: Configuration with FK detection parameters
@@ -43,7 +43,7 @@ def detect_single_column_foreign_keys(table_name: str,
 
     # Analyze each column as potential foreign key
     for col in table_spec.columns:
-        col_values = get_single_column_values_from_data(col.name, table_data, table_header)
+        col_values = table_keys.column_values(col.name)
         if not col_values:
             continue
 
@@ -77,7 +77,7 @@ def detect_single_column_foreign_keys(table_name: str,
     return foreign_keys
 
 
-def calculate_match_score(col_values: Set[str], ref_values: Set[str],
+def calculate_match_score(col_values: CompactValueSet, ref_values: CompactValueSet,
                           col_name: str, ref_col_name: str,
                           ref_table: str, reference_keys: Dict[str, Dict],
                           config: KeyConfig) -> tuple[float, float]:
@@ -110,14 +110,15 @@ def calculate_match_score(col_values: Set[str], ref_values: Set[str],
     return max(0.0, final_score), overlap_ratio
 
 
-def _is_valid_fk_relationship(col_values: Set[str], ref_values: Set[str], config: KeyConfig) -> tuple[bool, float]:
+def _is_valid_fk_relationship(col_values: CompactValueSet, ref_values: CompactValueSet,
+                              config: KeyConfig) -> tuple[bool, float]:
     validation_score = 0.0
 
     total = len(col_values)
     if total == 0:
         return False, 0.0
 
-    overlap = len(col_values.intersection(ref_values))
+    overlap = col_values.overlap(ref_values)
     overlap_ratio = overlap / total
     if overlap_ratio > config.fk_overlap_threshold:
         overlap_score = overlap_ratio * config.fk_validation_overlap_bonus
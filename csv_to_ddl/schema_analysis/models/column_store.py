@@ -0,0 +1,205 @@
+import sys
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+from csv_to_ddl.schema_analysis.models.spill import MemoryBudget, SpillDirectory
+
+MISSING = -1  # code of a cell in a record too short to have it
+NULL = 0  # code of an empty (or whitespace-only) cell; values[NULL] is always ''
+
+
+class EncodedColumn:
+    """
+    One column of a table, dictionary encoded.
+
+    Every distinct stripped value is stored once in values; the column
+    itself is an integer array with the code (index into values) of every
+    row. Empty cells share code NULL and cells missing from short records
+    are MISSING; both are also set in the nulls bitmap (bit i of byte
+    i // 8 for row i). A spilled column reads codes and values from
+    memory-mapped files instead (see spill).
+    """
+    __slots__ = ('codes', 'values', 'nulls', '_counts')
+
+    def __init__(self, codes: Union[array, memoryview], values: Sequence[str], nulls: bytearray):
+        self.codes = codes
+        self.values = values
+        self.nulls = nulls
+        self._counts: Optional[Counter] = None
+
+    @classmethod
+    def encode(cls, cells: Sequence[Optional[str]]) -> 'EncodedColumn':
+        """Encode the cells of a column in row order; None marks a missing cell."""
+        codes = array('i')
+        values = ['']
+        nulls = bytearray((len(cells) + 7) // 8)
+        stripped_codes = {'': NULL}
+        raw_codes: Dict[Optional[str], int] = {None: MISSING}
+
+        for row, cell in enumerate(cells):
+            code = raw_codes.get(cell)
+            if code is None:
+                value = cell.strip()
+                code = stripped_codes.get(value)
+                if code is None:
+                    code = stripped_codes[value] = len(values)
+                    values.append(value)
+                raw_codes[cell] = code
+            codes.append(code)
+            if code <= NULL:
+                nulls[row >> 3] |= 1 << (row & 7)
+
+        return cls(codes, values, nulls)
+
+    def __reduce__(self):
+        # A spilled column pickles (e.g. back from a worker process) with its codes and values read into memory
+        return EncodedColumn, (array('i', self.codes), list(self.values), self.nulls)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def nbytes(self) -> int:
+        """Estimated memory of the codes, null bitmap and dictionary."""
+        return (self.codes.itemsize * len(self.codes) + len(self.nulls)
+                + sum(sys.getsizeof(value) + 8 for value in self.values))
+
+    def spill(self, directory: SpillDirectory):
+        """Move codes and dictionary to memory-mapped files; the column reads the same afterwards."""
+        self.codes = directory.map_buffer(self.codes).cast('i')
+        self.values = directory.map_strings(self.values)
+
+    @property
+    def null_count(self) -> int:
+        return int.from_bytes(self.nulls, 'little').bit_count()
+
+    @property
+    def distinct_count(self) -> int:
+        """Number of distinct non-null values; every dictionary entry but '' occurs in the column."""
+        return len(self.values) - 1
+
+    def is_null(self, row: int) -> bool:
+        return bool(self.nulls[row >> 3] >> (row & 7) & 1)
+
+    def code_counts(self) -> Counter:
+        """Number of rows per code, computed once."""
+        if self._counts is None:
+            self._counts = Counter(self.codes)
+        return self._counts
+
+    def non_null_values(self, limit: Optional[int] = None) -> List[str]:
+        """The leading non-null values in row order, at most limit of them."""
+        sample = []
+        for code in self.codes:
+            if code > NULL:
+                sample.append(self.values[code])
+                if len(sample) == limit:
+                    break
+        return sample
+
+
+class ColumnStore:
+    """
+    Columnar, dictionary-encoded copy of a table's rows shared by the analyzers.
+
+    Each column is encoded once (EncodedColumn): stripping, null checks and
+    header lookups happen when the store is built instead of in every
+    analyzer scan. Group-by, uniqueness and overlap then run on integer
+    codes: row_keys combines the codes of several columns into one integer
+    per row, so multi-column grouping hashes ints instead of string tuples.
+    Codes are local to a store; values compared across tables (foreign
+    keys) are decoded back to strings.
+    """
+
+    def __init__(self, header: List[str], columns: List[EncodedColumn], row_count: int):
+        self.header = header
+        self.columns = columns
+        self.row_count = row_count
+        self._indices: Dict[str, int] = {}
+        for index, name in enumerate(header):
+            self._indices.setdefault(name, index)  # the first of duplicate names, like list.index
+
+    @classmethod
+    def from_rows(cls, header: List[str], rows: Sequence[Sequence[str]],
+                  columns: Optional[Iterable[str]] = None, budget: Optional[MemoryBudget] = None) -> 'ColumnStore':
+        """
+        Encode the header's columns of a list of rows or a RawRecordSample
+        (whose columns are decoded column by column, without building rows).
+        With columns, only those named columns are encoded (a projection).
+        With a budget, every column that no longer fits is spilled as soon
+        as it is encoded.
+        """
+        indices = range(len(header)) if columns is None else sorted({header.index(name) for name in columns
+                                                                     if name in header})
+        widths = [len(row) for row in rows]
+        full_width = min(widths, default=0)
+        decoded_column = getattr(rows, 'column', None)
+
+        encoded = []
+        used = 0
+        for index in indices:
+            if decoded_column is not None:
+                cells = decoded_column(index)
+                if index >= full_width:
+                    cells = [cell if index < width else None for cell, width in zip(cells, widths)]
+            elif index < full_width:
+                cells = [row[index] for row in rows]
+            else:
+                cells = [row[index] if index < width else None for row, width in zip(rows, widths)]
+            column = EncodedColumn.encode(cells)
+            if budget is not None:
+                used += budget.fit(column, used)
+            encoded.append(column)
+
+        return cls([header[index] for index in indices], encoded, len(widths))
+
+    @classmethod
+    def of(cls, header: List[str], rows: 'TableRows') -> 'ColumnStore':
+        """The store itself, or a store built from plain rows; lets analyzers accept either."""
+        return rows if isinstance(rows, ColumnStore) else cls.from_rows(header, rows)
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def index(self, name: str) -> Optional[int]:
+        return self._indices.get(name)
+
+    def column(self, name: str) -> Optional[EncodedColumn]:
+        index = self._indices.get(name)
+        return self.columns[index] if index is not None else None
+
+    def row_keys(self, indices: Iterable[int], skip_nulls: bool = False) -> List[Optional[int]]:
+        """
+        One integer key per row for the combination of the given columns.
+
+        Codes are combined in mixed radix (each column's dictionary size), so
+        two rows share a key exactly when they share the stripped values of
+        every column. Rows missing a column, or with skip_nulls holding an
+        empty value in one, get None.
+        """
+        lowest = NULL + 1 if skip_nulls else NULL
+        keys: List[Optional[int]] = [0] * self.row_count
+        for index in indices:
+            column = self.columns[index]
+            radix = len(column.values)
+            keys = [key * radix + code if key is not None and code >= lowest else None
+                    for key, code in zip(keys, column.codes)]
+        return keys
+
+    def decode_key(self, indices: Sequence[int], key: int) -> Tuple[str, ...]:
+        """The stripped values a row key of row_keys(indices) stands for."""
+        values = []
+        for index in reversed(indices):
+            column = self.columns[index]
+            key, code = divmod(key, len(column.values))
+            values.append(column.values[code])
+        return tuple(reversed(values))
+
+    def distinct_tuples(self, indices: Sequence[int]) -> Set[Tuple[str, ...]]:
+        """Distinct value combinations of the given columns over rows where none of them is empty."""
+        keys = set(self.row_keys(indices, skip_nulls=True))
+        keys.discard(None)
+        return {self.decode_key(indices, key) for key in keys}
+
+
+TableRows = Union[List[List[str]], ColumnStore]
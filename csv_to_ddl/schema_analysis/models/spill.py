@@ -0,0 +1,138 @@
+import logging
+import mmap
+import shutil
+import tempfile
+import weakref
+from array import array
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+
+class SpillDirectory:
+    """
+    Temporary directory of files that spilled data is memory-mapped from.
+
+    Every spilled buffer is written to its own file and read back through a
+    read-only mmap, so it occupies page cache the OS can evict instead of
+    process memory. The directory is removed when it is closed or garbage
+    collected; open maps stay readable until they are released.
+    """
+
+    def __init__(self, parent: Optional[str] = None):
+        self.path = Path(tempfile.mkdtemp(prefix='csv_to_ddl_spill_', dir=parent))
+        self.file_count = 0
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self.path, True)
+
+    def map_buffer(self, buffer) -> memoryview:
+        """Write a bytes-like object (e.g. an array) to a new file and map it back."""
+        with self._new_file() as f:
+            f.write(buffer)
+            return self._map(f)
+
+    def map_strings(self, values: Iterable[str]) -> 'SpilledStrings':
+        """Write strings as UTF-8 with their end offsets and map both back."""
+        ends = array('q')
+        with self._new_file() as f:
+            end = 0
+            for value in values:
+                end += f.write(value.encode('utf-8', 'surrogatepass'))
+                ends.append(end)
+            data = self._map(f)
+        return SpilledStrings(data, self.map_buffer(ends).cast('q'))
+
+    def close(self):
+        self._finalizer()
+
+    def _new_file(self):
+        self.file_count += 1
+        return open(self.path / f"{self.file_count}.bin", 'w+b')
+
+    @staticmethod
+    def _map(f) -> memoryview:
+        f.flush()
+        if f.tell() == 0:
+            return memoryview(b'')  # empty files cannot be mapped
+        return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+class SpilledStrings(Sequence):
+    """Read-only list of strings backed by a spill file; items are decoded on access."""
+
+    def __init__(self, data: memoryview, ends: memoryview):
+        self._data = data
+        self._ends = ends
+
+    def __len__(self) -> int:
+        return len(self._ends)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        end = self._ends[index]
+        start = self._ends[index - 1] if index > 0 else 0
+        return str(self._data[start:end], 'utf-8', 'surrogatepass')
+
+    def __reduce__(self):
+        # Maps do not cross processes: a pickled copy is a plain list read from the file
+        return list, (list(self),)
+
+
+class MemoryBudget:
+    """
+    Soft ceiling on the bytes of column stores and foreign key sets in memory.
+
+    Keys that survive their table (see TableKeys) are retained against the
+    budget; a column store may use whatever the retained keys leave. Once an
+    addition would exceed the budget, it is spilled to the spill directory
+    (created on first use) and read back through mmap instead: a run larger
+    than RAM slows down on page faults rather than failing. Sizes are
+    estimates (see EncodedColumn.nbytes and TableKeys.nbytes); row samples
+    being parsed and the shared value interner are not covered.
+    """
+
+    def __init__(self, max_bytes: int, spill_parent: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.spill_parent = spill_parent
+        self.retained = 0
+        self.spilled = 0
+        self._directory: Optional[SpillDirectory] = None
+
+    @classmethod
+    def from_config(cls, csv_config, processes: int = 1) -> Optional['MemoryBudget']:
+        """The configured budget split between processes, None without --max-memory."""
+        if csv_config.max_memory is None:
+            return None
+        return cls(csv_config.max_memory // max(1, processes), csv_config.spill_dir)
+
+    @property
+    def directory(self) -> SpillDirectory:
+        if self._directory is None:
+            self._directory = SpillDirectory(self.spill_parent)
+            logger.info(f"Memory budget of {self.max_bytes} bytes reached, spilling to {self._directory.path}")
+        return self._directory
+
+    def available(self) -> int:
+        return self.max_bytes - self.retained
+
+    def fit(self, item, used: int = 0) -> int:
+        """
+        Spill item (anything with nbytes and spill) when used bytes already
+        held plus its size exceed what is available.
+
+        Returns:
+            The bytes item keeps in memory
+        """
+        size = item.nbytes()
+        if used + size <= self.available():
+            return size
+        item.spill(self.directory)
+        self.spilled += size
+        return 0
+
+    def retain(self, item):
+        """Fit an item that stays for the rest of the run and count it against the budget."""
+        self.retained += self.fit(item)
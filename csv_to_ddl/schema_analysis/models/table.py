@@ -28,6 +28,7 @@ class ColumnSpec:
     size_spec: ColumnSizeSpec = field(default_factory=ColumnSizeSpec)
     statistics: Optional[ColumnStatistics] = None
     is_auto_increment: bool = False  # For surrogate keys
+    date_format: Optional[str] = None  # strptime format of DATE/DATETIME columns
 
 
 @dataclass
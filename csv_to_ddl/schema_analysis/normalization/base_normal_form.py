@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import List
 
+from csv_to_ddl.schema_analysis.models.column_store import TableRows
 from csv_to_ddl.schema_analysis.models.table import NormalizationSuggestion
 from csv_to_ddl.schema_analysis.models.table import TableSpec
 
@@ -11,5 +12,5 @@ class NormalForm(ABC):
 
     @abstractmethod
     def check(self, table_name: str, header: List[str],
-              rows: List[List[str]], table_spec: TableSpec) -> List[NormalizationSuggestion]:
+              rows: TableRows, table_spec: TableSpec) -> List[NormalizationSuggestion]:
         pass
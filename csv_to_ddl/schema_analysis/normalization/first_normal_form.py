@@ -1,6 +1,7 @@
 import logging
 from typing import List
 
+from csv_to_ddl.schema_analysis.models.column_store import NULL, ColumnStore, TableRows
 from csv_to_ddl.schema_analysis.models.table import NormalizationSuggestion, TableSpec
 from csv_to_ddl.schema_analysis.normalization.base_normal_form import NormalForm
 
@@ -12,7 +13,7 @@ class FirstNormalForm(NormalForm):
         self.logger = logging.getLogger(__name__)
 
     def check(self, table_name: str, header: List[str],
-              rows: List[List[str]], table_spec: TableSpec) -> List[NormalizationSuggestion]:
+              rows: TableRows, table_spec: TableSpec) -> List[NormalizationSuggestion]:
         """
         First Normal Form violation detection algorithm.
         
@@ -20,10 +21,11 @@ class FirstNormalForm(NormalForm):
         1NF requires that each cell contains only a single, atomic value.
         
         Process:
-        1. For each column, scan all cell values for multi-value indicators:
+        1. For each column, scan its distinct values for multi-value indicators:
            - Common separators: comma (,), semicolon (;), pipe (|)
            - Whitespace separators: newline (\n), tab (\t)
-        2. Calculate violation ratio: cells with separators / total cells
+        2. Calculate violation ratio: non-empty cells with separators / non-empty
+           cells, weighting each distinct value by the number of rows holding it
         3. Generate suggestions for columns above threshold (10%)
         
         Multi-value violations typically occur in:
@@ -39,8 +41,9 @@ class FirstNormalForm(NormalForm):
             List of normalization suggestions for 1NF violations
         """
         suggestions = []
+        store = ColumnStore.of(header, rows)
 
-        if not rows or not header:
+        if not store or not header:
             return suggestions
 
         for col_idx, col_name in enumerate(header):
@@ -49,17 +52,16 @@ class FirstNormalForm(NormalForm):
             multi_value_count = 0
             total_count = 0
 
-            # Scan column for multi-value patterns
-            for row in rows:
-                if col_idx < len(row) and row[col_idx]:
-                    cell_value = str(row[col_idx]).strip()
-                    total_count += 1
+            # Scan column values for multi-value patterns, once per distinct value
+            column = store.columns[col_idx]
+            for code, count in column.code_counts().items():
+                if code <= NULL:
+                    continue
+                total_count += count
 
-                    # Check for any multi-value separator
-                    for indicator in multi_value_indicators:
-                        if indicator in cell_value:
-                            multi_value_count += 1
-                            break  # Count cell once even if multiple separators
+                # Check for any multi-value separator
+                if any(indicator in column.values[code] for indicator in multi_value_indicators):
+                    multi_value_count += count
 
             # Generate suggestion if violation ratio exceeds threshold
             if total_count > 0:
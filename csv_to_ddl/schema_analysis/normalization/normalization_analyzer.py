@@ -2,6 +2,7 @@ import logging
 from typing import List
 
 from csv_to_ddl.config.config_manager import ConfigManager
+from csv_to_ddl.schema_analysis.models.column_store import ColumnStore, TableRows
 from csv_to_ddl.schema_analysis.models.table import TableSpec, NormalizationSuggestion
 from csv_to_ddl.schema_analysis.normalization.first_normal_form import FirstNormalForm
 from csv_to_ddl.schema_analysis.normalization.second_normal_form import SecondNormalForm
@@ -18,8 +19,9 @@ class NormalizationAnalyzer:
         self.logger = logging.getLogger(__name__)
 
     def analyze_normalization(self, table_name: str, table_header: List[str],
-                              table_data: List[List[str]], table_spec: TableSpec) -> List[NormalizationSuggestion]:
+                              table_data: TableRows, table_spec: TableSpec) -> List[NormalizationSuggestion]:
         suggestions = []
+        table_data = ColumnStore.of(table_header, table_data)
 
         first_nf_violations = self.first_nf.check(table_name, table_header, table_data, table_spec)
         suggestions.extend(first_nf_violations)
@@ -2,6 +2,7 @@ import logging
 from typing import Dict, List
 
 from csv_to_ddl.config.default_config import NormalizationConfig
+from csv_to_ddl.schema_analysis.models.column_store import NULL, ColumnStore, TableRows
 from csv_to_ddl.schema_analysis.models.table import NormalizationSuggestion
 from csv_to_ddl.schema_analysis.models.table import TableSpec
 from csv_to_ddl.schema_analysis.normalization.base_normal_form import NormalForm
@@ -15,7 +16,7 @@ class SecondNormalForm(NormalForm):
         self.logger = logging.getLogger(__name__)
 
     def check(self, table_name: str, header: List[str],
-              rows: List[List[str]], table_spec: TableSpec) -> List[NormalizationSuggestion]:
+              rows: TableRows, table_spec: TableSpec) -> List[NormalizationSuggestion]:
         """
         Second Normal Form violation detection algorithm.
         
@@ -41,23 +42,19 @@ class SecondNormalForm(NormalForm):
         if not table_spec or not table_spec.primary_key or len(table_spec.primary_key.columns) <= 1:
             return suggestions
 
-        if not rows or not header:
+        store = ColumnStore.of(header, rows)
+        if not store or not header:
             return suggestions
 
         # Perform 2NF analysis
         pk_columns = table_spec.primary_key.columns
-        pk_indices = []
-        for pk_col in pk_columns:
-            try:
-                pk_indices.append(header.index(pk_col))
-            except ValueError:
-                continue
+        pk_indices = [store.index(pk_col) for pk_col in pk_columns if store.index(pk_col) is not None]
 
         if len(pk_indices) < 2:
             return suggestions
 
         non_key_columns = [col for col in table_spec.columns if col.name not in pk_columns]
-        partial_dependencies = self.find_partial_dependencies(non_key_columns, rows, header, pk_columns, pk_indices)
+        partial_dependencies = self.find_partial_dependencies(non_key_columns, store, pk_columns, pk_indices)
 
         for dependency in partial_dependencies:
             partial_key_clean = dependency['partial_key'].lower().replace('_id', '').replace('id', '')
@@ -84,32 +81,27 @@ class SecondNormalForm(NormalForm):
         return suggestions
 
 
-    def find_partial_dependencies(self, non_key_columns: List, rows: List[List[str]],
-                                  headers: List[str], pk_columns: List[str],
-                                  pk_indices: List[int]) -> List[Dict]:
+    def find_partial_dependencies(self, non_key_columns: List, store: ColumnStore,
+                                  pk_columns: List[str], pk_indices: List[int]) -> List[Dict]:
         dependencies = []
 
-        if len(rows) < self.config.nf2_min_rows_for_analysis:
+        if len(store) < self.config.nf2_min_rows_for_analysis:
             return dependencies
 
+        # Key codes per row for the full key and for each key part, shared by all non-key columns
+        full_keys = store.row_keys(pk_indices, skip_nulls=True)
+        partial_keys = [store.row_keys([pk_part_index], skip_nulls=True) for pk_part_index in pk_indices]
+
         for col in non_key_columns:
-            try:
-                col_index = headers.index(col.name)
-            except ValueError:
+            column = store.column(col.name)
+            if column is None:
                 continue
 
-            col_values = set()
-            for row in rows:
-                if len(row) > col_index and row[col_index] and str(row[col_index]).strip():
-                    col_values.add(row[col_index])
-
-            if len(col_values) < self.config.nf2_min_column_values:
+            if column.distinct_count < self.config.nf2_min_column_values:
                 continue
 
-            for i, pk_part_index in enumerate(pk_indices):
-                partial_key_groups, full_key_groups = self._build_key_groups(
-                    rows, col_index, [pk_part_index], pk_indices
-                )
+            for i, pk_part_keys in enumerate(partial_keys):
+                partial_key_groups, full_key_groups = self._build_key_groups(column.codes, pk_part_keys, full_keys)
 
                 if not partial_key_groups or not full_key_groups:
                     continue
@@ -129,32 +121,22 @@ class SecondNormalForm(NormalForm):
         return dependencies
 
     @staticmethod
-    def _build_key_groups(rows, dependent_col_index, partial_key_indices, full_key_indices):
+    def _build_key_groups(dependent_codes, partial_keys, full_keys):
+        # Groups the dependent column's codes by key; rows with an empty or missing key part or value are skipped
         partial_key_groups = {}
         full_key_groups = {}
 
-        for row in rows:
-            if len(row) <= max(partial_key_indices + full_key_indices + [dependent_col_index]):
+        for dependent_code, partial_key, full_key in zip(dependent_codes, partial_keys, full_keys):
+            if full_key is None or dependent_code <= NULL:
                 continue
 
-            partial_key_vals = [row[i] for i in partial_key_indices]
-            full_key_vals = [row[i] for i in full_key_indices]
-            dependent_val = row[dependent_col_index]
-
-            if any(val is None or str(val).strip() == '' for val in
-                   partial_key_vals + full_key_vals + [dependent_val]):
-                continue
-
-            partial_key = tuple(partial_key_vals)
-            full_key = tuple(full_key_vals)
-
             if partial_key not in partial_key_groups:
-                partial_key_groups[partial_key] = []
-            partial_key_groups[partial_key].append(dependent_val)
+                partial_key_groups[partial_key] = set()
+            partial_key_groups[partial_key].add(dependent_code)
 
             if full_key not in full_key_groups:
-                full_key_groups[full_key] = []
-            full_key_groups[full_key].append(dependent_val)
+                full_key_groups[full_key] = set()
+            full_key_groups[full_key].add(dependent_code)
 
         return partial_key_groups, full_key_groups
 
@@ -163,7 +145,7 @@ class SecondNormalForm(NormalForm):
         if not key_groups:
             return 0.0
 
-        determinations = sum(1 for vals in key_groups.values() if len(set(vals)) == 1)
+        determinations = sum(1 for vals in key_groups.values() if len(vals) == 1)
         return determinations / len(key_groups)
 
     def _evaluate_dependency_strength(self, partial_strength, full_strength):
@@ -1,7 +1,8 @@
 import logging
-from typing import List, Dict
+from typing import Dict, List, Optional, Sequence
 
 from csv_to_ddl.config.default_config import NormalizationConfig
+from csv_to_ddl.schema_analysis.models.column_store import MISSING, ColumnStore, TableRows
 from csv_to_ddl.schema_analysis.models.table import NormalizationSuggestion, TableSpec
 from csv_to_ddl.schema_analysis.normalization.base_normal_form import NormalForm
 
@@ -14,7 +15,7 @@ class ThirdNormalForm(NormalForm):
         self.logger = logging.getLogger(__name__)
 
     def check(self, table_name: str, header: List[str],
-              rows: List[List[str]], table_spec: TableSpec) -> List[NormalizationSuggestion]:
+              rows: TableRows, table_spec: TableSpec) -> List[NormalizationSuggestion]:
         """
         Third Normal Form violation detection algorithm.
         
@@ -35,8 +36,9 @@ class ThirdNormalForm(NormalForm):
             List of normalization suggestions with proposed table splits
         """
         suggestions = []
+        store = ColumnStore.of(header, rows)
 
-        if not table_spec or not rows or not header:
+        if not table_spec or not store or not header:
             self.logger.warning(f"Insufficient data to analyze 3NF for columns_and_types {table_name}")
             return suggestions
 
@@ -52,7 +54,7 @@ class ThirdNormalForm(NormalForm):
         if len(non_key_columns) < self.config.nf3_min_non_key_columns:
             return suggestions
 
-        transitive_deps = self.find_transitive_dependencies(header, rows, pk_columns, non_key_columns)
+        transitive_deps = self.find_transitive_dependencies(store, pk_columns, non_key_columns)
 
         for dependency in transitive_deps:
             lookup_table_columns = [dependency['determinant']] + dependency['dependents']
@@ -70,55 +72,28 @@ class ThirdNormalForm(NormalForm):
 
         return suggestions
 
-    def find_transitive_dependencies(self, headers: List[str], rows: List[List[str]],
+    def find_transitive_dependencies(self, store: ColumnStore,
                                      pk_columns: set, non_key_columns: set) -> List[Dict]:
         dependencies = []
 
-        col_indices = {col: idx for idx, col in enumerate(headers)}
-
         for determinant_col in non_key_columns:
-            det_idx = col_indices[determinant_col]
+            det_codes = store.column(determinant_col).codes
 
             dependent_cols = []
             for dependent_col in non_key_columns:
                 if dependent_col == determinant_col:
                     continue
 
-                dep_idx = col_indices[dependent_col]
-
-                dependency_map = {}
-                det_values_seen = set()
-                has_violation = False
-
-                for row in rows:
-                    if len(row) <= max(det_idx, dep_idx):
-                        continue
-
-                    det_value = row[det_idx].strip()
-                    dep_value = row[dep_idx].strip()
-
-                    det_values_seen.add(det_value)
-
-                    if det_value in dependency_map:
-                        if dependency_map[det_value] != dep_value:
-                            has_violation = True
-                            break
-                    else:
-                        dependency_map[det_value] = dep_value
-
-                if not has_violation:
-                    is_dependent = 1 < len(det_values_seen) == len(dependency_map)
-                    self.logger.debug(f"Checking {determinant_col} -> {dependent_col}: {is_dependent}")
-                    if is_dependent:
-                        dependent_cols.append(dependent_col)
-                else:
-                    self.logger.debug(f"Checking {determinant_col} -> {dependent_col}: False")
+                is_dependent = self._determines(det_codes, store.column(dependent_col).codes)
+                self.logger.debug(f"Checking {determinant_col} -> {dependent_col}: {is_dependent}")
+                if is_dependent:
+                    dependent_cols.append(dependent_col)
 
             if dependent_cols:
-                pk_dependency_exists = self._check_pk_dependency(determinant_col, pk_columns, rows, col_indices)
+                pk_dependency_exists = self._check_pk_dependency(determinant_col, pk_columns, store)
                 
                 if pk_dependency_exists:
-                    confidence = self._calculate_dependency_confidence(rows, col_indices, determinant_col, dependent_cols,
+                    confidence = self._calculate_dependency_confidence(store, determinant_col, dependent_cols,
                                                                        pk_columns)
                     if confidence > self.config.nf3_confidence_threshold:
                         dependencies.append({
@@ -132,45 +107,39 @@ class ThirdNormalForm(NormalForm):
         return dependencies
 
     @staticmethod
-    def _check_pk_dependency(determinant_col: str, pk_columns: set, rows: List[List[str]],
-                             col_indices: Dict[str, int]) -> bool:
+    def _determines(determinant_keys: Sequence[Optional[int]], dependent_keys: Sequence[Optional[int]]) -> bool:
+        """
+        Whether the determinant functionally determines the dependent over the
+        rows having both (a missing cell is a None key or MISSING code), with
+        at least two determinant values. Empty cells count as a value.
+        """
+        dependency_map = {}
+        for det_key, dep_key in zip(determinant_keys, dependent_keys):
+            if det_key is None or det_key == MISSING or dep_key == MISSING:
+                continue
+
+            # Violation: same determinant maps to different dependent values
+            if dependency_map.setdefault(det_key, dep_key) != dep_key:
+                return False
+
+        return len(dependency_map) > 1
+
+    def _check_pk_dependency(self, determinant_col: str, pk_columns: set, store: ColumnStore) -> bool:
         """
         Check if determinant column functionally depends on primary key.
         Returns True if PK → determinant (prerequisite for transitive dependency).
         """
-        det_idx = col_indices[determinant_col]
-        pk_indices = [col_indices[pk_col] for pk_col in pk_columns if pk_col in col_indices]
+        pk_indices = [store.index(pk_col) for pk_col in pk_columns if store.index(pk_col) is not None]
         
         if not pk_indices:
             return False
         
-        pk_to_det_map = {}
-        pk_combinations_seen = set()
-        
-        for row in rows:
-            if len(row) <= max(pk_indices + [det_idx]):
-                continue
-                
-            pk_combination = tuple(row[pk_idx].strip() for pk_idx in pk_indices)
-            det_value = row[det_idx].strip()
-            
-            pk_combinations_seen.add(pk_combination)
-            
-            if pk_combination in pk_to_det_map:
-                # Violation: same PK maps to different determinant values
-                if pk_to_det_map[pk_combination] != det_value:
-                    return False
-            else:
-                pk_to_det_map[pk_combination] = det_value
-        
-
-        return 1 < len(pk_combinations_seen) == len(pk_to_det_map)
+        return self._determines(store.row_keys(pk_indices), store.column(determinant_col).codes)
 
-
-    def _calculate_dependency_confidence(self, rows: List[List[str]], col_indices: Dict[str, int],
-                                         determinant: str, dependents: List[str], pk_columns: set) -> float:
-        det_idx = col_indices[determinant]
-        det_values, total_rows = self._gather_determinant_values(rows, det_idx)
+    def _calculate_dependency_confidence(self, store: ColumnStore, determinant: str, dependents: List[str],
+                                         pk_columns: set) -> float:
+        det_column = store.column(determinant)
+        det_values, total_rows = self._gather_determinant_values(det_column)
 
         if total_rows == 0:
             return 0.0
@@ -181,7 +150,7 @@ class ThirdNormalForm(NormalForm):
         if determinant in pk_columns:
             return 0.0
 
-        consistency_score = self._calculate_consistency_score(rows, col_indices, det_idx, dependents)
+        consistency_score = self._calculate_consistency_score(store, det_column.codes, dependents)
         base_confidence = (self.config.nf3_base_confidence_high_threshold
                            if consistency_score > self.config.nf3_consistency_threshold
                            else self.config.nf3_base_confidence_low_threshold)
@@ -189,35 +158,12 @@ class ThirdNormalForm(NormalForm):
 
         return min(1.0, base_confidence + uniqueness_bonus)
 
-    def _calculate_consistency_score(self, rows, col_indices, det_idx, dependents):
+    def _calculate_consistency_score(self, store, det_codes, dependents):
         consistency_score = 1.0
 
         for dep_col in dependents:
-            dep_idx = col_indices[dep_col]
-
-            dependency_map = {}
-            det_values_seen = set()
-
-            for row in rows:
-                if len(row) <= max(det_idx, dep_idx):
-                    continue
-
-                det_value = row[det_idx].strip()
-                dep_value = row[dep_idx].strip()
-
-                det_values_seen.add(det_value)
-
-                if det_value in dependency_map:
-                    if dependency_map[det_value] != dep_value:
-                        break
-                else:
-                    dependency_map[det_value] = dep_value
-            else:
-                has_dependency = 1 < len(det_values_seen) == len(dependency_map)
-                if has_dependency:
-                    continue
-
-            consistency_score -= self.config.nf3_consistency_penalty
+            if not self._determines(det_codes, store.column(dep_col).codes):
+                consistency_score -= self.config.nf3_consistency_penalty
 
         return consistency_score
 
@@ -227,13 +173,10 @@ class ThirdNormalForm(NormalForm):
                    uniqueness_ratio * self.config.nf3_uniqueness_bonus_multiplier)
 
     @staticmethod
-    def _gather_determinant_values(rows, det_idx):
-        det_values = set()
-        total_rows = 0
-
-        for row in rows:
-            if len(row) > det_idx:
-                det_values.add(row[det_idx].strip())
-                total_rows += 1
+    def _gather_determinant_values(det_column):
+        code_counts = det_column.code_counts()
+        det_values = set(code_counts)
+        det_values.discard(MISSING)
+        total_rows = len(det_column) - code_counts[MISSING]
 
         return det_values, total_rows
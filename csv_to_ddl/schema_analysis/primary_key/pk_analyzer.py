@@ -2,6 +2,7 @@ import logging
 from typing import List, Tuple, Optional
 
 from csv_to_ddl.config.config_manager import ConfigManager
+from csv_to_ddl.schema_analysis.models.column_store import TableRows
 from csv_to_ddl.schema_analysis.models.table import TableSpec, ColumnSpec, PrimaryKeySpec
 from csv_to_ddl.schema_analysis.primary_key.pk_composite import detect_composite_primary_key
 from csv_to_ddl.schema_analysis.primary_key.pk_single import detect_single_key
@@ -14,7 +15,7 @@ class PrimaryKeyAnalyzer:
         self.logger = logging.getLogger(__name__)
 
     def analyze_primary_key(self, table_spec: TableSpec,
-                            header: List[str], rows: List[List[str]]) -> Tuple[PrimaryKeySpec, Optional[ColumnSpec]]:
+                            header: List[str], rows: TableRows) -> Tuple[PrimaryKeySpec, Optional[ColumnSpec]]:
         self.logger.debug(f"Analyzing primary key for columns_and_types {table_spec.name}")
 
         natural_pk = detect_single_key(table_spec, self.config)
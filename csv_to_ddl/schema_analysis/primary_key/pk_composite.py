@@ -2,11 +2,12 @@ import itertools
 from typing import List, Optional
 
 from csv_to_ddl.config.default_config import KeyConfig
+from csv_to_ddl.schema_analysis.models.column_store import ColumnStore, TableRows
 from csv_to_ddl.schema_analysis.models.table import TableSpec, PrimaryKeySpec
 from csv_to_ddl.schema_analysis.primary_key.pk_scoring import calculate_column_pk_score
 
 
-def detect_composite_primary_key(table_spec: TableSpec, rows: List[List[str]],
+def detect_composite_primary_key(table_spec: TableSpec, rows: TableRows,
                                  headers: List[str], config: KeyConfig) -> Optional[PrimaryKeySpec]:
     """
     Algorithm for detecting multi-column composite primary keys.
@@ -15,7 +16,7 @@ def detect_composite_primary_key(table_spec: TableSpec, rows: List[List[str]],
     1. Check if table has enough columns for composite key
     2. Generate all possible column combinations of specified size
     3. For each combination:
-       - Test uniqueness by creating tuples from actual data
+       - Test uniqueness by combining the columns' dictionary codes per row
        - Calculate composite score (sum of individual column scores)
        - Select combination with the highest score above threshold
     
@@ -24,7 +25,7 @@ def detect_composite_primary_key(table_spec: TableSpec, rows: List[List[str]],
     
     Args:
         table_spec: Table specification with column metadata
-        rows: Actual data rows for uniqueness testing
+        rows: Actual data rows (or their ColumnStore) for uniqueness testing
         headers: Column headers for index mapping
         config: Configuration with composite key parameters
         
@@ -36,6 +37,7 @@ def detect_composite_primary_key(table_spec: TableSpec, rows: List[List[str]],
 
     best_composite = None
     best_score = 0.0
+    store = ColumnStore.of(headers, rows)
 
     non_nullable_columns = [col for col in table_spec.columns if not col.nullable]
 
@@ -46,7 +48,7 @@ def detect_composite_primary_key(table_spec: TableSpec, rows: List[List[str]],
         score = 0
         col_names = [col.name for col in col_combination]
 
-        uniqueness = _test_composite_uniqueness(col_names, rows, headers)
+        uniqueness = _test_composite_uniqueness(col_names, store)
 
         if uniqueness >= config.pk_uniqueness_threshold:
             for col in col_combination:
@@ -63,26 +65,21 @@ def detect_composite_primary_key(table_spec: TableSpec, rows: List[List[str]],
     return best_composite
 
 
-def _test_composite_uniqueness(col_names: List[str], rows: List[List[str]], headers: List[str]) -> float:
+def _test_composite_uniqueness(col_names: List[str], store: ColumnStore) -> float:
     """
     Test uniqueness of column combination using actual data.
 
-    Creates tuples from specified columns across all rows and measures
-    the ratio of unique tuples to total tuples.
+    Combines the codes of the specified columns into one integer key per row
+    and measures the ratio of unique keys to rows having all the columns.
 
     Returns:
         Uniqueness ratio (0.0 to 1.0), where 1.0 means all combinations are unique
     """
-    try:
-        col_indices = [headers.index(col_name) for col_name in col_names]
-    except ValueError:
+    col_indices = [store.index(col_name) for col_name in col_names]
+    if None in col_indices:
         return 0.0
 
-    combinations = []
-    for row in rows:
-        if len(row) > max(col_indices):
-            combo = tuple(row[i] for i in col_indices)
-            combinations.append(combo)
+    combinations = [key for key in store.row_keys(col_indices) if key is not None]
 
     if not combinations:
         return 0.0
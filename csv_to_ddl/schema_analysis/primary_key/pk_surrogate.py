@@ -3,6 +3,8 @@ from typing import Tuple
 from csv_to_ddl.schema_analysis.models.dialects import DataType
 from csv_to_ddl.schema_analysis.models.table import TableSpec, ColumnSpec, ColumnStatistics, PrimaryKeySpec
 
+INTEGER_MAX = 2 ** 31 - 1
+
 
 def generate_surrogate_primary_key(table_spec: TableSpec) -> Tuple[PrimaryKeySpec, ColumnSpec]:
     surrogate_name = f"{table_spec.name}_id"
@@ -13,7 +15,7 @@ def generate_surrogate_primary_key(table_spec: TableSpec) -> Tuple[PrimaryKeySpe
         counter += 1
 
     surrogate_column = ColumnSpec(name=surrogate_name,
-                                  data_type=DataType.INTEGER,
+                                  data_type=DataType.BIGINT if table_spec.row_count > INTEGER_MAX else DataType.INTEGER,
                                   nullable=False,
                                   is_auto_increment=True,
                                   statistics=ColumnStatistics(null_count=0,
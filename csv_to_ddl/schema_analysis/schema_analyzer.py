@@ -1,7 +1,10 @@
 import logging
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
+from csv_to_ddl.schema_analysis.columns_and_types.column_profile import RecordCounters
 from csv_to_ddl.schema_analysis.foreign_key.fk_analyzer import ForeignKeyAnalyzer
+from csv_to_ddl.schema_analysis.foreign_key.fk_map import Rescan, TableKeys
+from csv_to_ddl.schema_analysis.models.column_store import ColumnStore, TableRows
 from csv_to_ddl.schema_analysis.models.table import TableSpec
 from csv_to_ddl.schema_analysis.table_analyzer import TableAnalyzer
 
@@ -13,19 +16,53 @@ class SchemaAnalyzer:
         self.logger = logging.getLogger(__name__)
 
     def analyze_tables(self, tables_headers: Dict[str, List[str]],
-                       tables_data: Dict[str, List[List[str]]]) -> Dict[str, TableSpec]:
+                       tables_data: Dict[str, List[List[str]]],
+                       tables_profiles: Optional[Dict[str, RecordCounters]] = None) -> Dict[str, TableSpec]:
+        tables_profiles = tables_profiles or {}
+        return self.analyze_table_stream((table_name, {'header': tables_headers[table_name], 'rows': rows,
+                                                       'profile': tables_profiles.get(table_name)}, None)
+                                         for table_name, rows in tables_data.items())
+
+    def analyze_table_stream(self, tables: Iterable[Tuple[str, Dict, Optional[Rescan]]]) -> Dict[str, TableSpec]:
+        """
+        Two-phase schema analysis that holds the rows of one table at a time.
+
+        Process:
+        1. Take the tables one by one as they are loaded (name, csv_data with
+           header, rows and profile, and a projected re-scan of the table)
+        2. Run column, primary key and normalization analysis on a column
+           store of the rows
+        3. Keep only the table's spec and its TableKeys (distinct values of
+           the columns, composite key tuples) and drop the rows before the
+           next table is loaded
+        4. Detect foreign keys across all tables from the kept keys; column
+           combinations they do not cover are re-scanned
+
+        Peak memory is bounded by the largest table plus the keys. A table
+        without a re-scan keeps its column store for step 4 instead. Under a
+        --max-memory budget, columns and keys that do not fit are spilled to
+        memory-mapped files (see MemoryBudget).
+        """
         self.logger.info("Starting columns_and_types analysis")
 
         tables_specs = {}
+        tables_keys = {}
 
-        for table_name, rows in tables_data.items():
-            header = tables_headers[table_name]
+        for table_name, csv_data, rescan in tables:
+            header = csv_data['header']
+            store = ColumnStore.from_rows(header, csv_data.pop('rows'),
+                                          budget=self.foreign_key_analyzer.memory_budget)
 
             self.logger.info(f"Analyzing columns_and_types: {table_name}")
-            table_spec = self.table_analyzer.analyze_single_table(table_name, header, rows)
+            table_spec = self.table_analyzer.analyze_single_table(table_name, header, store,
+                                                                  csv_data.get('profile'))
             tables_specs[table_name] = table_spec
+            tables_keys[table_name] = self.foreign_key_analyzer.extract_keys(table_spec, store, rescan)
+            del csv_data, store
 
-        self.logger.info("Starting foreign key analysis")
-        tables_specs = self.foreign_key_analyzer.analyze_foreign_keys(tables_specs, tables_data)
+        return self.analyze_foreign_keys(tables_specs, tables_keys)
 
-        return tables_specs
+    def analyze_foreign_keys(self, tables_specs: Dict[str, TableSpec],
+                             tables_data: Dict[str, Union[TableKeys, TableRows]]) -> Dict[str, TableSpec]:
+        self.logger.info("Starting foreign key analysis")
+        return self.foreign_key_analyzer.analyze_foreign_keys(tables_specs, tables_data)
@@ -1,8 +1,10 @@
 import logging
-from typing import List
+from typing import List, Optional
 
 from csv_to_ddl.schema_analysis.columns_and_types.column_analyzer import ColumnAnalyzer
-from csv_to_ddl.schema_analysis.models.table import TableSpec
+from csv_to_ddl.schema_analysis.columns_and_types.column_profile import RecordCounters, TableProfile
+from csv_to_ddl.schema_analysis.models.column_store import ColumnStore, TableRows
+from csv_to_ddl.schema_analysis.models.table import ColumnSpec, TableSpec
 from csv_to_ddl.schema_analysis.normalization.normalization_analyzer import NormalizationAnalyzer
 from csv_to_ddl.schema_analysis.primary_key.pk_analyzer import PrimaryKeyAnalyzer
 
@@ -14,32 +16,43 @@ class TableAnalyzer:
         self.normalization_analyzer = NormalizationAnalyzer()
         self.logger = logging.getLogger(__name__)
 
-    def analyze_single_table(self, table_name: str, header: List[str], rows: List[List[str]]) -> TableSpec:
-        if header and rows:
-            max_cols = max(len(header), max(len(row) for row in rows) if rows else 0)
-            column_data = [[] for _ in range(max_cols)]
+    def analyze_single_table(self, table_name: str, header: List[str], rows: TableRows,
+                             profile: Optional[RecordCounters] = None) -> TableSpec:
+        # Rows are encoded once into a column store that every stage below reads
+        store = ColumnStore.of(header, rows)
 
-            for row in rows:
-                for i in range(max_cols):
-                    value = row[i] if i < len(row) else ''
-                    column_data[i].append(value)
+        if isinstance(profile, TableProfile):
+            columns = self._analyze_profiled_columns(header, profile)
         else:
-            column_data = [[] for _ in header]
+            columns = self._analyze_sampled_columns(header, store)
+            if profile is not None and profile.exact:
+                self._apply_exact_counts(columns, profile)
 
-        columns = []
-        for i, col_name in enumerate(header):
-            values = column_data[i] if i < len(column_data) else []
-            column_spec = self.column_analyzer.analyze_column(col_name, values)
-            columns.append(column_spec)
+        row_count = profile.row_count if profile is not None else len(store)
 
-        table_spec = TableSpec(name=table_name, columns=columns, row_count=len(rows))
+        table_spec = TableSpec(name=table_name, columns=columns, row_count=row_count)
 
-        primary_key, surrogate_column = self.primary_key_analyzer.analyze_primary_key(table_spec, header, rows)
+        primary_key, surrogate_column = self.primary_key_analyzer.analyze_primary_key(table_spec, header, store)
         table_spec.primary_key = primary_key
         if surrogate_column:
             table_spec.columns.append(surrogate_column)
 
-        normalization_suggestions = self.normalization_analyzer.analyze_normalization(table_name, header, rows, table_spec)
+        normalization_suggestions = self.normalization_analyzer.analyze_normalization(table_name, header, store, table_spec)
         table_spec.normalization_suggestions.extend(normalization_suggestions)
 
         return table_spec
+
+    def _analyze_sampled_columns(self, header: List[str], store: ColumnStore) -> List[ColumnSpec]:
+        return [self.column_analyzer.analyze_encoded_column(col_name, store.columns[i])
+                for i, col_name in enumerate(header)]
+
+    def _analyze_profiled_columns(self, header: List[str], profile: TableProfile) -> List[ColumnSpec]:
+        return [self.column_analyzer.analyze_profile(col_name, profile.columns[i])
+                for i, col_name in enumerate(header)]
+
+    @staticmethod
+    def _apply_exact_counts(columns: List[ColumnSpec], counters: RecordCounters):
+        # Null counts seen over the whole file override the ones measured on the sample
+        for i, column in enumerate(columns):
+            column.statistics.null_count = counters.null_count(i)
+            column.nullable = column.statistics.null_count > 0
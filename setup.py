@@ -6,4 +6,5 @@ setup(
     packages=find_packages(where="csv_to_ddl"),
     package_dir={"": "csv_to_ddl"},
     install_requires=[],
+    extras_require={"numpy": ["numpy"]},
 )
\ No newline at end of file
@@ -0,0 +1,75 @@
+import gzip
+import tarfile
+import zipfile
+
+from csv_to_ddl.csv_processing.archives import ArchiveMember
+from csv_to_ddl.csv_processing.csv_analyzer import CSVAnalyzer
+from csv_to_ddl.csv_processing.csv_helpers import open_csv_file
+from csv_to_ddl.csv_processing.file_discovery import find_csv_files
+from csv_to_ddl.parallel_analyzer import ParallelAnalyzer
+
+FILES = {
+    'olist/orders.csv': "order_id,customer_id,status\n" + "".join(f"{i},{i % 9},\"shipped\n{i}\"\n" for i in range(50)),
+    'olist/customers.csv': "customer_id,city\n" + "".join(f"{i},city {i}\n" for i in range(9)),
+    'olist/notes.txt': "not a table\n",
+}
+
+
+def write_archives(tmp_path):
+    extracted = tmp_path / "extracted"
+    for name, text in FILES.items():
+        (extracted / name).parent.mkdir(parents=True, exist_ok=True)
+        (extracted / name).write_text(text)
+    with gzip.open(extracted / "olist" / "reviews.csv.gz", 'wt') as f:
+        f.write("review_id,order_id\n1,3\n2,4\n")
+
+    with zipfile.ZipFile(tmp_path / "datasets.zip", 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for path in sorted(extracted.rglob("*.*")):
+            zip_file.write(path, path.relative_to(extracted).as_posix())
+    with tarfile.open(tmp_path / "datasets.tar.gz", 'w:gz') as tar_file:
+        tar_file.add(extracted / "olist", "olist")
+    return extracted
+
+
+def test_archive_members_read_like_extracted_files(tmp_path):
+    extracted = write_archives(tmp_path)
+
+    members = find_csv_files(tmp_path / "datasets.zip")
+    assert sorted(member.member_name for member in members) == ['olist/customers.csv', 'olist/orders.csv',
+                                                                'olist/reviews.csv.gz']
+    assert all(isinstance(member, ArchiveMember) for member in members)
+    assert [member.name for member in find_csv_files(tmp_path / "datasets.tar.gz" / "olist" / "orders.csv")] == [
+        'orders.csv']
+
+    reviews = ArchiveMember(tmp_path / "datasets.tar.gz", "olist/reviews.csv.gz")
+    with open_csv_file(reviews) as f:
+        assert f.read() == "review_id,order_id\n1,3\n2,4\n"
+
+    expected = CSVAnalyzer().process(extracted / "olist")
+    for input_path in (tmp_path / "datasets.zip", tmp_path / "datasets.tar.gz", tmp_path / "datasets.zip" / "olist"):
+        tables_headers, tables_data, _ = CSVAnalyzer().process(input_path)
+        assert (tables_headers, tables_data) == expected[:2]
+
+
+def test_zip_members_are_analyzed_on_worker_processes(tmp_path):
+    extracted = write_archives(tmp_path)
+
+    tables_specs, tables_data = ParallelAnalyzer(jobs=2).analyze(tmp_path / "datasets.zip")
+    serial_specs, serial_data = ParallelAnalyzer(jobs=2).analyze(extracted)
+
+    assert tables_data == serial_data
+    assert tables_specs == serial_specs
+
+
+def test_tar_members_with_dot_prefixed_names(tmp_path):
+    extracted = write_archives(tmp_path)
+    with tarfile.open(tmp_path / "dotted.tar.gz", 'w:gz') as tar_file:
+        tar_file.add(extracted, ".")
+
+    members = find_csv_files(tmp_path / "dotted.tar.gz" / "olist")
+    assert sorted(member.member_name for member in members) == ['olist/customers.csv', 'olist/orders.csv',
+                                                                'olist/reviews.csv.gz']
+
+    expected = CSVAnalyzer().process(extracted / "olist")
+    tables_headers, tables_data, _ = CSVAnalyzer().process(tmp_path / "dotted.tar.gz")
+    assert (tables_headers, tables_data) == expected[:2]
@@ -0,0 +1,48 @@
+import gzip
+
+from csv_to_ddl.config.config_manager import ConfigManager
+from csv_to_ddl.config.config_provider import DefaultConfigProvider
+from csv_to_ddl.config.default_config import CSVConfig
+from csv_to_ddl.csv_processing.csv_analyzer import CSVAnalyzer
+
+
+def write_small_files(input_dir):
+    for day in range(40):
+        (input_dir / f"events_{day:03d}.csv").write_text(
+            "event_id,kind,amount\n" + "".join(f"{i},{'ab'[i % 2]},{i * day}.5\n" for i in range(20)))
+    with gzip.open(input_dir / "archived.csv.gz", 'wt') as f:
+        f.write("id,label\n1,\"multi\nline\"\n2,plain\n")
+    (input_dir / "large.csv").write_text("id,payload\n" + "".join(f"{i},{'x' * 50}\n" for i in range(200)))
+    (input_dir / "empty.csv").write_text("")
+
+
+def process(input_dir, **csv_options):
+    ConfigManager.initialize(DefaultConfigProvider(csv_config=CSVConfig(**csv_options)))
+    try:
+        return CSVAnalyzer().process(input_dir)
+    finally:
+        ConfigManager.initialize(DefaultConfigProvider())
+
+
+def test_async_ingestion_matches_sequential_loading(tmp_path):
+    write_small_files(tmp_path)
+
+    tables_headers, tables_data, _ = process(tmp_path, async_concurrency=8, async_threads=4,
+                                             async_small_file_size=4096)
+    serial_headers, serial_data, _ = process(tmp_path)
+
+    assert list(tables_headers) == list(serial_headers)
+    assert tables_headers == serial_headers
+    assert tables_data == serial_data
+    assert tables_data['archived.csv'] == [['1', 'multi\nline'], ['2', 'plain']]
+    assert 'empty' not in tables_data
+
+
+def test_async_ingestion_counts_rows(tmp_path):
+    write_small_files(tmp_path)
+
+    _, _, tables_profiles = process(tmp_path, async_concurrency=8, sample_size=5, count_rows=True)
+
+    assert tables_profiles['events_000'].row_count == 20
+    assert tables_profiles['large'].row_count == 200
+    assert tables_profiles['archived.csv'].row_count == 2
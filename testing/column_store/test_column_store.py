@@ -0,0 +1,37 @@
+from csv_to_ddl.schema_analysis.columns_and_types.column_analyzer import ColumnAnalyzer
+from csv_to_ddl.schema_analysis.foreign_key.fk_map import get_composite_values_from_data
+from csv_to_ddl.schema_analysis.models.column_store import MISSING, NULL, ColumnStore
+from csv_to_ddl.schema_analysis.table_analyzer import TableAnalyzer
+
+HEADER = ['order_id', 'city', 'zip']
+ROWS = [['1', ' Paris', '75001'], ['2', 'Paris ', ''], ['3', 'Lyon', '69001'], ['4', '  '], ['5', 'Lyon', '69001']]
+
+
+def test_columns_are_dictionary_encoded_with_null_bitmap():
+    store = ColumnStore.from_rows(HEADER, ROWS)
+    city, zip_code = store.column('city'), store.column('zip')
+
+    assert city.values == ['', 'Paris', 'Lyon'] and list(city.codes) == [1, 1, 2, NULL, 2]
+    assert list(zip_code.codes) == [1, NULL, 2, MISSING, 2]
+    assert [zip_code.is_null(row) for row in range(len(store))] == [False, True, False, True, False]
+    assert zip_code.null_count == 2 and zip_code.distinct_count == 2
+
+    keys = store.row_keys([1, 2])
+    assert keys[2] == keys[4] and keys[0] != keys[1] and keys[3] is None
+    assert store.decode_key([1, 2], keys[0]) == ('Paris', '75001')
+    assert get_composite_values_from_data(['city', 'zip'], HEADER, ROWS) == {('Paris', '75001'), ('Lyon', '69001')}
+
+    assert ColumnAnalyzer._encoded_statistics(city) == ColumnAnalyzer._calculate_statistics(
+        [row[1] if len(row) > 1 else '' for row in ROWS])
+
+
+def test_analyzers_accept_rows_or_store():
+    rows = [[str(i), f"c{i % 3}", f"city-{i % 3}", f"{i % 3}0000"] for i in range(30)]
+    header = ['id', 'customer_id', 'customer_city', 'customer_zip']
+
+    from_rows = TableAnalyzer().analyze_single_table('orders', header, rows)
+    from_store = TableAnalyzer().analyze_single_table('orders', header, ColumnStore.from_rows(header, rows))
+
+    assert from_rows == from_store
+    assert from_store.primary_key.columns == ['id']
+    assert any(suggestion.suggestion_type == '3NF' for suggestion in from_store.normalization_suggestions)
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from csv_to_ddl.config.default_config import TypeConfig
+from csv_to_ddl.schema_analysis.columns_and_types.column_analyzer import ColumnAnalyzer
+from csv_to_ddl.schema_analysis.columns_and_types.type_detection.date_format import DATE_FORMATS, DATETIME_FORMATS, \
+    infer_date_format, match_date_format
+from csv_to_ddl.schema_analysis.columns_and_types.type_detection.type_detectors import is_date, is_datetime
+from csv_to_ddl.schema_analysis.models.dialects import DataType
+
+VALUES = ['2020-02-29', '2019-02-29', '0000-01-01', '2020-1-5', '2020-01- 1', '31/12/2020', '12/31/2020', '1/2/2020',
+          '2020.01.31', '13.13.2020', '20200131', '2020-01-31 23:59:59', '2020-01-31t10:00:00', '2020-01-31T24:00:00',
+          '2020-01-31 10:00:60', '31/12/2020  10:00:00', '2020-01-31 10:00:00.250', '2020-01-31 10:00', 'abc',
+          '12:30', '٢٠٢٠-01-01', ' 5/01/2020', ' 1-12-2020  10:00:00', '\t2020-01-31']
+
+
+def _strptime_format(value, formats):
+    for fmt in formats:
+        try:
+            datetime.strptime(value, fmt)
+            return True
+        except ValueError:
+            continue
+    return False
+
+
+def test_signature_dispatch_accepts_what_strptime_accepts():
+    for value in VALUES + VALUES:  # twice, after the matched formats were moved to the front
+        fmt = match_date_format(value)
+        assert (fmt in DATE_FORMATS) == _strptime_format(value, DATE_FORMATS), value
+        assert (fmt in DATETIME_FORMATS) == _strptime_format(value, DATETIME_FORMATS), value
+        assert is_date([value]) == _strptime_format(value, DATE_FORMATS), value
+        assert is_datetime([value]) == _strptime_format(value, DATETIME_FORMATS), value
+
+
+def test_date_format_is_inferred_per_column():
+    config = TypeConfig()
+    us_dates = [f"{month}/{day}/2021" for month in range(1, 13) for day in range(1, 13)] + ['12/25/2021', '']
+    iso_datetimes = [f"2021-03-{day:02d}T08:{day:02d}:00" for day in range(1, 29)]
+
+    assert infer_date_format(us_dates, DataType.DATE, config) == '%m/%d/%Y'
+    assert infer_date_format(iso_datetimes, DataType.DATETIME, config) == '%Y-%m-%dT%H:%M:%S'
+    assert infer_date_format(us_dates, DataType.VARCHAR, config) is None
+
+    column = ColumnAnalyzer().analyze_column('ordered_at', us_dates)
+    assert column.data_type == DataType.DATE and column.date_format == '%m/%d/%Y'
+    assert ColumnAnalyzer().analyze_column('id', [str(i) for i in range(20)]).date_format is None
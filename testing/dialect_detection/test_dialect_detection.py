@@ -0,0 +1,37 @@
+import csv
+import io
+
+from csv_to_ddl.csv_processing.csv_helpers import split_records
+from csv_to_ddl.csv_processing.dialect_detection import detect_dialect
+
+
+def test_consistent_delimiter_beats_decimal_commas():
+    sample = "price;amount;city\n1,50;2,25;Paris\n3,10;4,00;Rome\n12,00;0,5;Oslo\n"
+
+    dialect = detect_dialect(sample)
+
+    assert dialect.delimiter == ';'
+    assert not dialect.has_quotes and dialect.quote_usage == 'none'
+
+
+def test_delimiters_inside_quoted_fields_are_ignored():
+    sample = 'id|note\n1|"a, b, c"\n2|"multi\nline, text"\n3|plain\n'
+
+    dialect = detect_dialect(sample)
+
+    assert dialect.delimiter == '|'
+    assert dialect.has_quotes and dialect.quote_usage == 'minimal'
+
+
+def test_single_column_sample_falls_back_to_comma():
+    dialect = detect_dialect("name\nAda\nGrace\n")
+
+    assert dialect.delimiter == ','
+    assert dialect.consistency == 0.0
+
+
+def test_split_records_matches_csv_reader():
+    text = ('id,comment,size\n1,plain,5" tv\n2,"quoted, with comma",7\n\n'
+            '3,"spans\ntwo lines ""really""",9\n4,,\n5,last,1')
+
+    assert list(split_records(io.StringIO(text), ',')) == list(csv.reader(io.StringIO(text)))
@@ -0,0 +1,29 @@
+import gzip
+
+from csv_to_ddl.csv_processing.csv_helpers import read_csv_file
+from csv_to_ddl.csv_processing.encoding_detection import detect_encoding
+
+CSV_TEXT = 'name,city\nJosé,São Paulo\n“quoted”,Curitiba\n'
+
+
+def test_detect_encoding_from_bytes():
+    assert detect_encoding(CSV_TEXT.encode('utf-8')) == 'utf-8'
+    assert detect_encoding(CSV_TEXT.encode('utf-8-sig')) == 'utf-8-sig'
+    assert detect_encoding(CSV_TEXT.encode('utf-16')) == 'utf-16'
+    assert detect_encoding(CSV_TEXT.encode('cp1252')) == 'cp1252'
+    assert detect_encoding('José,São Paulo'.encode('latin-1')) == 'latin-1'
+    # A multibyte character cut off by the sample boundary is still UTF-8
+    assert detect_encoding('São'.encode('utf-8')[:2]) == 'utf-8'
+
+
+def test_non_utf8_values_are_not_dropped(tmp_path):
+    expected = [['name', 'city'], ['José', 'São Paulo'], ['“quoted”', 'Curitiba']]
+
+    plain_path = tmp_path / "cities.csv"
+    plain_path.write_bytes(CSV_TEXT.encode('cp1252'))
+    compressed_path = tmp_path / "cities.csv.gz"
+    compressed_path.write_bytes(gzip.compress(CSV_TEXT.encode('cp1252')))
+
+    assert read_csv_file(plain_path, 100, 10) == expected
+    assert read_csv_file(plain_path, 100, 10, use_mmap=True) == expected
+    assert read_csv_file(compressed_path, 100, 10) == expected
@@ -0,0 +1,55 @@
+import gzip
+import zipfile
+
+from csv_to_ddl.csv_processing.csv_analyzer import CSVAnalyzer
+from csv_to_ddl.csv_processing.file_discovery import DiscoveryFilter, discover_csv_files
+
+
+def write_tree(root):
+    (root / "sales" / "2024").mkdir(parents=True)
+    (root / "_tmp").mkdir()
+    (root / "top.csv").write_text("a,b\n1,2\n")
+    (root / "README.txt").write_text("not a table\n")
+    (root / "sales" / "Orders.CSV").write_text("id\n1\n2\n")
+    (root / "sales" / "2024" / "jan.Csv.GZ").write_bytes(gzip.compress(b"id\n3\n"))
+    (root / "_tmp" / "scratch.csv").write_text("x\n")
+    with zipfile.ZipFile(root / "sales" / "vendor.zip", 'w') as zip_file:
+        zip_file.writestr("feed/items.csv", "item\n1\n")
+        zip_file.writestr("feed/deep/old.csv", "item\n0\n")
+
+
+def relative_names(root, discovered):
+    return [str(found.path).replace(str(root) + '/', '') for found in discovered]
+
+
+def test_single_walk_matches_extensions_in_any_case_and_reports_sizes(tmp_path):
+    write_tree(tmp_path)
+
+    discovered = discover_csv_files(tmp_path)
+    first = next(discovered)  # lazy: files come out while the walk is still running
+    found = [first] + list(discovered)
+
+    assert relative_names(tmp_path, found) == ['top.csv', '_tmp/scratch.csv', 'sales/Orders.CSV',
+                                               'sales/vendor.zip/feed/items.csv', 'sales/vendor.zip/feed/deep/old.csv',
+                                               'sales/2024/jan.Csv.GZ']
+    assert found[0].size == len("a,b\n1,2\n")
+    assert found[3].size == len("item\n1\n")
+
+    tables_headers, tables_data, _ = CSVAnalyzer().process(tmp_path)
+    assert tables_data['jan.Csv'] == [['3']]
+
+
+def test_include_exclude_and_depth_limit(tmp_path):
+    write_tree(tmp_path)
+
+    def names(**options):
+        return relative_names(tmp_path, discover_csv_files(tmp_path, DiscoveryFilter(**options)))
+
+    assert names(exclude=('_tmp',)) == ['top.csv', 'sales/Orders.CSV', 'sales/vendor.zip/feed/items.csv',
+                                        'sales/vendor.zip/feed/deep/old.csv', 'sales/2024/jan.Csv.GZ']
+    assert names(max_depth=0) == ['top.csv']
+    assert names(max_depth=1, exclude=('_tmp',)) == ['top.csv', 'sales/Orders.CSV']
+    assert names(max_depth=3) == ['top.csv', '_tmp/scratch.csv', 'sales/Orders.CSV',
+                                  'sales/vendor.zip/feed/items.csv', 'sales/2024/jan.Csv.GZ']
+    assert names(include=('sales/*',), exclude=('deep',)) == ['sales/Orders.CSV', 'sales/vendor.zip/feed/items.csv',
+                                                              'sales/2024/jan.Csv.GZ']
@@ -0,0 +1,56 @@
+from csv_to_ddl.config.config_manager import ConfigManager
+from csv_to_ddl.config.config_provider import DefaultConfigProvider
+from csv_to_ddl.config.default_config import CSVConfig
+from csv_to_ddl.csv_processing.csv_analyzer import CSVAnalyzer
+from csv_to_ddl.schema_analysis.columns_and_types.column_analyzer import ColumnAnalyzer
+from csv_to_ddl.schema_analysis.columns_and_types.column_profile import ColumnProfile
+from csv_to_ddl.schema_analysis.schema_analyzer import SchemaAnalyzer
+
+
+def write_orders_csv(path, row_count):
+    with open(path, 'w') as f:
+        f.write("order_id,status,note\n")
+        for i in range(1, row_count + 1):
+            note = "" if i % 10 == 0 else f"note {i % 7}"
+            f.write(f"{i},delivered,{note}\n")
+
+
+def test_profile_matches_column_analysis():
+    values = ["1", "2", " 2 ", "", "abc", None, "10"]
+    profile = ColumnProfile(type_sample_size=1000, distinct_limit=100, sketch_size=64)
+    for value in values:
+        profile.add(value)
+
+    analyzer = ColumnAnalyzer()
+    assert profile.to_statistics() == analyzer._calculate_statistics(values)
+    assert analyzer.analyze_profile("c", profile) == analyzer.analyze_column("c", values)
+
+
+def test_profile_switches_to_sketch_past_distinct_limit():
+    profile = ColumnProfile(type_sample_size=10, distinct_limit=100, sketch_size=256)
+    for i in range(20000):
+        profile.add(str(i))
+
+    statistics = profile.to_statistics()
+    assert not profile.is_distinct_exact
+    assert len(profile.type_sample) == 10
+    assert abs(statistics.distinct_count - 20000) / 20000 < 0.25
+
+
+def test_full_scan_counts_every_record(tmp_path):
+    csv_path = tmp_path / "orders.csv"
+    write_orders_csv(csv_path, 250)
+
+    ConfigManager.initialize(DefaultConfigProvider(csv_config=CSVConfig(sample_size=50, full_scan=True)))
+    try:
+        tables_headers, tables_data, tables_profiles = CSVAnalyzer().process(csv_path)
+        tables_specs = SchemaAnalyzer().analyze_tables(tables_headers, tables_data, tables_profiles)
+    finally:
+        ConfigManager.initialize(DefaultConfigProvider())
+
+    orders = tables_specs["orders"]
+    assert len(tables_data["orders"]) == 49
+    assert orders.row_count == 250
+    assert orders.columns[0].statistics.distinct_count == 250
+    assert orders.columns[2].statistics.null_count == 25
+    assert orders.primary_key.columns == ["order_id"]
@@ -0,0 +1,89 @@
+import gzip
+import random
+import struct
+import zlib
+
+from csv_to_ddl.csv_processing.gzip_index import GzipIndex, index_path_for, iter_decompressed_parallel
+
+
+def orders_csv(row_count):
+    rng = random.Random(3)
+    lines = [b"order_id,customer,amount\n"]
+    for i in range(row_count):
+        lines.append(b"%d,customer %d,%.2f\n" % (i, rng.randrange(5000), rng.random() * 1000))
+    return b"".join(lines)
+
+
+def bgzf_compress(data, block_size=65280):
+    blocks = []
+    for start in range(0, len(data), block_size):
+        chunk = data[start:start + block_size]
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+        body = compressor.compress(chunk) + compressor.flush()
+        header = b'\x1f\x8b\x08\x04' + bytes(6) + struct.pack('<H', 6) + b'BC' + struct.pack('<HH', 2, len(body) + 25)
+        blocks.append(header + body + struct.pack('<II', zlib.crc32(chunk), len(chunk)))
+    return b"".join(blocks)
+
+
+def assert_random_reads(index, data):
+    rng = random.Random(11)
+    for _ in range(50):
+        offset = rng.randrange(len(data))
+        size = rng.randrange(1, 50000)
+        assert index.read(offset, size) == data[offset:offset + size]
+
+
+def test_single_member_reads_from_block_access_points(tmp_path):
+    data = orders_csv(150000)
+    gz_path = tmp_path / "orders.csv.gz"
+    gz_path.write_bytes(gzip.compress(data))
+
+    index = GzipIndex.build(gz_path, span=256 * 1024)
+
+    assert index.kind == 'blocks'
+    assert index.uncompressed_size == len(data)
+    assert len(index.points) > 5
+    assert any(point.bits for point in index.points)
+    assert_random_reads(index, data)
+
+
+def test_multi_member_boundaries_are_access_points(tmp_path):
+    data = orders_csv(60000)
+    pieces = [data[start:start + 500000] for start in range(0, len(data), 500000)]
+    gz_path = tmp_path / "orders.csv.gz"
+    gz_path.write_bytes(b"".join(gzip.compress(piece) for piece in pieces))
+
+    index = GzipIndex.build(gz_path, span=10 ** 9)
+
+    assert index.member_count == len(pieces)
+    assert [point.uncompressed_offset for point in index.points] == [i * 500000 for i in range(len(pieces))]
+    assert_random_reads(index, data)
+
+
+def test_bgzf_split_decompresses_in_parallel(tmp_path):
+    data = orders_csv(60000)
+    gz_path = tmp_path / "orders.csv.gz"
+    gz_path.write_bytes(bgzf_compress(data))
+
+    index = GzipIndex.build(gz_path, span=10 ** 9)
+    ranges = index.split(4)
+
+    assert index.kind == 'bgzf'
+    assert len(ranges) == 4 and ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    assert b"".join(iter_decompressed_parallel(index, jobs=3, part_size=100000)) == data
+
+
+def test_cached_index_is_reused_until_file_changes(tmp_path):
+    data = orders_csv(100000)
+    gz_path = tmp_path / "orders.csv.gz"
+    gz_path.write_bytes(gzip.compress(data))
+    cache_dir = tmp_path / "cache"
+
+    built = GzipIndex.load_or_build(gz_path, 256 * 1024, cache_dir)
+    loaded = GzipIndex.load(gz_path, index_path_for(gz_path, cache_dir))
+
+    assert loaded is not None and loaded.points == built.points
+    assert_random_reads(loaded, data)
+
+    gz_path.write_bytes(gzip.compress(data + b"100000,customer 1,1.00\n"))
+    assert GzipIndex.load(gz_path, index_path_for(gz_path, cache_dir)) is None
@@ -0,0 +1,85 @@
+from csv_to_ddl.config.config_manager import ConfigManager
+from csv_to_ddl.config.config_provider import DefaultConfigProvider
+from csv_to_ddl.config.default_config import CSVConfig
+from csv_to_ddl.csv_processing.csv_analyzer import CSVAnalyzer
+from csv_to_ddl.csv_processing.layout_fingerprint import fingerprint_file
+from csv_to_ddl.layout_analyzer import LayoutAnalyzer
+from csv_to_ddl.schema_analysis.schema_analyzer import SchemaAnalyzer
+
+
+def write_daily_files(input_dir, day_count):
+    for day in range(day_count):
+        with open(input_dir / f"events_2024_01_{day + 1:02d}.csv", 'w') as f:
+            f.write("event_id,amount,created_at,label\n")
+            for i in range(200):
+                label = '' if (i + day) % 9 == 0 else f"label {i % 13}"
+                f.write(f"{day * 1000 + i},{i * 1.5:.2f},2024-01-{day + 1:02d} 10:{i % 60:02d}:00,{label}\n")
+
+
+def test_same_layout_files_share_a_fingerprint(tmp_path):
+    write_daily_files(tmp_path, 2)
+    (tmp_path / "other.csv").write_text("event_id;amount\n1;2\n")
+
+    first, second, other = (fingerprint_file(tmp_path / name, 10) for name in
+                            ("events_2024_01_01.csv", "events_2024_01_02.csv", "other.csv"))
+    assert first == second
+    assert first.header == ('event_id', 'amount', 'created_at', 'label') and first.column_count == 4
+    assert other != first and other.delimiter == ';'
+
+
+def test_members_get_the_same_specs_as_full_inference(tmp_path):
+    write_daily_files(tmp_path, 4)
+    with open(tmp_path / "events_2024_01_04.csv", 'a') as f:
+        f.writelines(f"{i},not a number,yesterday,x\n" for i in range(5000, 5100))
+
+    ConfigManager.initialize(DefaultConfigProvider(csv_config=CSVConfig(dedupe_layouts=True)))
+    try:
+        tables_specs, tables_data = LayoutAnalyzer(jobs=1).analyze(tmp_path)
+        tables_headers, full_data, tables_profiles = CSVAnalyzer().process(tmp_path)
+        full_specs = SchemaAnalyzer().analyze_tables(tables_headers, full_data, tables_profiles)
+    finally:
+        ConfigManager.initialize(DefaultConfigProvider())
+
+    assert sorted(tables_specs) == sorted(full_specs)
+    assert tables_data == full_data
+    for table_name, table_spec in tables_specs.items():
+        full_spec = full_specs[table_name]
+        assert table_spec.columns == full_spec.columns
+        assert table_spec.primary_key == full_spec.primary_key
+        assert table_spec.row_count == full_spec.row_count
+    assert tables_specs['events_2024_01_04'].columns[1].data_type != tables_specs['events_2024_01_01'].columns[1].data_type
+
+
+def test_full_scan_rejects_member_key_duplicated_past_the_sample(tmp_path):
+    for day in (1, 2):
+        with open(tmp_path / f"events_2024_01_0{day}.csv", 'w') as f:
+            f.write("event_id,name\n")
+            f.writelines(f"{i},name {i % 7}\n" for i in range(300))
+            if day == 2:
+                f.write("5,name 6\n")
+
+    ConfigManager.initialize(DefaultConfigProvider(csv_config=CSVConfig(dedupe_layouts=True, full_scan=True,
+                                                                        sample_size=100)))
+    try:
+        tables_specs, _ = LayoutAnalyzer(jobs=1).analyze(tmp_path)
+    finally:
+        ConfigManager.initialize(DefaultConfigProvider())
+
+    assert tables_specs['events_2024_01_01'].primary_key.columns == ['event_id']
+    assert tables_specs['events_2024_01_02'].primary_key.columns != ['event_id']
+
+
+def test_member_in_another_date_format_is_inferred_on_its_own(tmp_path):
+    (tmp_path / "orders_1.csv").write_text("order_id,ordered_on\n" + "".join(f"{i},{i % 28 + 1:02d}/01/2024\n"
+                                                                            for i in range(100)))
+    (tmp_path / "orders_2.csv").write_text("order_id,ordered_on\n" + "".join(f"{i},2024-01-{i % 28 + 1:02d}\n"
+                                                                            for i in range(100)))
+
+    ConfigManager.initialize(DefaultConfigProvider(csv_config=CSVConfig(dedupe_layouts=True)))
+    try:
+        tables_specs, _ = LayoutAnalyzer(jobs=1).analyze(tmp_path)
+    finally:
+        ConfigManager.initialize(DefaultConfigProvider())
+
+    assert tables_specs['orders_1'].columns[1].date_format == '%d/%m/%Y'
+    assert tables_specs['orders_2'].columns[1].date_format == '%Y-%m-%d'
@@ -0,0 +1,66 @@
+import csv
+import io
+import pickle
+
+from csv_to_ddl.csv_processing.csv_helpers import iter_csv_records
+from csv_to_ddl.csv_processing.mmap_reader import MappedCSVFile, read_mapped_sample
+from csv_to_ddl.schema_analysis.columns_and_types.column_analyzer import ColumnAnalyzer
+from csv_to_ddl.schema_analysis.columns_and_types.column_profile import TableProfile
+
+CSV_TEXT = ('id,comment,size\r\n'
+            '1,"multi\nline, quoted",5"\r\n'
+            '2,"he said ""hi""",\r\n'
+            '\r\n'
+            '3,plain,7\r\n')
+
+
+def test_mapped_records_match_csv_reader(tmp_path):
+    csv_path = tmp_path / "comments.csv"
+    csv_path.write_bytes(CSV_TEXT.encode())
+
+    expected = list(csv.reader(io.StringIO(CSV_TEXT, newline='')))
+    with MappedCSVFile(csv_path) as mapped:
+        assert list(mapped.decoded_records()) == expected
+        assert [bytes(field) for field in next(mapped.records())] == [b'id', b'comment', b'size']
+
+    assert list(iter_csv_records(csv_path, 10, use_mmap=True)) == expected
+
+
+def test_projection_decodes_only_requested_columns(tmp_path):
+    csv_path = tmp_path / "comments.csv"
+    csv_path.write_bytes(CSV_TEXT.encode())
+
+    with MappedCSVFile(csv_path) as mapped:
+        projected = mapped.project([0, 2], skip_records=1)
+
+    assert projected == {0: ['1', '2', '', '3'], 2: ['5"', '', '', '7']}
+
+
+def test_empty_file(tmp_path):
+    csv_path = tmp_path / "empty.csv"
+    csv_path.write_bytes(b'')
+
+    assert list(iter_csv_records(csv_path, 10, use_mmap=True)) == []
+
+
+def test_raw_sample_decodes_lazily_and_profiles_from_bytes(tmp_path):
+    csv_path = tmp_path / "comments.csv"
+    csv_path.write_bytes((CSV_TEXT + '4, caf\u00e9 ,\x1f\r\n5,"a""b"\r\n').encode())
+
+    expected = list(csv.reader(io.StringIO(csv_path.read_text(), newline='')))
+    sample = read_mapped_sample(csv_path, 100, 10)
+    assert sample == expected
+    assert sample[-1] == ['5', 'a"b'] and sample[-4] == []
+
+    rows = sample[1:]
+    assert not rows._columns
+    assert rows.column(1) == [row[1] if len(row) > 1 else '' for row in expected[1:]]
+    assert set(rows._columns) == {1}
+    assert pickle.loads(pickle.dumps(rows)) == expected[1:]
+
+    profile = TableProfile(3, 2, len(rows), 16)
+    rows.profile_into(profile)
+    for i, column in enumerate(profile.columns):
+        values = [row[i] if i < len(row) else '' for row in expected[1:]]
+        assert column.to_statistics() == ColumnAnalyzer._calculate_statistics(values)
+        assert column.type_sample == [value.strip() for value in values if value.strip()][:2]
@@ -0,0 +1,74 @@
+import os
+from pathlib import Path
+
+from csv_to_ddl.config.config_manager import ConfigManager
+from csv_to_ddl.config.config_provider import DefaultConfigProvider
+from csv_to_ddl.config.default_config import CSVConfig
+from csv_to_ddl.csv_processing.byte_ranges import (align_to_records, count_quotes, iter_byte_range_records,
+                                                   nominal_offsets)
+from csv_to_ddl.csv_processing.csv_analyzer import CSVAnalyzer
+from csv_to_ddl.parallel_analyzer import ParallelAnalyzer
+from csv_to_ddl.schema_analysis.table_analyzer import TableAnalyzer
+
+DATA_DIR = Path(os.path.dirname(__file__)) / "../no_header/schema_no_header/data"
+
+
+def test_parallel_matches_serial_table_analysis():
+    ConfigManager.initialize(DefaultConfigProvider(csv_config=CSVConfig(jobs=2)))
+    try:
+        tables_specs, tables_data = ParallelAnalyzer(jobs=2).analyze(DATA_DIR)
+        tables_headers, serial_data, _ = CSVAnalyzer().process(DATA_DIR)
+    finally:
+        ConfigManager.initialize(DefaultConfigProvider())
+
+    assert list(tables_specs) == list(tables_headers)
+    assert tables_data == serial_data
+
+    table_analyzer = TableAnalyzer()
+    for table_name, rows in serial_data.items():
+        serial_spec = table_analyzer.analyze_single_table(table_name, tables_headers[table_name], rows)
+        assert tables_specs[table_name].columns == serial_spec.columns
+        assert tables_specs[table_name].primary_key == serial_spec.primary_key
+
+
+def write_reviews_csv(path, row_count):
+    with open(path, 'w') as f:
+        f.write("review_id,comment,score\n")
+        for i in range(row_count):
+            comment = '"multi\nline, ""quoted"""' if i % 3 == 0 else ('' if i % 7 == 0 else f"word {i % 50}")
+            f.write(f"{i},{comment},{i % 11}\n")
+
+
+def test_record_boundaries_skip_quoted_newlines(tmp_path):
+    csv_path = tmp_path / "reviews.csv"
+    write_reviews_csv(csv_path, 20000)
+    offsets = nominal_offsets(0, os.path.getsize(csv_path), 50000)
+    quote_counts = [count_quotes(csv_path, start, end) for start, end in zip(offsets, offsets[1:])]
+
+    boundaries = align_to_records(csv_path, offsets, quote_counts, ',', 'utf-8', 3)
+
+    records = [record for start, end in zip(boundaries, boundaries[1:])
+               for record in iter_byte_range_records(csv_path, start, end, ',', 'utf-8')]
+    assert len(boundaries) > 5
+    assert records[1:] == [[str(i), 'multi\nline, "quoted"' if i % 3 == 0 else ('' if i % 7 == 0 else f"word {i % 50}"),
+                            str(i % 11)] for i in range(20000)]
+
+
+def test_split_file_full_scan_matches_single_pass(tmp_path):
+    write_reviews_csv(tmp_path / "reviews.csv", 30000)
+
+    ConfigManager.initialize(DefaultConfigProvider(csv_config=CSVConfig(full_scan=True)))
+    try:
+        tables_headers, serial_data, tables_profiles = CSVAnalyzer().process(tmp_path)
+        serial_spec = TableAnalyzer().analyze_single_table('reviews', tables_headers['reviews'], serial_data['reviews'],
+                                                           tables_profiles['reviews'])
+
+        ConfigManager.initialize(DefaultConfigProvider(csv_config=CSVConfig(full_scan=True, jobs=2,
+                                                                            parallel_chunk_size=65536)))
+        tables_specs, tables_data = ParallelAnalyzer(jobs=2).analyze(tmp_path)
+    finally:
+        ConfigManager.initialize(DefaultConfigProvider())
+
+    assert tables_data == serial_data
+    assert tables_specs['reviews'].row_count == serial_spec.row_count == 30000
+    assert tables_specs['reviews'].columns == serial_spec.columns
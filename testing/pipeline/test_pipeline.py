@@ -0,0 +1,48 @@
+import gzip
+import itertools
+import threading
+
+import pytest
+
+from csv_to_ddl.csv_processing.csv_helpers import iter_csv_records, iter_pipelined_records
+
+
+def write_orders_gz(path, row_count):
+    lines = ["order_id;note;total\r\n"]
+    for i in range(row_count):
+        note = '"two\r\nlines; ""quoted"""' if i % 4 == 0 else f"café {i % 9}"
+        lines.append(f"{i};{note};{i * 0.5}\r\n")
+    path.write_bytes(gzip.compress("".join(lines).encode('utf-8')))
+
+
+def test_pipeline_matches_single_threaded_reader(tmp_path):
+    gz_path = tmp_path / "orders.csv.gz"
+    write_orders_gz(gz_path, 3000)
+
+    pipelined = list(iter_pipelined_records(gz_path, 10, depth=2, block_size=7, batch_size=5))
+
+    assert pipelined == list(iter_csv_records(gz_path, 10))
+    assert len(pipelined) == 3001 and pipelined[1] == ['0', 'two\nlines; "quoted"', '0.0']
+
+
+def test_closing_early_stops_the_stages(tmp_path):
+    gz_path = tmp_path / "orders.csv.gz"
+    write_orders_gz(gz_path, 20000)
+    threads_before = threading.active_count()
+
+    records = iter_csv_records(gz_path, 10, pipeline_depth=1)
+    head = list(itertools.islice(records, 3))
+    records.close()
+
+    assert head[0] == ['order_id', 'note', 'total']
+    assert threading.active_count() == threads_before
+
+
+def test_stage_errors_reach_the_consumer(tmp_path):
+    gz_path = tmp_path / "orders.csv.gz"
+    write_orders_gz(gz_path, 20000)
+    compressed = gz_path.read_bytes()
+    gz_path.write_bytes(compressed[:len(compressed) // 2])
+
+    with pytest.raises(EOFError):
+        list(iter_csv_records(gz_path, 10, pipeline_depth=2))
@@ -0,0 +1,57 @@
+import csv
+import gzip
+import io
+
+import pytest
+
+from csv_to_ddl.csv_processing.gzip_index import GzipIndex
+from csv_to_ddl.csv_processing.record_counting import count_records
+
+
+def make_csv_text(row_count, trailing_newline=True):
+    lines = ["id,comment,score"]
+    for i in range(row_count):
+        comment = '"multi\nline, ""quoted"""' if i % 3 == 0 else ('' if i % 7 == 0 else f"word {i % 50}")
+        lines.append(f"{i},{comment},{i % 11}")
+    return '\n'.join(lines) + ('\n' if trailing_newline else '')
+
+
+def parsed_count(text):
+    return len(list(csv.reader(io.StringIO(text, newline=''))))
+
+
+@pytest.mark.parametrize("trailing_newline", [True, False])
+def test_parallel_byte_ranges_count_like_the_parser(tmp_path, trailing_newline):
+    text = make_csv_text(5000, trailing_newline)
+    csv_path = tmp_path / "reviews.csv"
+    csv_path.write_text(text)
+
+    assert count_records(csv_path) == parsed_count(text) == 5001
+    # Range boundaries fall inside quoted fields; the parity chain still counts exactly
+    assert count_records(csv_path, jobs=4, part_size=997) == 5001
+
+
+def test_stray_quotes_fall_back_to_parsing(tmp_path):
+    text = 'id,size\n1,5"\n2,"a\nb"\n3,7\n'
+    csv_path = tmp_path / "sizes.csv"
+    csv_path.write_text(text)
+
+    assert count_records(csv_path, jobs=2, part_size=4) == parsed_count(text) == 4
+
+
+@pytest.mark.parametrize("text", ['a,b\r1,2\r3,4\r', 'a,b\r\n1,2\r\n3,4'])
+def test_carriage_return_line_endings(tmp_path, text):
+    csv_path = tmp_path / "points.csv"
+    csv_path.write_bytes(text.encode())
+
+    assert count_records(csv_path, jobs=2, part_size=4) == parsed_count(text) == 3
+
+
+def test_indexed_gzip_ranges(tmp_path):
+    text = make_csv_text(20000)
+    gz_path = tmp_path / "reviews.csv.gz"
+    gz_path.write_bytes(gzip.compress(text.encode()))
+
+    assert count_records(gz_path) == 20001
+    GzipIndex.load_or_build(gz_path, 65536)
+    assert count_records(gz_path, jobs=3, part_size=100000) == 20001
@@ -0,0 +1,39 @@
+from csv_to_ddl.csv_processing.csv_helpers import find_record_start, sample_csv_blocks
+
+
+def write_reviews_csv(path, row_count):
+    with open(path, 'w') as f:
+        f.write("review_id,comment,score\n")
+        for i in range(row_count):
+            comment = '"first line\nsecond, line ""quoted"""' if i % 3 == 0 else 'short'
+            f.write(f"{i},{comment},{i % 5}\n")
+
+
+def test_find_record_start_inside_quoted_field():
+    block = b'"quoted"""\n,ne, two ""q""",4\n17,"line one\nline, two",3\n18,plain,1\n'
+
+    start = find_record_start(block, ',', 'utf-8', expected_columns=3)
+
+    assert block[start:].startswith(b'17,')
+
+
+def test_block_sample_records_are_complete(tmp_path):
+    csv_path = tmp_path / "reviews.csv"
+    write_reviews_csv(csv_path, 20000)
+
+    rows, estimated_row_count = sample_csv_blocks(csv_path, sample_size=2000, delimiter_detection_sample_size=10,
+                                                  block_count=10, block_size=8192, seed=5)
+
+    assert rows[0] == ["review_id", "comment", "score"]
+    assert int(rows[-1][0]) > 15000
+    for review_id, comment, score in rows[1:]:
+        assert int(score) == int(review_id) % 5
+        assert comment == ('first line\nsecond, line "quoted"' if int(review_id) % 3 == 0 else 'short')
+    assert abs(estimated_row_count - 20001) / 20001 < 0.05
+
+
+def test_small_or_compressed_files_are_not_block_sampled(tmp_path):
+    csv_path = tmp_path / "reviews.csv"
+    write_reviews_csv(csv_path, 100)
+
+    assert sample_csv_blocks(csv_path, 2000, 10, block_count=10, block_size=8192) is None
@@ -0,0 +1,46 @@
+from csv_to_ddl.config.config_manager import ConfigManager
+from csv_to_ddl.config.config_provider import DefaultConfigProvider
+from csv_to_ddl.config.default_config import CSVConfig
+from csv_to_ddl.csv_processing.csv_analyzer import CSVAnalyzer
+from csv_to_ddl.csv_processing.csv_helpers import reservoir_sample
+from csv_to_ddl.schema_analysis.models.dialects import DataType
+from csv_to_ddl.schema_analysis.schema_analyzer import SchemaAnalyzer
+
+
+def write_drifting_csv(path, row_count):
+    # 'code' is numeric for the first half of the file and alphanumeric afterwards
+    with open(path, 'w') as f:
+        f.write("event_id,code,comment\n")
+        for i in range(1, row_count + 1):
+            code = str(i) if i <= row_count // 2 else f"X{i}"
+            comment = "" if i % 4 == 0 else "ok"
+            f.write(f"{i},{code},{comment}\n")
+
+
+def test_reservoir_sample_is_seeded_and_ordered():
+    sample = reservoir_sample(range(10000), 50, seed=3)
+
+    assert sample == reservoir_sample(range(10000), 50, seed=3)
+    assert sample == sorted(sample)
+    assert len(set(sample)) == 50
+    assert max(sample) > 5000
+    assert reservoir_sample(range(5), 50) == [0, 1, 2, 3, 4]
+
+
+def test_reservoir_sampling_sees_whole_file(tmp_path):
+    csv_path = tmp_path / "events.csv"
+    write_drifting_csv(csv_path, 4000)
+
+    config = CSVConfig(sample_size=200, sampling='reservoir', sampling_seed=11)
+    ConfigManager.initialize(DefaultConfigProvider(csv_config=config))
+    try:
+        tables_headers, tables_data, tables_profiles = CSVAnalyzer().process(csv_path)
+        tables_specs = SchemaAnalyzer().analyze_tables(tables_headers, tables_data, tables_profiles)
+    finally:
+        ConfigManager.initialize(DefaultConfigProvider())
+
+    events = tables_specs["events"]
+    assert len(tables_data["events"]) == 199
+    assert events.row_count == 4000
+    assert events.columns[1].data_type == DataType.VARCHAR
+    assert events.columns[2].statistics.null_count == 1000
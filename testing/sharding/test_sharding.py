@@ -0,0 +1,56 @@
+from csv_to_ddl.config.config_manager import ConfigManager
+from csv_to_ddl.config.config_provider import DefaultConfigProvider
+from csv_to_ddl.config.default_config import CSVConfig
+from csv_to_ddl.csv_processing.csv_analyzer import CSVAnalyzer
+from csv_to_ddl.parallel_analyzer import ParallelAnalyzer
+
+
+def write_orders(input_dir):
+    orders_dir = input_dir / "orders"
+    orders_dir.mkdir(parents=True)
+    for part in range(3):
+        with open(orders_dir / f"part-{part:05d}.csv", 'w') as f:
+            f.write("order_id,customer_id,note\n")
+            for i in range(part * 100, part * 100 + 100):
+                f.write(f"{i},{i % 7},{'' if i % 10 == 0 else f'note {i}'}\n")
+
+    for region in ('east', 'west'):
+        (input_dir / region).mkdir()
+        (input_dir / region / "customers.csv").write_text("customer_id,name\n1,Ann\n2,Bob\n")
+
+
+def test_shards_group_into_one_table_and_same_stems_stay_apart(tmp_path):
+    write_orders(tmp_path)
+
+    ConfigManager.initialize(DefaultConfigProvider(csv_config=CSVConfig(shard_pattern='part-*.csv')))
+    try:
+        csv_analyzer = CSVAnalyzer()
+        tables = csv_analyzer.group_tables(sorted(tmp_path.rglob("*.csv")), tmp_path)
+        tables_headers, tables_data, tables_profiles = csv_analyzer.process(tmp_path)
+    finally:
+        ConfigManager.initialize(DefaultConfigProvider())
+
+    assert sorted(tables) == ['east_customers', 'orders', 'west_customers']
+    assert [path.name for path in tables['orders']] == ['part-00000.csv', 'part-00001.csv', 'part-00002.csv']
+
+    assert tables_headers['orders'] == ['order_id', 'customer_id', 'note']
+    assert [row[0] for row in tables_data['orders']] == [str(i) for i in range(300)]
+    assert tables_profiles['orders'].row_count == 300
+    assert tables_profiles['orders'].null_count(2) == 30
+
+
+def test_parallel_sharded_full_scan_matches_serial(tmp_path):
+    write_orders(tmp_path)
+
+    ConfigManager.initialize(DefaultConfigProvider(csv_config=CSVConfig(shard_by_directory=True, full_scan=True,
+                                                                        jobs=2)))
+    try:
+        tables_specs, tables_data = ParallelAnalyzer(jobs=2).analyze(tmp_path)
+        _, serial_data, serial_profiles = CSVAnalyzer().process(tmp_path)
+    finally:
+        ConfigManager.initialize(DefaultConfigProvider())
+
+    assert sorted(tables_specs) == ['east', 'orders', 'west']
+    assert tables_data == serial_data
+    assert tables_specs['orders'].row_count == serial_profiles['orders'].row_count == 300
+    assert tables_specs['orders'].columns[0].statistics.distinct_count == 300
@@ -0,0 +1,67 @@
+import os
+import pickle
+from pathlib import Path
+
+from csv_to_ddl.argument_parser import memory_size
+from csv_to_ddl.config.config_manager import ConfigManager
+from csv_to_ddl.config.config_provider import DefaultConfigProvider
+from csv_to_ddl.config.default_config import CSVConfig
+from csv_to_ddl.csv_processing.csv_analyzer import CSVAnalyzer
+from csv_to_ddl.parallel_analyzer import ParallelAnalyzer
+from csv_to_ddl.schema_analysis.models.column_store import ColumnStore
+from csv_to_ddl.schema_analysis.models.spill import MemoryBudget, SpilledStrings
+from csv_to_ddl.schema_analysis.schema_analyzer import SchemaAnalyzer
+from csv_to_ddl.schema_analysis.table_analyzer import TableAnalyzer
+
+DATA_DIR = Path(os.path.dirname(__file__)) / "../no_header/schema_no_header/data"
+
+
+def test_spilled_columns_analyze_like_in_memory_ones(tmp_path):
+    header = ['id', 'customer_id', 'customer_city', 'note']
+    rows = [[str(i), f"c{i % 3}", f"city-{i % 3}", f"été {i % 5}"] for i in range(30)] + [['30', 'c0']]
+    budget = MemoryBudget(memory_size('1K'), str(tmp_path))
+
+    spilled = ColumnStore.from_rows(header, rows, budget=budget)
+
+    assert budget.spilled > 0 and isinstance(spilled.column('note').values, SpilledStrings)
+    assert spilled.column('note').values[1:3] == ['été 0', 'été 1']
+    assert list(spilled.column('note').codes) == list(ColumnStore.from_rows(header, rows).column('note').codes)
+    assert (TableAnalyzer().analyze_single_table('orders', header, spilled)
+            == TableAnalyzer().analyze_single_table('orders', header, rows))
+    copied = pickle.loads(pickle.dumps(spilled.column('note')))
+    assert copied.values == ['', 'été 0', 'été 1', 'été 2', 'été 3', 'été 4'] and copied.codes[-1] == -1
+
+    budget.directory.close()
+    assert not any(tmp_path.iterdir())
+
+
+def test_memory_budget_spills_keys_without_changing_foreign_keys(tmp_path):
+    ConfigManager.initialize(DefaultConfigProvider(csv_config=CSVConfig(max_memory=1, spill_dir=str(tmp_path))))
+    try:
+        schema_analyzer = SchemaAnalyzer()
+        budgeted = schema_analyzer.analyze_table_stream(CSVAnalyzer().iter_tables(DATA_DIR))
+    finally:
+        ConfigManager.initialize(DefaultConfigProvider())
+    unlimited = SchemaAnalyzer().analyze_tables(*CSVAnalyzer().process(DATA_DIR))
+
+    assert schema_analyzer.foreign_key_analyzer.memory_budget.spilled > 0
+    assert schema_analyzer.foreign_key_analyzer.memory_budget.retained == 0
+    assert {name: spec.foreign_keys for name, spec in budgeted.items()} == {name: spec.foreign_keys
+                                                                            for name, spec in unlimited.items()}
+    assert any(spec.foreign_keys for spec in budgeted.values())
+
+
+def test_parallel_workers_spill_unseeded_random_samples(tmp_path):
+    config = CSVConfig(jobs=2, max_memory=memory_size('1K'), spill_dir=str(tmp_path), sampling='reservoir')
+    ConfigManager.initialize(DefaultConfigProvider(csv_config=config))
+    try:
+        tables_specs, tables_keys = ParallelAnalyzer(jobs=2).analyze(DATA_DIR, keys_only=True)
+        parallel = SchemaAnalyzer().analyze_foreign_keys(tables_specs, tables_keys)
+    finally:
+        ConfigManager.initialize(DefaultConfigProvider())
+    serial = SchemaAnalyzer().analyze_tables(*CSVAnalyzer().process(DATA_DIR))
+
+    assert sorted(parallel) == sorted(serial)
+    assert {name: spec.foreign_keys for name, spec in parallel.items()} == {name: spec.foreign_keys
+                                                                           for name, spec in serial.items()}
+
@@ -0,0 +1,75 @@
+import os
+from pathlib import Path
+
+from csv_to_ddl.config.config_manager import ConfigManager
+from csv_to_ddl.config.config_provider import DefaultConfigProvider
+from csv_to_ddl.config.default_config import CSVConfig
+from csv_to_ddl.csv_processing.csv_analyzer import CSVAnalyzer
+from csv_to_ddl.parallel_analyzer import ParallelAnalyzer
+from csv_to_ddl.schema_analysis.foreign_key.fk_map import TableKeys
+from csv_to_ddl.schema_analysis.schema_analyzer import SchemaAnalyzer
+
+DATA_DIR = Path(os.path.dirname(__file__)) / "../no_header/schema_no_header/data"
+
+
+def foreign_keys(tables_specs):
+    return {table_name: [(fk.columns, fk.referenced_table, fk.referenced_columns) for fk in table_spec.foreign_keys]
+            for table_name, table_spec in tables_specs.items()}
+
+
+def write_regions_and_stores(directory):
+    with open(directory / "regions.csv", 'w') as f:
+        f.write("country_id,region_id,population\n")
+        for i in range(40):
+            f.write(f"{i % 4},{i // 4},{i // 8 * 1000}\n")
+    with open(directory / "stores.csv", 'w') as f:
+        f.write("store_id,country_id,region_id,opened\n")
+        for i in range(120):
+            f.write(f"{i + 100},{i % 4},{i % 40 // 4},2020-01-{i % 28 + 1:02d}\n")
+
+
+def test_streamed_tables_keep_only_keys(tmp_path):
+    write_regions_and_stores(tmp_path)
+    csv_analyzer = CSVAnalyzer()
+    in_memory = SchemaAnalyzer().analyze_tables(*csv_analyzer.process(tmp_path))
+    streamed = SchemaAnalyzer().analyze_table_stream(csv_analyzer.iter_tables(tmp_path))
+
+    assert foreign_keys(streamed) == foreign_keys(in_memory)
+    assert foreign_keys(streamed)['stores'] == [(['country_id', 'region_id'], 'regions', ['country_id', 'region_id'])]
+
+    table_name, csv_data, rescan = next(table for table in csv_analyzer.iter_tables(tmp_path) if table[0] == 'stores')
+    table_keys = TableKeys.extract(streamed[table_name], csv_data['rows'], rescan=rescan)
+    assert table_keys.rescan is rescan and table_keys.column_values('region_id').resolve is not None
+    assert table_keys.composite_column_values(['country_id', 'region_id']) == {(str(i % 4), str(i // 4))
+                                                                             for i in range(40)}
+
+
+def test_parallel_workers_return_keys_only():
+    ConfigManager.initialize(DefaultConfigProvider(csv_config=CSVConfig(jobs=2)))
+    try:
+        tables_specs, tables_keys = ParallelAnalyzer(jobs=2).analyze(DATA_DIR, keys_only=True)
+        parallel = SchemaAnalyzer().analyze_foreign_keys(tables_specs, tables_keys)
+    finally:
+        ConfigManager.initialize(DefaultConfigProvider())
+    serial = SchemaAnalyzer().analyze_tables(*CSVAnalyzer().process(DATA_DIR))
+
+    assert all(isinstance(table_keys, TableKeys) and table_keys.rescan is not None for table_keys in tables_keys.values())
+    assert foreign_keys(parallel) == foreign_keys(serial)
+    assert any(foreign_keys(serial).values())
+
+
+def test_unseeded_reservoir_sample_is_rescanned_with_the_same_rows(tmp_path):
+    write_regions_and_stores(tmp_path)
+    config = CSVConfig(sampling='reservoir', sample_size=30)
+    assert config.sampling_seed is not None
+
+    ConfigManager.initialize(DefaultConfigProvider(csv_config=config))
+    try:
+        table_name, csv_data, rescan = next(table for table in CSVAnalyzer().iter_tables(tmp_path)
+                                            if table[0] == 'stores')
+        rescanned = rescan(['store_id'])
+    finally:
+        ConfigManager.initialize(DefaultConfigProvider())
+
+    assert list(rescanned.column('store_id').values[1:]) == [row[0] for row in csv_data['rows']]
+
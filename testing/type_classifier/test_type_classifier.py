@@ -0,0 +1,40 @@
+from csv_to_ddl.config.default_config import TypeConfig
+from csv_to_ddl.schema_analysis.columns_and_types.type_detection import type_detectors
+from csv_to_ddl.schema_analysis.columns_and_types.type_detection.type_classifier import (TYPE_BITS, classify_value,
+                                                                                          count_types)
+from csv_to_ddl.schema_analysis.columns_and_types.type_detection.type_name import detect_column_type
+from csv_to_ddl.schema_analysis.models.dialects import DataType
+
+DETECTORS = {
+    DataType.BOOLEAN: type_detectors.is_boolean, DataType.INTEGER: type_detectors.is_integer,
+    DataType.BIGINT: type_detectors.is_bigint, DataType.DECIMAL: type_detectors.is_decimal,
+    DataType.FLOAT: type_detectors.is_float, DataType.UUID: type_detectors.is_uuid,
+    DataType.EMAIL: type_detectors.is_email, DataType.URL: type_detectors.is_url,
+    DataType.DATETIME: type_detectors.is_datetime, DataType.DATE: type_detectors.is_date,
+    DataType.TIME: type_detectors.is_time, DataType.JSON: type_detectors.is_json,
+}
+
+VALUES = ['1', '0', 'Yes', 'off', '42', '-7', '2147483648', '-2147483649', '3.14', '-0.5', '1e5', '.5', '+2.5',
+          'inf', 'nan', '1_000.5', '1.2.2020', '2020-01-31', '31/12/2020', '2020-01-31 23:59:59',
+          '2020-01-31T10:00:00', '2020-01-31 10:00:00.250', '10:30', '7:05:09.5', '25:99', '{"a": [1, 2]}',
+          '[1, 2', 'a@example.com', 'http://example.com/x', 'HTTPS://a.io', 'http:/broken',
+          '123e4567-e89b-12d3-a456-426614174000', '123e4567-e89b-02d3-a456-426614174000', 'plain text', '-',
+          '١٢٣', '１.５', '²']
+
+
+def test_classifier_accepts_what_each_detector_accepts():
+    for value in VALUES:
+        mask = classify_value(value)
+        for data_type, detector in DETECTORS.items():
+            assert bool(mask & TYPE_BITS[data_type]) == (detector([value]) == 1), (value, data_type)
+
+
+def test_detected_type_comes_from_one_pass_of_counts():
+    config = TypeConfig()
+    dates = [f"2021-03-{day:02d}" for day in range(1, 29)] * 3
+
+    assert count_types(dates)[DataType.DATE] == len(dates) and count_types(dates)[DataType.DATETIME] == 0
+    assert detect_column_type(dates + ['n/a'], config) == DataType.DATE
+    assert detect_column_type(['1', '0', '1', 'yes'], config) == DataType.BOOLEAN
+    assert detect_column_type(['12', '7', '2147483648'] * 4, config) == DataType.INTEGER
+    assert detect_column_type([f"item {i}" for i in range(50)], config) == DataType.VARCHAR
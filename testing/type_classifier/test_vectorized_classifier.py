@@ -0,0 +1,42 @@
+import random
+from dataclasses import replace
+
+import pytest
+
+from csv_to_ddl.config.default_config import TypeConfig
+from csv_to_ddl.schema_analysis.columns_and_types.type_detection.type_classifier import classify_value
+from csv_to_ddl.schema_analysis.columns_and_types.type_detection.type_name import detect_column_type
+from csv_to_ddl.schema_analysis.columns_and_types.type_detection.vectorized_classifier import classify_values
+
+pytest.importorskip('numpy')
+
+EDGE_VALUES = ['0', '1', '-0', '+1', '-', '.', '1.', '.5', '-.5', '+.5', '+1.5', '-1.5', '1.5.', '1-', '--1', '1e5',
+               '2147483648', '-2147483648', '-2147483649', '9' * 18, '9' * 19, '-' + '9' * 20, '2020-02-29',
+               '2019-02-29', '1900-02-29', '0000-01-01', '2020-13-01', '2020-04-31', '2020-01-01 23:59:59',
+               '2020-01-01T24:00:00', '2020-01-01 12:00:60', '2020-01-01X12:00:00', '2020-01-01 12:00:00.5',
+               '01/02/2020', '12:30', 'yes', '2020-1-01', '１２', 'text longer than the packed width']
+
+
+def test_vectorized_masks_match_classify_value():
+    rng = random.Random(7)
+    values = EDGE_VALUES + [''.join(rng.choice('0123456789-+.: T') for _ in range(rng.randint(1, 20))).strip() or '0'
+                            for _ in range(5000)]
+    values += [f"{rng.randint(1, 2100):04d}-{rng.randint(0, 13):02d}-{rng.randint(0, 32):02d}"
+               f" {rng.randint(0, 25):02d}:{rng.randint(0, 61):02d}:{rng.randint(0, 61):02d}" for _ in range(2000)]
+
+    assert classify_values(values) == [classify_value(value) for value in values]
+
+
+def test_vectorized_detection_picks_the_same_types():
+    vectorized = TypeConfig()
+    scalar = replace(vectorized, vectorized_type_detection=False)
+    columns = [
+        [f"{i * 1.25:.2f}" for i in range(200)],
+        [f"2017-{i % 12 + 1:02d}-{i % 28 + 1:02d} 10:{i % 60:02d}:00" for i in range(200)],
+        [f"2018-{i % 12 + 1:02d}-{i % 28 + 1:02d}" for i in range(200)] + ['n/a'],
+        [str(3_000_000_000 + i) for i in range(200)],
+        [f"{i:032x}" for i in range(200)],
+    ]
+
+    for column in columns:
+        assert detect_column_type(column, vectorized) == detect_column_type(column, scalar)
@@ -0,0 +1,71 @@
+import pickle
+
+from csv_to_ddl.schema_analysis.columns_and_types import value_compaction
+from csv_to_ddl.schema_analysis.columns_and_types.column_analyzer import ColumnAnalyzer
+from csv_to_ddl.schema_analysis.columns_and_types.column_profile import ColumnProfile
+from csv_to_ddl.schema_analysis.columns_and_types.value_compaction import CompactValue, ValueInterner
+from csv_to_ddl.schema_analysis.foreign_key.fk_map import get_single_column_values_from_data
+
+REVIEWS = [f"Review text number {i % 40}: " + "great product, fast delivery. " * 5 for i in range(100)] + ['', ' ']
+
+
+def test_compacted_statistics_match_full_values():
+    expected = ColumnAnalyzer._calculate_statistics(REVIEWS)
+
+    assert ColumnAnalyzer._calculate_statistics(REVIEWS, compact_length=32, prefix_length=8) == expected
+
+    profile = ColumnProfile(type_sample_size=5, distinct_limit=1000, sketch_size=64, compact_length=32,
+                            prefix_length=8)
+    for value in REVIEWS:
+        profile.add(value)
+    assert profile.to_statistics() == expected
+    assert all(isinstance(value, CompactValue) for value in profile.distinct_values)
+
+
+def test_hash_collisions_are_verified_against_full_values(monkeypatch):
+    monkeypatch.setattr(value_compaction, 'stable_hash64', lambda value: 42)
+    left = [[f"comment-{i:04d}"] for i in range(10)]
+    right = [[f"comment-{i:04d}"] for i in range(5, 20)] + [["short"]]
+
+    statistics = ColumnAnalyzer._calculate_statistics([row[0] for row in left + left], compact_length=4,
+                                                      prefix_length=3)
+    assert statistics.distinct_count == 10
+
+    left_values = get_single_column_values_from_data('note', left, ['note'], compact_length=4, prefix_length=3)
+    right_values = get_single_column_values_from_data('note', right, ['note'], compact_length=4, prefix_length=3)
+    assert len(left_values) == 10 and len(right_values) == 16
+    assert left_values.overlap(right_values) == right_values.overlap(left_values) == 5
+    assert "comment-0003" in left_values and "comment-0010" not in left_values
+
+
+def test_interned_sets_overlap_on_shared_ids():
+    orders = [[f"ORD-{i:04d}", f"customer {i % 7}"] for i in range(300)]
+    returns = [[f"ORD-{i:04d}", "x" * 40] for i in range(250, 400, 2)]
+    interner = ValueInterner()
+
+    order_ids = get_single_column_values_from_data('order_id', orders, ['order_id', 'note'])
+    returned_ids = get_single_column_values_from_data('order_id', returns, ['order_id', 'note'])
+    plain_overlap = returned_ids.overlap(order_ids)
+    order_ids.intern(interner)
+    returned_ids.intern(interner)
+
+    assert len(interner) == 300 + 50  # ids shared by both tables are stored once
+    assert returned_ids.overlap(order_ids) == plain_overlap == 25
+    assert len(returned_ids) == 75 and "ORD-0252" in returned_ids and "ORD-0253" not in returned_ids
+    assert set(returned_ids) == {f"ORD-{i:04d}" for i in range(250, 400, 2)}
+
+
+def test_interned_sets_mix_with_compacted_and_pickled_sets():
+    left = [[f"comment-{i:04d}"] for i in range(10)] + [["ok"]]
+    right = [[f"comment-{i:04d}"] for i in range(5, 20)] + [["ok"]]
+    interner = ValueInterner()
+
+    left_values = get_single_column_values_from_data('note', left, ['note'], compact_length=4, prefix_length=3)
+    right_values = get_single_column_values_from_data('note', right, ['note'], compact_length=4, prefix_length=3)
+    left_values.intern(interner)
+    shipped = pickle.loads(pickle.dumps(left_values))
+
+    assert list(interner.values) == ['ok'] and set(shipped) == set(left_values)
+    assert left_values.overlap(right_values) == shipped.overlap(right_values) == 6
+    right_values.intern(interner)
+    assert left_values.overlap(right_values) == right_values.overlap(left_values) == 6